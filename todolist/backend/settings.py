@@ -40,7 +40,7 @@ DEBUG = env('DEBUG')
 # SECURITY WARNING: keep the secret key used in production secret!
 SECRET_KEY = env.str('SECRET_KEY')
 
-# CACHES = {'default': env.cache('REDIS_CACHE_URL')}
+CACHES = {'default': env.cache('REDIS_CACHE_URL', default='locmemcache://')}
 
 # Quick-start development settings - unsuitable for production
 # See https://docs.djangoproject.com/en/3.2/howto/deployment/checklist/
@@ -64,6 +64,7 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    'core.profiling.ProfilingMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
@@ -185,5 +186,49 @@ REST_FRAMEWORK = {
     )
 }
 
+# Goals
+# Seconds to keep user board roles in the cache between requests, 0 disables it. Only used with a shared cache
+# (REDIS_CACHE_URL), otherwise the roles are loaded once per request
+GOALS_ROLE_CACHE_TIMEOUT = env.int('GOALS_ROLE_CACHE_TIMEOUT', default=300)
+# Seconds to keep board and category list responses in the cache, 0 disables it. Only used with a shared cache
+# (REDIS_CACHE_URL)
+GOALS_RESPONSE_CACHE_TIMEOUT = env.int('GOALS_RESPONSE_CACHE_TIMEOUT', default=300)
+# Archive categories and goals of deleted boards and categories with `manage.py archive` instead of the request
+GOALS_DEFERRED_ARCHIVAL = env.bool('GOALS_DEFERRED_ARCHIVAL', default=False)
+# Seconds a saved row waits before the delta sync returns it, longer than a write transaction may take
+GOALS_SYNC_SETTLE_TIME = env.float('GOALS_SYNC_SETTLE_TIME', default=2.0)
+# Days deletions are kept for the delta sync by `manage.py archive`, older sync cursors are refused
+GOALS_TOMBSTONE_RETENTION_DAYS = env.int('GOALS_TOMBSTONE_RETENTION_DAYS', default=30)
+
+# Profiling
+# Share of requests profiled into the Server-Timing header, 0 removes the middleware
+PROFILING_SAMPLE_RATE = env.float('PROFILING_SAMPLE_RATE', default=0.0)
+# Profiled requests slower than this are logged with their slowest SQL statements
+PROFILING_SLOW_REQUEST_MS = env.int('PROFILING_SLOW_REQUEST_MS', default=500)
+PROFILING_SLOWEST_QUERIES = env.int('PROFILING_SLOWEST_QUERIES', default=5)
+
 # Telegram bot
 TG_TOKEN = env.str('TG_TOKEN')
+# Messages sent per second at most, Telegram allows about 30, and to one chat, with a short burst
+TG_MESSAGES_PER_SECOND = env.float('TG_MESSAGES_PER_SECOND', default=25.0)
+TG_CHAT_MESSAGES_PER_SECOND = env.float('TG_CHAT_MESSAGES_PER_SECOND', default=1.0)
+TG_CHAT_MESSAGE_BURST = env.int('TG_CHAT_MESSAGE_BURST', default=3)
+# Kept alive connections to the Bot API (and threads sending the queued messages), seconds to connect or wait for an answer
+TG_POOL_SIZE = env.int('TG_POOL_SIZE', default=10)
+TG_TIMEOUT = env.float('TG_TIMEOUT', default=10.0)
+# Updates handled at a time by `runbot --async`
+TG_BOT_CONCURRENCY = env.int('TG_BOT_CONCURRENCY', default=8)
+# Public URL of bot/webhook registered by `runbot --webhook` and the secret Telegram sends with every update,
+# the webhook answers 404 without a secret
+TG_WEBHOOK_URL = env.str('TG_WEBHOOK_URL', default='')
+TG_WEBHOOK_SECRET = env.str('TG_WEBHOOK_SECRET', default='')
+# Seconds a conversation with the bot may idle before its state is dropped. With REDIS_CACHE_URL the states read
+# recently are kept in each bot process, at most TG_FSM_CACHE_SIZE chats for TG_FSM_CACHE_TTL seconds
+TG_FSM_TTL = env.int('TG_FSM_TTL', default=86400)
+TG_FSM_CACHE_SIZE = env.int('TG_FSM_CACHE_SIZE', default=10000)
+TG_FSM_CACHE_TTL = env.float('TG_FSM_CACHE_TTL', default=300.0)
+# Telegram users of the chats kept in each bot process, beyond a batch of updates only with REDIS_CACHE_URL
+TG_USER_CACHE_SIZE = env.int('TG_USER_CACHE_SIZE', default=10000)
+TG_USER_CACHE_TTL = env.float('TG_USER_CACHE_TTL', default=300.0)
+# Goals overdue for longer are not reminded of any more
+TG_REMINDER_OVERDUE_HOURS = env.int('TG_REMINDER_OVERDUE_HOURS', default=24)
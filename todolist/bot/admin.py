@@ -1,9 +1,22 @@
 from django.contrib import admin
 
-from bot.models import TgUser
+from bot.models import GoalReminder, TgUpdate, TgUser
 
 
 @admin.register(TgUser)
 class TgUserAdmin(admin.ModelAdmin):
     list_display = ('chat_id', 'username', 'user')
     readonly_fields = ('chat_id', 'verification_code')
+
+
+@admin.register(GoalReminder)
+class GoalReminderAdmin(admin.ModelAdmin):
+    list_display = ('goal', 'threshold', 'due_date', 'chat_id', 'sent')
+    list_filter = ('threshold',)
+    raw_id_fields = ('goal',)
+
+
+@admin.register(TgUpdate)
+class TgUpdateAdmin(admin.ModelAdmin):
+    list_display = ('update_id', 'chat_id', 'received', 'handled')
+    readonly_fields = ('update_id', 'chat_id', 'payload', 'received', 'handled', 'error')
@@ -0,0 +1,27 @@
+import time
+
+from django.conf import settings
+from django.core.management import BaseCommand
+
+from bot.reminders import ReminderWorker
+from bot.tg.client import TgClient
+
+
+class Command(BaseCommand):
+    """Goal deadline reminders"""
+    help = "Send Telegram reminders of the goals approaching or past their due date"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--interval', type=float, default=60, help="Seconds between the ticks")
+        parser.add_argument('--once', action='store_true', help="Run one tick and exit")
+
+    def handle(self, *args, **options):
+        worker = ReminderWorker(TgClient(settings.TG_TOKEN))
+        while True:
+            started = time.monotonic()
+            sent = worker.tick()
+            if sent:
+                self.stdout.write(f"{sent} reminder messages sent")
+            if options['once']:
+                return
+            time.sleep(max(options['interval'] - (time.monotonic() - started), 0))
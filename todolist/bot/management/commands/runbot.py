@@ -1,5 +1,8 @@
+import asyncio
 import logging
 import os
+import time
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta
 from enum import IntEnum, auto
 from typing import NoReturn
@@ -11,8 +14,11 @@ from backend import settings
 from backend.settings import TG_TOKEN
 from bot.models import TgUser
 from bot.tg.client import TgClient
-from bot.tg.fsm.memory_storage import MemoryStorage
-from bot.tg.models import Message
+from bot.tg.fsm.db_storage import DatabaseStorage
+from bot.tg.models import Message, UpdateObj
+from bot.tg.runtime import AsyncTgClient, ChatDispatcher, run_polling
+from bot.users import TgUserCache
+from bot.webhook import UpdateDispatcher
 from goals.models import Goal, GoalCategory, BoardParticipant
 
 logger = logging.getLogger(__name__)
@@ -40,7 +46,8 @@ class Command(BaseCommand):
     def __init__(self, *args, **kwargs):
         super().__init__(*args, **kwargs)
         self.tg_client = TgClient(settings.TG_TOKEN)
-        self.storage = MemoryStorage()
+        self.storage = DatabaseStorage(StateEnum)
+        self.tg_users = TgUserCache()
 
     @staticmethod
     def _generate_verification_code() -> str:
@@ -52,7 +59,7 @@ class Command(BaseCommand):
         code: str = self._generate_verification_code()
         tg_user.verification_code = code
         tg_user.save(update_fields=('verification_code',))
-        self.tg_client.send_message(
+        self.tg_client.queue_message(
             chat_id=msg.chat.id,
             text=f'[verification code] {tg_user.verification_code}'
         )
@@ -64,9 +71,9 @@ class Command(BaseCommand):
             for goal in Goal.objects.filter(user_id=tg_user.user_id, is_deleted=False).order_by('created')
         ]
         if resp_goals:
-            self.tg_client.send_message(msg.chat.id, '\n'.join(resp_goals))
+            self.tg_client.queue_message(msg.chat.id, '\n'.join(resp_goals))
         else:
-            self.tg_client.send_message(msg.chat.id, '[goals are not found]')
+            self.tg_client.queue_message(msg.chat.id, '[goals are not found]')
 
     def handle_goal_categories_list(self, msg: Message, tg_user: TgUser) -> NoReturn:
         """Return categories list to user"""
@@ -78,9 +85,9 @@ class Command(BaseCommand):
             ).order_by('title')
         ]
         if resp_categories:
-            self.tg_client.send_message(msg.chat.id, 'Select category\n' + '\n'.join(resp_categories))
+            self.tg_client.queue_message(msg.chat.id, 'Select category\n' + '\n'.join(resp_categories))
         else:
-            self.tg_client.send_message(msg.chat.id, '[categories are not found]')
+            self.tg_client.queue_message(msg.chat.id, '[categories are not found]')
 
     def handle_save_selected_category(self, msg: Message, tg_user: TgUser) -> NoReturn:
         """Return category to user"""
@@ -93,12 +100,12 @@ class Command(BaseCommand):
                     id=cat_id
             ).exists():
                 self.storage.update_data(chat_id=msg.chat.id, cat_id=cat_id)
-                self.tg_client.send_message(msg.chat.id, '[set title]')
+                self.tg_client.queue_message(msg.chat.id, '[set title]')
                 self.storage.set_state(msg.chat.id, state=StateEnum.CHOSEN_CATEGORY)
             else:
-                self.tg_client.send_message(msg.chat.id, '[Category not found or read only]')
+                self.tg_client.queue_message(msg.chat.id, '[Category not found or read only]')
         else:
-            self.tg_client.send_message(msg.chat.id, '[Invalid category id]')
+            self.tg_client.queue_message(msg.chat.id, '[Invalid category id]')
 
     def handle_save_new_cat(self, msg: Message, tg_user: TgUser) -> NoReturn:
         """New goal creation"""
@@ -115,11 +122,11 @@ class Command(BaseCommand):
                     board__participants__role_in=[BoardParticipant.Role.owner, BoardParticipant.Role.writer],
                     is_deleted=False,
             ).exists():
-                self.tg_client.send_message(msg.chat.id, '[New goal created]')
+                self.tg_client.queue_message(msg.chat.id, '[New goal created]')
             else:
-                self.tg_client.send_message(msg.chat.id, '[Access to create goal only for owner or writers]')
+                self.tg_client.queue_message(msg.chat.id, '[Access to create goal only for owner or writers]')
         else:
-            self.tg_client.send_message(msg.chat.id, '[Something wrong]')
+            self.tg_client.queue_message(msg.chat.id, '[Something wrong]')
 
         self.storage.reset(tg_user.chat_id)
 
@@ -135,7 +142,7 @@ class Command(BaseCommand):
 
         elif msg.text == '/cancel' and self.storage.get_state(tg_user.chat_id):
             self.storage.reset(tg_user.chat_id)
-            self.tg_client.send_message(msg.chat.id, '[canceled]')
+            self.tg_client.queue_message(msg.chat.id, '[canceled]')
 
         elif state := self.storage.get_state(tg_user.chat_id):
             match state:
@@ -147,28 +154,72 @@ class Command(BaseCommand):
                     logger.warning("Invalid State: %s", state)
 
         elif msg.text.startswith('/'):
-            self.tg_client.send_message(msg.chat.id, '[unknown command]')
+            self.tg_client.queue_message(msg.chat.id, '[unknown command]')
 
     def handle_message(self, msg: Message) -> NoReturn:
         """New message creation"""
-        tg_user, _ = TgUser.objects.select_related('user').get_or_create(
-            chat_id=msg.chat.id,
-            defaults={
-                'username': msg.from_.username
-            }
-        )
+        tg_user = self.tg_users.get_or_create(msg.chat.id, msg.from_.username)
 
         if tg_user.user:
             self.handle_verified_user(msg=msg, tg_user=tg_user)
         else:
             self.handle_unverified_user(msg=msg, tg_user=tg_user)
 
+    def preload_updates(self, items: list[UpdateObj]) -> None:
+        """Read the Telegram users of a batch of updates at once"""
+        self.tg_users.preload(item.message.chat.id for item in items)
+
+    def handle_update(self, item: UpdateObj) -> None:
+        """Response to one update"""
+        self.storage.purge()
+        self.handle_message(msg=item.message)
+        self.tg_client.queue_message(chat_id=item.message.chat.id, text=item.message.text)
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--async', action='store_true', dest='use_async',
+            help="Handle the updates of different chats concurrently, the updates of one chat in order",
+        )
+        parser.add_argument(
+            '--concurrency', type=int, default=settings.TG_BOT_CONCURRENCY,
+            help="Updates handled at a time with --async",
+        )
+        parser.add_argument(
+            '--webhook', action='store_true',
+            help="Handle the updates queued by the bot/webhook view instead of polling Telegram",
+        )
+
     def handle(self, *args, **options) -> NoReturn:
         """Receiving bot notifications and sending response to user"""
+        if options['webhook']:
+            self.handle_webhook()
+        if options['use_async']:
+            asyncio.run(self.handle_async(options['concurrency']))
+            return
         offset = 0
         while True:
             res = self.tg_client.get_updates(offset=offset)
+            self.preload_updates(res.result)
             for item in res.result:
                 offset = item.update_id + 1
-                self.handle_message(msg=item.message)
-                self.tg_client.send_message(chat_id=item.message.chat.id, text=item.message.text)
+                self.handle_update(item)
+
+    def handle_webhook(self) -> NoReturn:
+        """Dispatch the updates queued by the webhook, several processes may run side by side"""
+        if settings.TG_WEBHOOK_URL:
+            self.tg_client.set_webhook(settings.TG_WEBHOOK_URL, settings.TG_WEBHOOK_SECRET)
+        dispatcher = UpdateDispatcher(self.handle_update, preload=self.preload_updates)
+        while True:
+            # A dispatcher that is never idle purges too
+            dispatcher.purge()
+            if not dispatcher.run_once():
+                time.sleep(0.5)
+
+    async def handle_async(self, concurrency: int) -> None:
+        """Long polling on the event loop, handlers run in a thread pool of `concurrency` threads"""
+        with ThreadPoolExecutor(1, thread_name_prefix='bot-poll') as poll_executor, \
+                ThreadPoolExecutor(concurrency, thread_name_prefix='bot-handler') as executor:
+            dispatcher = ChatDispatcher(
+                self.handle_update, executor, concurrency=concurrency, max_pending=concurrency * 10
+            )
+            await run_polling(AsyncTgClient(self.tg_client, poll_executor), dispatcher, preload=self.preload_updates)
@@ -0,0 +1,42 @@
+import json
+import time
+
+import requests
+from django.conf import settings
+from django.core.management import BaseCommand, CommandError
+
+
+class Command(BaseCommand):
+    """Local stand-in for Telegram delivering updates to the webhook"""
+    help = "Post message updates to bot/webhook the way Telegram does, with the secret token header"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--url', default='http://127.0.0.1:8000/bot/webhook', help="Webhook URL")
+        parser.add_argument('--chats', type=int, default=1, help="Chats the updates are spread over")
+        parser.add_argument('--count', type=int, default=1, help="Updates to send")
+        parser.add_argument('--first-chat-id', type=int, default=1, help="Chat ID of the first chat")
+        parser.add_argument('--text', default='/goals', help="Message text")
+
+    def handle(self, *args, **options):
+        session = requests.Session()
+        headers = {'X-Telegram-Bot-Api-Secret-Token': settings.TG_WEBHOOK_SECRET}
+        # Update ids only grow, like the ones of Telegram
+        first_id = int(time.time() * 1000)
+        for number in range(options['count']):
+            chat_id = options['first_chat_id'] + number % options['chats']
+            update = {
+                'update_id': first_id + number,
+                'message': {
+                    'message_id': number + 1,
+                    'from': {'id': chat_id, 'is_bot': False, 'first_name': 'Fake', 'username': f'fake{chat_id}'},
+                    'chat': {'id': chat_id, 'type': 'private', 'first_name': 'Fake'},
+                    'date': int(time.time()),
+                    'text': options['text'],
+                },
+            }
+            response = session.post(options['url'], data=json.dumps(update), headers={
+                **headers, 'Content-Type': 'application/json',
+            })
+            if response.status_code != 200:
+                raise CommandError(f"Update {update['update_id']}: {response.status_code} {response.text}")
+        self.stdout.write(f"{options['count']} updates sent to {options['url']}")
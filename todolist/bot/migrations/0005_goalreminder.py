@@ -0,0 +1,34 @@
+# Generated by Django 4.1.3 on 2026-10-18 16:36
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('goals', '0014_open_due_date_index'),
+        ('bot', '0004_alter_tguser_username'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='GoalReminder',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('threshold', models.PositiveSmallIntegerField(choices=[(1, 'За сутки'), (2, 'За час'), (3, 'Просрочена')], verbose_name='Порог')),
+                ('due_date', models.DateTimeField(verbose_name='Дата выполнения')),
+                ('chat_id', models.BigIntegerField(verbose_name='Chat ID')),
+                ('sent', models.DateTimeField(auto_now_add=True, verbose_name='Дата отправки')),
+                ('goal', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='reminders', to='goals.goal', verbose_name='Цель')),
+            ],
+            options={
+                'verbose_name': 'Напоминание',
+                'verbose_name_plural': 'Напоминания',
+            },
+        ),
+        migrations.AddConstraint(
+            model_name='goalreminder',
+            constraint=models.UniqueConstraint(fields=('goal', 'threshold', 'due_date'), name='unique_goal_reminder'),
+        ),
+    ]
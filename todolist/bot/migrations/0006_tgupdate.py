@@ -0,0 +1,33 @@
+# Generated by Django 4.1.3 on 2026-10-18 16:44
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('bot', '0005_goalreminder'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='TgUpdate',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('update_id', models.BigIntegerField(unique=True, verbose_name='Update ID')),
+                ('chat_id', models.BigIntegerField(verbose_name='Chat ID')),
+                ('payload', models.JSONField(verbose_name='Данные')),
+                ('received', models.DateTimeField(auto_now_add=True, verbose_name='Дата получения')),
+                ('handled', models.DateTimeField(blank=True, null=True, verbose_name='Дата обработки')),
+                ('error', models.TextField(blank=True, default='', verbose_name='Ошибка')),
+            ],
+            options={
+                'verbose_name': 'Обновление',
+                'verbose_name_plural': 'Обновления',
+            },
+        ),
+        migrations.AddIndex(
+            model_name='tgupdate',
+            index=models.Index(condition=models.Q(('handled__isnull', True)), fields=['chat_id', 'id'], name='tgupdate_pending_idx'),
+        ),
+    ]
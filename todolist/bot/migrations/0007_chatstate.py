@@ -0,0 +1,27 @@
+# Generated by Django 4.1.3 on 2026-10-18 16:47
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('bot', '0006_tgupdate'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ChatState',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('chat_id', models.BigIntegerField(unique=True, verbose_name='Chat ID')),
+                ('state', models.JSONField(blank=True, null=True, verbose_name='Состояние')),
+                ('data', models.JSONField(blank=True, default=dict, verbose_name='Данные')),
+                ('updated', models.DateTimeField(auto_now=True, db_index=True, verbose_name='Дата последнего обновления')),
+            ],
+            options={
+                'verbose_name': 'Состояние чата',
+                'verbose_name_plural': 'Состояния чатов',
+            },
+        ),
+    ]
@@ -1,6 +1,7 @@
 from django.db import models
 
 from core.models import User
+from goals.models import Goal
 
 
 class TgUser(models.Model):
@@ -12,3 +13,56 @@ class TgUser(models.Model):
     class Meta:
         verbose_name = "Пользователь"
         verbose_name_plural = "Пользователи"
+
+
+class GoalReminder(models.Model):
+    """Deadline reminder sent for a goal, one per threshold and due date"""
+    class Threshold(models.IntegerChoices):
+        day = 1, "За сутки"
+        hour = 2, "За час"
+        overdue = 3, "Просрочена"
+
+    goal = models.ForeignKey(Goal, verbose_name="Цель", on_delete=models.CASCADE, related_name="reminders")
+    threshold = models.PositiveSmallIntegerField(verbose_name="Порог", choices=Threshold.choices)
+    # A new due date of the goal arms its reminders again
+    due_date = models.DateTimeField(verbose_name="Дата выполнения")
+    chat_id = models.BigIntegerField(verbose_name="Chat ID")
+    sent = models.DateTimeField(verbose_name="Дата отправки", auto_now_add=True)
+
+    class Meta:
+        verbose_name = "Напоминание"
+        verbose_name_plural = "Напоминания"
+        constraints = [
+            models.UniqueConstraint(fields=["goal", "threshold", "due_date"], name="unique_goal_reminder"),
+        ]
+
+
+class TgUpdate(models.Model):
+    """Telegram update received by the webhook, waiting for the dispatcher"""
+    update_id = models.BigIntegerField(verbose_name="Update ID", unique=True)
+    chat_id = models.BigIntegerField(verbose_name="Chat ID")
+    payload = models.JSONField(verbose_name="Данные")
+    received = models.DateTimeField(verbose_name="Дата получения", auto_now_add=True)
+    handled = models.DateTimeField(verbose_name="Дата обработки", null=True, blank=True)
+    error = models.TextField(verbose_name="Ошибка", blank=True, default="")
+
+    class Meta:
+        verbose_name = "Обновление"
+        verbose_name_plural = "Обновления"
+        indexes = [
+            models.Index(
+                fields=["chat_id", "id"], condition=models.Q(handled__isnull=True), name="tgupdate_pending_idx"
+            ),
+        ]
+
+
+class ChatState(models.Model):
+    """Conversation state of a chat kept by DatabaseStorage"""
+    chat_id = models.BigIntegerField(verbose_name="Chat ID", unique=True)
+    state = models.JSONField(verbose_name="Состояние", null=True, blank=True)
+    data = models.JSONField(verbose_name="Данные", default=dict, blank=True)
+    updated = models.DateTimeField(verbose_name="Дата последнего обновления", auto_now=True, db_index=True)
+
+    class Meta:
+        verbose_name = "Состояние чата"
+        verbose_name_plural = "Состояния чатов"
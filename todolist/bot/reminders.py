@@ -0,0 +1,136 @@
+import logging
+from datetime import datetime, timedelta
+from itertools import groupby
+from operator import itemgetter
+from typing import Optional
+
+from django.conf import settings
+from django.db import IntegrityError, transaction
+from django.db.models import F, OuterRef, Subquery
+from django.utils import timezone
+
+from bot.models import GoalReminder
+from bot.tg.client import TgClient
+from bot.tg.transport import MESSAGE_LENGTH, TelegramError
+from goals.models import Goal
+
+logger = logging.getLogger(__name__)
+
+# Time before the due date a goal crosses every threshold
+THRESHOLD_LEADS = {
+    GoalReminder.Threshold.day: timedelta(days=1),
+    GoalReminder.Threshold.hour: timedelta(hours=1),
+    GoalReminder.Threshold.overdue: timedelta(0),
+}
+THRESHOLD_TEXTS = {
+    GoalReminder.Threshold.day: "due within a day",
+    GoalReminder.Threshold.hour: "due within an hour",
+    GoalReminder.Threshold.overdue: "overdue",
+}
+
+
+def crossed_threshold(due_date: datetime, now: datetime) -> GoalReminder.Threshold:
+    """The most urgent threshold crossed by a goal due within a day"""
+    for threshold in sorted(THRESHOLD_LEADS, reverse=True):
+        if due_date - THRESHOLD_LEADS[threshold] <= now:
+            return threshold
+    return GoalReminder.Threshold.day
+
+
+def due_reminders(now: datetime) -> list[dict]:
+    """Open goals of Telegram users that crossed a threshold they were not reminded of, ordered by chat.
+
+    One range scan of the partial open due date index: the goals due within a day and the goals overdue
+    for less than TG_REMINDER_OVERDUE_HOURS, the ones overdue for longer are not reminded of any more.
+    """
+    last_sent = GoalReminder.objects.filter(
+        goal=OuterRef('id'), due_date=OuterRef('due_date')
+    ).order_by('-threshold').values('threshold')[:1]
+    goals = Goal.objects.filter(
+        status__in=Goal.OPEN_STATUSES,
+        due_date__gte=now - timedelta(hours=settings.TG_REMINDER_OVERDUE_HOURS),
+        due_date__lt=now + max(THRESHOLD_LEADS.values()),
+        user__tguser__isnull=False,
+    ).annotate(
+        chat_id=F('user__tguser__chat_id'),
+        last_sent=Subquery(last_sent),
+    ).order_by('chat_id', 'due_date', 'id').values('id', 'title', 'due_date', 'chat_id', 'last_sent')
+
+    reminders = []
+    for goal in goals:
+        threshold = crossed_threshold(goal['due_date'], now)
+        if goal['last_sent'] is None or goal['last_sent'] < threshold:
+            reminders.append({**goal, 'threshold': threshold})
+    return reminders
+
+
+REMINDER_HEADER = '[deadline reminder]'
+
+
+def reminder_line(reminder: dict) -> str:
+    return (
+        f"#{reminder['id']} {reminder['title']}: {THRESHOLD_TEXTS[reminder['threshold']]}, "
+        f"{timezone.localtime(reminder['due_date']):%d.%m.%Y %H:%M}"
+    )
+
+
+def reminder_text(reminders: list[dict]) -> str:
+    return '\n'.join([REMINDER_HEADER, *map(reminder_line, reminders)])
+
+
+def split_reminders(reminders: list[dict], length: int = MESSAGE_LENGTH) -> list[list[dict]]:
+    """Reminders of a chat grouped into as few messages of at most `length` characters as they fit"""
+    groups: list[list[dict]] = []
+    size = 0
+    for reminder in reminders:
+        line = 1 + len(reminder_line(reminder))
+        if not groups or size + line > length:
+            groups.append([])
+            size = len(REMINDER_HEADER)
+        groups[-1].append(reminder)
+        size += line
+    return groups
+
+
+class ReminderWorker:
+    """Sends the goals that crossed a reminder threshold to every chat, in as few messages as they fit.
+
+    Reminders are recorded in the transaction their message is sent in: a message that failed is
+    rolled back and retried on the next tick, a recorded one is never sent again, after a restart
+    or by another worker. The client transport keeps the sends within the Telegram rate limits.
+    """
+
+    def __init__(self, tg_client: TgClient):
+        self.tg_client = tg_client
+
+    def tick(self, now: Optional[datetime] = None) -> int:
+        """Send the due reminders, return the number of messages sent"""
+        sent = 0
+        for chat_id, reminders in groupby(due_reminders(now or timezone.now()), key=itemgetter('chat_id')):
+            for group in split_reminders(list(reminders)):
+                if not self.send(chat_id, group):
+                    break
+                sent += 1
+        return sent
+
+    def send(self, chat_id: int, reminders: list[dict]) -> bool:
+        try:
+            with transaction.atomic():
+                GoalReminder.objects.bulk_create([
+                    GoalReminder(
+                        goal_id=reminder['id'],
+                        threshold=reminder['threshold'],
+                        due_date=reminder['due_date'],
+                        chat_id=chat_id,
+                    )
+                    for reminder in reminders
+                ])
+                self.tg_client.send_message(chat_id, reminder_text(reminders))
+        except IntegrityError:
+            # Another worker has sent them already
+            return False
+        except TelegramError:
+            # Telegram refused the message (chat blocked...) or is not reachable
+            logger.exception("Cannot send reminders to chat %s", chat_id)
+            return False
+        return True
@@ -0,0 +1,11 @@
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from bot.models import TgUser
+from bot.users import invalidate_tg_user
+
+
+@receiver([post_save, post_delete], sender=TgUser)
+def tg_user_changed(sender, instance: TgUser, **kwargs) -> None:
+    """Reset the cached Telegram user of the chat, linked to a user or with a new verification code"""
+    invalidate_tg_user(instance.chat_id)
@@ -1,11 +1,15 @@
-import requests
+from typing import Optional
+
 from bot.tg.models import GetUpdatesResponse, SendMessageResponse
+from bot.tg.transport import OutboundQueue, Transport, shared_transport
 
 
 class TgClient:
     """Telegram bot client"""
-    def __init__(self, token: str):
+    def __init__(self, token: str, transport: Optional[Transport] = None):
         self.token = token
+        self.transport = transport or shared_transport(token)
+        self._outbound: Optional[OutboundQueue] = None
 
     def get_url(self, method: str) -> str:
         """Telegram Bot API URL"""
@@ -13,14 +17,29 @@ class TgClient:
 
     def get_updates(self, offset: int = 0, timeout: int = 30) -> GetUpdatesResponse:
         """Receive updates in some time"""
-        url = self.get_url('getUpdates')
-
-        response = requests.get(url=url, params={"offset": offset, "timeout": timeout})
+        data = self.transport.call(
+            'getUpdates', {"offset": offset, "timeout": timeout}, timeout=timeout + self.transport.timeout
+        )
+        return GetUpdatesResponse(**data)
 
-        return GetUpdatesResponse(**response.json())
+    def set_webhook(self, url: str, secret_token: str) -> bool:
+        """Deliver the message updates to the URL instead of getUpdates"""
+        data = self.transport.call(
+            'setWebhook', {"url": url, "secret_token": secret_token, "allowed_updates": ["message"]}
+        )
+        return data['result']
 
     def send_message(self, chat_id: int, text: str) -> SendMessageResponse:
         """Send message to user"""
-        url = self.get_url('sendMessage')
-        response = requests.post(url=url, json={"chat_id": chat_id, "text": text})
-        return SendMessageResponse(**response.json())
+        data = self.transport.call('sendMessage', {"chat_id": chat_id, "text": text}, chat_id=chat_id)
+        return SendMessageResponse(**data)
+
+    def queue_message(self, chat_id: int, text: str) -> None:
+        """Send message to user in the background, joined with the other messages queued for the chat"""
+        if self._outbound is None:
+            self._outbound = OutboundQueue(self.transport)
+        self._outbound.put(chat_id, text)
+
+    def flush(self, timeout: Optional[float] = None) -> bool:
+        """Wait for the queued messages"""
+        return self._outbound is None or self._outbound.flush(timeout)
@@ -0,0 +1,119 @@
+import time
+from datetime import timedelta
+from enum import Enum
+from typing import Optional
+
+from django.conf import settings
+from django.core.cache import cache
+from django.utils import timezone
+
+from bot.cache import MISSING, TTLCache
+from bot.models import ChatState
+from bot.tg.fsm.base import Storage
+from core.cache import is_shared_cache
+
+# Expired rows are deleted at most this often
+PURGE_INTERVAL = 3600
+
+
+def _version_key(chat_id: int) -> str:
+    return f"bot:fsm:version:{chat_id}"
+
+
+class DatabaseStorage(Storage):
+    """Chat states in the ChatState table, shared by the bot processes.
+
+    The state of a conversation idle for TG_FSM_TTL seconds is gone. With a shared cache backend
+    (REDIS_CACHE_URL) read entries are kept in a bounded in-process LRU cache, an entry is used while
+    the version of the chat in the shared cache is the one it was read with, every write sets a new
+    version. With the per process local memory cache every read goes to the database. Reads never
+    create rows or entries for chats without a state beyond the bounded cache.
+    """
+
+    def __init__(self, state_type: type[Enum], ttl: Optional[int] = None, cache_size: Optional[int] = None,
+                 cache_ttl: Optional[float] = None):
+        self.state_type = state_type
+        self.ttl = timedelta(seconds=ttl if ttl is not None else settings.TG_FSM_TTL)
+        self.front = TTLCache(
+            cache_size if cache_size is not None else settings.TG_FSM_CACHE_SIZE,
+            cache_ttl if cache_ttl is not None else settings.TG_FSM_CACHE_TTL,
+        )
+        self.purged = 0.0
+        self.cached = is_shared_cache()
+
+    def _load(self, chat_id: int) -> Optional[tuple]:
+        """(state, data) of the chat, None without a live state"""
+        if not self.cached:
+            return self._query(chat_id)
+        version = cache.get(_version_key(chat_id))
+        entry = self.front.get(chat_id)
+        if entry is not MISSING and entry[0] == version:
+            return entry[1]
+        row = self._query(chat_id)
+        self.front.set(chat_id, (version, row))
+        return row
+
+    def _query(self, chat_id: int) -> Optional[tuple]:
+        return ChatState.objects.filter(
+            chat_id=chat_id, updated__gte=timezone.now() - self.ttl
+        ).values_list('state', 'data').first()
+
+    def _new_version(self, chat_id: int) -> int:
+        """Make the entries of the other processes stale, the key expires with the conversation"""
+        version = time.time_ns()
+        cache.set(_version_key(chat_id), version, self.ttl.total_seconds())
+        return version
+
+    def _save(self, chat_id: int, state, data: dict) -> None:
+        """Upsert with one query and a new version of the chat"""
+        ChatState.objects.bulk_create(
+            [ChatState(chat_id=chat_id, state=state, data=data)],
+            update_conflicts=True, unique_fields=['chat_id'], update_fields=['state', 'data', 'updated'],
+        )
+        if self.cached:
+            self.front.set(chat_id, (self._new_version(chat_id), (state, data)))
+
+    def get_state(self, chat_id: int) -> Enum | None:
+        row = self._load(chat_id)
+        if row is None or row[0] is None:
+            return None
+        return self.state_type(row[0])
+
+    def get_data(self, chat_id: int) -> dict:
+        row = self._load(chat_id)
+        return dict(row[1]) if row is not None else {}
+
+    def set_state(self, chat_id: int, state: Enum) -> None:
+        self._save(chat_id, state.value, self.get_data(chat_id))
+
+    def set_data(self, chat_id: int, data: dict) -> None:
+        row = self._load(chat_id)
+        self._save(chat_id, row[0] if row is not None else None, dict(data))
+
+    def reset_state(self, chat_id: int) -> None:
+        if self._load(chat_id) is not None:
+            self._save(chat_id, None, self.get_data(chat_id))
+
+    def reset_data(self, chat_id: int) -> None:
+        row = self._load(chat_id)
+        if row is not None:
+            self._save(chat_id, row[0], {})
+
+    def reset(self, chat_id: int) -> bool:
+        deleted, _ = ChatState.objects.filter(chat_id=chat_id).delete()
+        if self.cached:
+            self._new_version(chat_id)
+            self.front.delete(chat_id)
+        return bool(deleted)
+
+    def update_data(self, chat_id: int, **kwargs) -> None:
+        self.set_data(chat_id, {**self.get_data(chat_id), **kwargs})
+
+    def purge(self) -> int:
+        """Delete the expired states, at most once in PURGE_INTERVAL seconds"""
+        now = time.monotonic()
+        if self.purged and now - self.purged < PURGE_INTERVAL:
+            return 0
+        self.purged = now
+        deleted, _ = ChatState.objects.filter(updated__lt=timezone.now() - self.ttl).delete()
+        return deleted
@@ -0,0 +1,107 @@
+import asyncio
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Optional
+
+from django.db import close_old_connections
+
+from bot.tg.client import TgClient
+from bot.tg.models import GetUpdatesResponse, SendMessageResponse, UpdateObj
+
+logger = logging.getLogger(__name__)
+
+
+class AsyncTgClient:
+    """Awaitable TgClient calls, run in the executor so the event loop never waits for Telegram"""
+
+    def __init__(self, client: TgClient, executor: ThreadPoolExecutor):
+        self.client = client
+        self.executor = executor
+
+    async def get_updates(self, offset: int = 0, timeout: int = 30) -> GetUpdatesResponse:
+        return await asyncio.get_running_loop().run_in_executor(
+            self.executor, self.client.get_updates, offset, timeout
+        )
+
+    async def send_message(self, chat_id: int, text: str) -> SendMessageResponse:
+        return await asyncio.get_running_loop().run_in_executor(
+            self.executor, self.client.send_message, chat_id, text
+        )
+
+
+def _handle_in_thread(handler: Callable, argument) -> None:
+    """Run a synchronous handler with the connection handling Django does around a request"""
+    close_old_connections()
+    try:
+        handler(argument)
+    finally:
+        close_old_connections()
+
+
+class ChatDispatcher:
+    """Handles updates of different chats concurrently and the updates of one chat in order.
+
+    Every chat with pending updates has a queue drained by one task, the task ends with the queue,
+    so idle chats take no memory. At most `concurrency` handlers run at a time in the thread pool,
+    and at most `max_pending` updates wait, `dispatch()` blocks the poller beyond that.
+    """
+
+    def __init__(self, handler: Callable[[UpdateObj], None], executor: ThreadPoolExecutor,
+                 concurrency: int, max_pending: int):
+        self.handler = handler
+        self.executor = executor
+        self.running = asyncio.Semaphore(concurrency)
+        self.pending = asyncio.Semaphore(max_pending)
+        self.queues: dict[int, asyncio.Queue] = {}
+        self.tasks: set[asyncio.Task] = set()
+
+    async def dispatch(self, update: UpdateObj) -> None:
+        await self.pending.acquire()
+        chat_id = update.message.chat.id
+        queue = self.queues.get(chat_id)
+        if queue is None:
+            queue = self.queues[chat_id] = asyncio.Queue()
+            task = asyncio.create_task(self._drain(chat_id, queue))
+            self.tasks.add(task)
+            task.add_done_callback(self.tasks.discard)
+        queue.put_nowait(update)
+
+    async def _drain(self, chat_id: int, queue: asyncio.Queue) -> None:
+        loop = asyncio.get_running_loop()
+        while not queue.empty():
+            update = queue.get_nowait()
+            try:
+                async with self.running:
+                    await loop.run_in_executor(self.executor, _handle_in_thread, self.handler, update)
+            except Exception:
+                logger.exception("Update %s of chat %s failed", update.update_id, chat_id)
+            finally:
+                self.pending.release()
+        # Nothing is awaited between the empty check and here, no update can be queued in between
+        del self.queues[chat_id]
+
+    async def join(self) -> None:
+        """Wait for the updates dispatched so far"""
+        while self.tasks:
+            await asyncio.gather(*self.tasks)
+
+
+async def run_polling(client: AsyncTgClient, dispatcher: ChatDispatcher, stop: Optional[asyncio.Event] = None,
+                      preload: Optional[Callable[[list[UpdateObj]], None]] = None) -> None:
+    """Long poll the updates and dispatch them until `stop` is set, `preload` gets every batch first"""
+    offset = 0
+    while stop is None or not stop.is_set():
+        try:
+            response = await client.get_updates(offset=offset)
+        except Exception:
+            logger.exception("Cannot get updates")
+            await asyncio.sleep(1)
+            continue
+        if preload is not None and response.result:
+            await asyncio.get_running_loop().run_in_executor(
+                dispatcher.executor, _handle_in_thread, preload, response.result
+            )
+        for update in response.result:
+            offset = update.update_id + 1
+            await dispatcher.dispatch(update)
+    await dispatcher.join()
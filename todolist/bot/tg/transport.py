@@ -0,0 +1,257 @@
+import logging
+import threading
+import time
+from collections import OrderedDict
+from typing import Callable, Optional
+
+import requests
+from django.conf import settings
+from requests.adapters import HTTPAdapter
+
+logger = logging.getLogger(__name__)
+
+# Longest text of one message
+MESSAGE_LENGTH = 4096
+
+
+class TelegramError(Exception):
+    """Bot API call that failed after the retries"""
+
+    def __init__(self, description: str, error_code: Optional[int] = None):
+        super().__init__(description)
+        self.error_code = error_code
+
+
+class TokenBucket:
+    """`rate` tokens per second, at most `capacity` saved up"""
+
+    def __init__(self, rate: float, capacity: float, clock: Callable[[], float] = time.monotonic):
+        self.rate = rate
+        self.capacity = capacity
+        self.clock = clock
+        self.tokens = capacity
+        self.checked = clock()
+        self.blocked_until = 0.0
+
+    def _refill(self) -> float:
+        now = self.clock()
+        self.tokens = min(self.capacity, self.tokens + (now - self.checked) * self.rate)
+        self.checked = now
+        return now
+
+    def wait_time(self) -> float:
+        """Seconds until a token is available"""
+        now = self._refill()
+        return max(self.blocked_until - now, (1 - self.tokens) / self.rate, 0.0)
+
+    def take(self) -> None:
+        self._refill()
+        self.tokens -= 1
+
+    def block(self, seconds: float) -> None:
+        """No tokens for the seconds, Telegram asked to retry after them"""
+        self.blocked_until = max(self.blocked_until, self.clock() + seconds)
+        self.tokens = 0
+
+
+class RateLimits:
+    """Global and per chat token buckets of the sent messages.
+
+    The buckets of the least recently used chats are dropped beyond `max_chats`, they are full
+    again after a few idle seconds anyway.
+    """
+
+    def __init__(self, rate: float, chat_rate: float, chat_burst: float, max_chats: int = 10000,
+                 clock: Callable[[], float] = time.monotonic, sleep: Callable[[float], None] = time.sleep):
+        self.chat_rate = chat_rate
+        self.chat_burst = chat_burst
+        self.max_chats = max_chats
+        self.clock = clock
+        self.sleep = sleep
+        self.bucket = TokenBucket(rate, max(rate, 1), clock)
+        self.chats: OrderedDict[int, TokenBucket] = OrderedDict()
+        self.lock = threading.Lock()
+
+    def _chat(self, chat_id: int) -> TokenBucket:
+        bucket = self.chats.get(chat_id)
+        if bucket is None:
+            bucket = self.chats[chat_id] = TokenBucket(self.chat_rate, self.chat_burst, self.clock)
+            if len(self.chats) > self.max_chats:
+                self.chats.popitem(last=False)
+        self.chats.move_to_end(chat_id)
+        return bucket
+
+    def _buckets(self, chat_id: Optional[int]) -> list[TokenBucket]:
+        return [self.bucket] if chat_id is None else [self.bucket, self._chat(chat_id)]
+
+    def wait_time(self, chat_id: Optional[int] = None) -> float:
+        """Seconds until a message to the chat may be sent, no token is taken"""
+        with self.lock:
+            return max(bucket.wait_time() for bucket in self._buckets(chat_id))
+
+    def acquire(self, chat_id: Optional[int] = None) -> None:
+        """Sleep until a message to the chat may be sent"""
+        while True:
+            with self.lock:
+                buckets = self._buckets(chat_id)
+                wait = max(bucket.wait_time() for bucket in buckets)
+                if wait <= 0:
+                    for bucket in buckets:
+                        bucket.take()
+                    return
+            self.sleep(wait)
+
+    def block(self, seconds: float) -> None:
+        with self.lock:
+            self.bucket.block(seconds)
+
+
+class Transport:
+    """Bot API calls over one pooled session with timeouts, rate limits and retries.
+
+    Connection errors and server errors are retried with an exponential backoff, a `retry_after`
+    answer blocks every send of the process for the seconds Telegram asked for. Calls that may
+    have reached Telegram (read timeouts) are not retried, a message would be sent twice.
+    """
+
+    def __init__(self, token: str, limits: RateLimits, pool_size: int = 10, timeout: float = 10,
+                 retries: int = 3, backoff: float = 0.5, sleep: Callable[[float], None] = time.sleep):
+        self.base_url = f'https://api.telegram.org/bot{token}/'
+        self.limits = limits
+        self.pool_size = pool_size
+        self.timeout = timeout
+        self.retries = retries
+        self.backoff = backoff
+        self.sleep = sleep
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=pool_size)
+        self.session.mount('https://', adapter)
+
+    def call(self, method: str, payload: dict, chat_id: Optional[int] = None,
+             timeout: Optional[float] = None) -> dict:
+        """Result of the Bot API method, sends to a chat wait for its rate limits"""
+        error = TelegramError(f"{method} failed")
+        for attempt in range(self.retries + 1):
+            if chat_id is not None:
+                self.limits.acquire(chat_id)
+            try:
+                response = self.session.post(
+                    self.base_url + method, json=payload, timeout=(self.timeout, timeout or self.timeout)
+                )
+                data = response.json()
+            except requests.ConnectionError as exception:
+                error = TelegramError(f"{method}: {exception}")
+                self.sleep(self.backoff * 2 ** attempt)
+                continue
+            except (requests.RequestException, ValueError) as exception:
+                raise TelegramError(f"{method}: {exception}") from exception
+
+            if data.get('ok'):
+                return data
+            error = TelegramError(data.get('description', f"{method} failed"), data.get('error_code'))
+            retry_after = (data.get('parameters') or {}).get('retry_after')
+            if retry_after is not None:
+                logger.warning("Telegram asked to retry %s after %s seconds", method, retry_after)
+                if chat_id is not None:
+                    self.limits.block(retry_after)
+                else:
+                    self.sleep(retry_after)
+            elif response.status_code >= 500:
+                self.sleep(self.backoff * 2 ** attempt)
+            else:
+                raise error
+        raise error
+
+
+def batches(texts: list[str], length: int = MESSAGE_LENGTH) -> list[str]:
+    """Texts joined into as few messages as fit the length"""
+    messages = []
+    for text in texts:
+        if messages and len(messages[-1]) + 1 + len(text) <= length:
+            messages[-1] += '\n' + text
+        else:
+            messages.append(text)
+    return messages
+
+
+class OutboundQueue:
+    """Messages sent by background threads in the order they were queued in every chat.
+
+    A chat is sent to by one thread at a time, `workers` threads (the connection pool size of the
+    transport by default) send to different chats. A thread skips the chats that have to wait for
+    their rate limit, so a busy chat does not hold up the others. The messages queued for a chat
+    while it waits for its turn are sent together, joined into as few messages as possible.
+    Messages Telegram refused after the transport retries are logged and dropped.
+    """
+
+    def __init__(self, transport: Transport, workers: Optional[int] = None):
+        self.transport = transport
+        self.workers = workers or transport.pool_size
+        self.pending: OrderedDict[int, list[str]] = OrderedDict()
+        self.sending: set[int] = set()
+        self.condition = threading.Condition()
+        self.threads: list[threading.Thread] = []
+
+    def put(self, chat_id: int, text: str) -> None:
+        with self.condition:
+            self.pending.setdefault(chat_id, []).append(text)
+            while len(self.threads) < self.workers:
+                thread = threading.Thread(target=self._run, name=f'tg-outbound-{len(self.threads)}', daemon=True)
+                self.threads.append(thread)
+                thread.start()
+            self.condition.notify_all()
+
+    def _take(self) -> tuple[Optional[int], Optional[float]]:
+        """The first chat that may be sent to now, or the seconds until one may be"""
+        wait = None
+        for chat_id in self.pending:
+            if chat_id in self.sending:
+                continue
+            delay = self.transport.limits.wait_time(chat_id)
+            if delay <= 0:
+                self.sending.add(chat_id)
+                return chat_id, None
+            wait = delay if wait is None else min(wait, delay)
+        return None, wait
+
+    def _run(self) -> None:
+        while True:
+            with self.condition:
+                chat_id, wait = self._take()
+                while chat_id is None:
+                    self.condition.wait(wait)
+                    chat_id, wait = self._take()
+                messages = batches(self.pending.pop(chat_id))
+            try:
+                self.transport.call('sendMessage', {'chat_id': chat_id, 'text': messages[0]}, chat_id=chat_id)
+            except TelegramError:
+                logger.exception("Cannot send a message to chat %s", chat_id)
+            finally:
+                with self.condition:
+                    # The rest goes back ahead of the messages queued meanwhile, behind the other chats
+                    rest = messages[1:] + self.pending.pop(chat_id, [])
+                    if rest:
+                        self.pending[chat_id] = rest
+                    self.sending.discard(chat_id)
+                    self.condition.notify_all()
+
+    def flush(self, timeout: Optional[float] = None) -> bool:
+        """Wait until every queued message is sent, False on timeout"""
+        with self.condition:
+            return self.condition.wait_for(lambda: not self.pending and not self.sending, timeout)
+
+
+_transports: dict[str, Transport] = {}
+_transports_lock = threading.Lock()
+
+
+def shared_transport(token: str) -> Transport:
+    """One transport per token in the process, so that the clients share connections and rate limits"""
+    with _transports_lock:
+        if token not in _transports:
+            _transports[token] = Transport(token, RateLimits(
+                rate=settings.TG_MESSAGES_PER_SECOND,
+                chat_rate=settings.TG_CHAT_MESSAGES_PER_SECOND,
+                chat_burst=settings.TG_CHAT_MESSAGE_BURST,
+            ), pool_size=settings.TG_POOL_SIZE, timeout=settings.TG_TIMEOUT)
+        return _transports[token]
@@ -5,4 +5,5 @@ from bot import views
 
 urlpatterns = [
     path("verify", views.VerificationView.as_view(), name='verify-user'),
+    path("webhook", views.WebhookView.as_view(), name='webhook'),
 ]
@@ -0,0 +1,73 @@
+import time
+from typing import Iterable, Optional
+
+from django.conf import settings
+from django.core.cache import cache
+
+from bot.cache import MISSING, TTLCache
+from bot.models import TgUser
+from core.cache import is_shared_cache
+
+
+def _version_key(chat_id: int) -> str:
+    return f"bot:tguser:version:{chat_id}"
+
+
+def invalidate_tg_user(chat_id: int) -> None:
+    """Make every bot process read the Telegram user of the chat again"""
+    cache.set(_version_key(chat_id), time.time_ns(), None)
+
+
+class TgUserCache:
+    """Telegram users of the chats with their users, kept in the process.
+
+    At most TG_USER_CACHE_SIZE chats for TG_USER_CACHE_TTL seconds. With a shared cache backend
+    (REDIS_CACHE_URL) an entry is used while the version of the chat in the shared cache is the one
+    it was read with, saving or deleting a TgUser anywhere sets a new version. `preload()` reads the
+    versions of a batch of updates at once and the handlers of the batch reuse them. With the per
+    process local memory cache the changes made by the other processes are not seen, the users are
+    read again for every batch.
+    """
+
+    def __init__(self, max_size: Optional[int] = None, ttl: Optional[float] = None):
+        self.front = TTLCache(
+            max_size if max_size is not None else settings.TG_USER_CACHE_SIZE,
+            ttl if ttl is not None else settings.TG_USER_CACHE_TTL,
+        )
+        self.shared = is_shared_cache()
+        self.versions: dict[int, Optional[int]] = {}
+
+    def _cached(self, chat_id: int, version: Optional[int]) -> Optional[TgUser]:
+        entry = self.front.get(chat_id)
+        if entry is not MISSING and entry[0] == version:
+            return entry[1]
+        return None
+
+    def preload(self, chat_ids: Iterable[int]) -> None:
+        """Read the versions of the chats and the users missing from the cache, one round trip each"""
+        chat_ids = set(chat_ids)
+        if self.shared:
+            versions = cache.get_many([_version_key(chat_id) for chat_id in chat_ids])
+            versions = {chat_id: versions.get(_version_key(chat_id)) for chat_id in chat_ids}
+        else:
+            # A version of its own makes the entries of the previous batches stale
+            versions = dict.fromkeys(chat_ids, time.time_ns())
+        self.versions = versions
+        stale = [chat_id for chat_id in chat_ids if self._cached(chat_id, versions[chat_id]) is None]
+        if stale:
+            for tg_user in TgUser.objects.select_related('user').filter(chat_id__in=stale):
+                self.front.set(tg_user.chat_id, (versions[tg_user.chat_id], tg_user))
+
+    def get_or_create(self, chat_id: int, username: Optional[str]) -> TgUser:
+        # The version is read before the row, an update in between makes the entry stale at once
+        version = self.versions.get(chat_id, MISSING)
+        if version is MISSING and self.shared:
+            version = cache.get(_version_key(chat_id))
+        tg_user = self._cached(chat_id, version) if version is not MISSING else None
+        if tg_user is None:
+            tg_user, _ = TgUser.objects.select_related('user').get_or_create(
+                chat_id=chat_id, defaults={'username': username}
+            )
+            if version is not MISSING:
+                self.front.set(chat_id, (version, tg_user))
+        return tg_user
@@ -1,10 +1,15 @@
+import hmac
+
+from django.conf import settings
 from rest_framework import generics, permissions
+from rest_framework.exceptions import NotFound, PermissionDenied
 from rest_framework.response import Response
+from rest_framework.views import APIView
 
-from backend import settings
 from bot.models import TgUser
 from bot.serializers import TgUserSerializer
 from bot.tg.client import TgClient
+from bot.webhook import enqueue
 
 
 class VerificationView(generics.GenericAPIView):
@@ -23,3 +28,20 @@ class VerificationView(generics.GenericAPIView):
         instance_s: TgUserSerializer = self.get_serializer(tg_user)
         TgClient(settings.TG_TOKEN).send_message(tg_user.chat_id, '[verification_completed]')
         return Response(instance_s.data)
+
+
+class WebhookView(APIView):
+    """Telegram updates queued for `runbot --webhook`, answered at once"""
+    authentication_classes = []
+    permission_classes = [permissions.AllowAny]
+
+    def post(self, request, *args, **kwargs):
+        secret = settings.TG_WEBHOOK_SECRET
+        if not secret:
+            raise NotFound
+        token = request.headers.get('X-Telegram-Bot-Api-Secret-Token', '')
+        if not hmac.compare_digest(token.encode(), secret.encode()):
+            raise PermissionDenied
+        # Telegram delivers an update again until it gets a 2xx answer, the unsupported ones are dropped
+        enqueue(request.data)
+        return Response({})
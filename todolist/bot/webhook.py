@@ -0,0 +1,88 @@
+import logging
+import time
+from datetime import timedelta
+from typing import Callable, Optional
+
+from django.db import transaction
+from django.db.models import OuterRef, Q, QuerySet, Subquery
+from django.utils import timezone
+from pydantic import ValidationError
+
+from bot.models import TgUpdate
+from bot.tg.models import UpdateObj
+
+logger = logging.getLogger(__name__)
+
+# Handled updates are kept this long to drop the ones Telegram delivers again
+HANDLED_RETENTION = timedelta(days=1)
+# Handled updates are deleted at most this often
+PURGE_INTERVAL = 3600
+
+
+def enqueue(payload: dict) -> bool:
+    """Store the update for the dispatcher with one insert, False when it is not a message update"""
+    try:
+        update = UpdateObj.parse_obj(payload)
+    except ValidationError:
+        return False
+    TgUpdate.objects.bulk_create(
+        [TgUpdate(update_id=update.update_id, chat_id=update.message.chat.id, payload=payload)],
+        ignore_conflicts=True,
+    )
+    return True
+
+
+def claim(limit: int) -> QuerySet:
+    """The oldest pending update of every chat, locked for the transaction.
+
+    Only the first pending update of a chat can be claimed, so the updates of one chat are handled
+    in order even by several dispatchers, a dispatcher skips the updates another one has locked.
+    """
+    first_pending = TgUpdate.objects.filter(
+        chat_id=OuterRef('chat_id'), handled__isnull=True
+    ).order_by('id').values('id')[:1]
+    return TgUpdate.objects.select_for_update(skip_locked=True).filter(
+        Q(id=Subquery(first_pending)), handled__isnull=True
+    ).order_by('id')[:limit]
+
+
+class UpdateDispatcher:
+    """Runs the bot handler for the updates queued by the webhook.
+
+    The updates of a batch are marked handled in the transaction the handler runs in, an update
+    whose handler failed is marked with the error and is not retried.
+    """
+
+    def __init__(self, handler: Callable[[UpdateObj], None], batch_size: int = 100,
+                 preload: Optional[Callable[[list[UpdateObj]], None]] = None):
+        self.handler = handler
+        self.batch_size = batch_size
+        self.preload = preload
+        self.purged = 0.0
+
+    def run_once(self) -> int:
+        """Handle a batch of the pending updates, return its size"""
+        with transaction.atomic():
+            updates = list(claim(self.batch_size))
+            items = [UpdateObj.parse_obj(update.payload) for update in updates]
+            if self.preload is not None and items:
+                self.preload(items)
+            for update, item in zip(updates, items):
+                try:
+                    with transaction.atomic():
+                        self.handler(item)
+                except Exception as error:
+                    logger.exception("Update %s of chat %s failed", update.update_id, update.chat_id)
+                    update.error = repr(error)
+                update.handled = timezone.now()
+            TgUpdate.objects.bulk_update(updates, ['handled', 'error'])
+        return len(updates)
+
+    def purge(self) -> int:
+        """Delete the updates handled before the retention time, at most once in PURGE_INTERVAL seconds"""
+        now = time.monotonic()
+        if self.purged and now - self.purged < PURGE_INTERVAL:
+            return 0
+        self.purged = now
+        deleted, _ = TgUpdate.objects.filter(handled__lt=timezone.now() - HANDLED_RETENTION).delete()
+        return deleted
@@ -0,0 +1,8 @@
+from django.core.cache import caches
+from django.core.cache.backends.dummy import DummyCache
+from django.core.cache.backends.locmem import LocMemCache
+
+
+def is_shared_cache() -> bool:
+    """Whether every process sees the writes to the default cache, the local memory cache is per process"""
+    return not isinstance(caches['default'], (LocMemCache, DummyCache))
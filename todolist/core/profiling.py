@@ -0,0 +1,139 @@
+import json
+import logging
+import random
+import time
+from contextlib import ExitStack, contextmanager
+from contextvars import ContextVar
+from functools import wraps
+from typing import Callable, Iterator, Optional
+
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.db import connections
+from django.http import HttpRequest, HttpResponse
+
+logger = logging.getLogger(__name__)
+
+_current: ContextVar[Optional["RequestProfile"]] = ContextVar("request_profile", default=None)
+
+
+class RequestProfile:
+    """SQL statements and named durations of one request"""
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.queries: list[tuple[float, str]] = []
+        self.durations: dict[str, float] = {}
+
+    @property
+    def sql_time(self) -> float:
+        return sum(duration for duration, _ in self.queries)
+
+    def add(self, name: str, duration: float) -> None:
+        self.durations[name] = self.durations.get(name, 0.0) + duration
+
+    def execute(self, execute, sql, params, many, context):
+        """Database execute wrapper recording the statement duration"""
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.queries.append((time.perf_counter() - started, sql))
+
+
+@contextmanager
+def measure(name: str) -> Iterator[None]:
+    """Add the duration of the block to the current request profile, if the request is profiled"""
+    profile = _current.get()
+    if profile is None:
+        yield
+        return
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        profile.add(name, time.perf_counter() - started)
+
+
+def _timed(name: str, function: Callable) -> Callable:
+    @wraps(function)
+    def wrapper(*args, **kwargs):
+        with measure(name):
+            return function(*args, **kwargs)
+    return wrapper
+
+
+_drf_hooks_installed = False
+
+
+def install_drf_hooks() -> None:
+    """Time DRF permission checks and serialization, only called when profiling is enabled"""
+    global _drf_hooks_installed
+    if _drf_hooks_installed:
+        return
+    from rest_framework.serializers import BaseSerializer
+    from rest_framework.views import APIView
+
+    APIView.check_permissions = _timed("permissions", APIView.check_permissions)
+    APIView.check_object_permissions = _timed("permissions", APIView.check_object_permissions)
+    # Serializer.data and ListSerializer.data call BaseSerializer.data once
+    BaseSerializer.data = property(_timed("serializer", BaseSerializer.data.fget))
+    _drf_hooks_installed = True
+
+
+class ProfilingMiddleware:
+    """Query count, SQL time, the slowest statements and serializer and permission durations of sampled requests.
+
+    The profile is sent in the `Server-Timing` header and requests slower than PROFILING_SLOW_REQUEST_MS
+    are logged as JSON. With PROFILING_SAMPLE_RATE = 0 the middleware removes itself at startup.
+    """
+
+    def __init__(self, get_response: Callable[[HttpRequest], HttpResponse]):
+        self.sample_rate = settings.PROFILING_SAMPLE_RATE
+        if self.sample_rate <= 0:
+            raise MiddlewareNotUsed
+        self.slow_request = settings.PROFILING_SLOW_REQUEST_MS / 1000
+        self.slowest_queries = settings.PROFILING_SLOWEST_QUERIES
+        self.get_response = get_response
+        install_drf_hooks()
+
+    def __call__(self, request: HttpRequest) -> HttpResponse:
+        if self.sample_rate < 1 and random.random() >= self.sample_rate:
+            return self.get_response(request)
+
+        profile = RequestProfile()
+        token = _current.set(profile)
+        try:
+            with ExitStack() as stack:
+                for connection in connections.all():
+                    stack.enter_context(connection.execute_wrapper(profile.execute))
+                response = self.get_response(request)
+        finally:
+            _current.reset(token)
+        total = time.perf_counter() - profile.started
+
+        response.headers["Server-Timing"] = self.server_timing(profile, total)
+        if total >= self.slow_request:
+            logger.warning(json.dumps(self.log_record(request, response, profile, total)))
+        return response
+
+    @staticmethod
+    def server_timing(profile: RequestProfile, total: float) -> str:
+        metrics = [f'sql;dur={profile.sql_time * 1000:.1f};desc="{len(profile.queries)} queries"']
+        metrics.extend(f"{name};dur={duration * 1000:.1f}" for name, duration in profile.durations.items())
+        metrics.append(f"total;dur={total * 1000:.1f}")
+        return ", ".join(metrics)
+
+    def log_record(self, request: HttpRequest, response: HttpResponse, profile: RequestProfile, total: float) -> dict:
+        slowest = sorted(profile.queries, key=lambda query: query[0], reverse=True)[:self.slowest_queries]
+        return {
+            "event": "slow_request",
+            "method": request.method,
+            "path": request.get_full_path(),
+            "status": response.status_code,
+            "duration_ms": round(total * 1000, 1),
+            "queries": len(profile.queries),
+            "sql_ms": round(profile.sql_time * 1000, 1),
+            **{f"{name}_ms": round(duration * 1000, 1) for name, duration in profile.durations.items()},
+            "slowest_queries": [{"ms": round(duration * 1000, 1), "sql": sql} for duration, sql in slowest],
+        }
@@ -1,9 +1,10 @@
 from django.contrib import admin
 from goals.models import GoalCategory, Goal, GoalComment
+from goals.search import FullTextSearchAdminMixin
 
 
 @admin.register(GoalCategory)
-class GoalCategoryAdmin(admin.ModelAdmin):
+class GoalCategoryAdmin(FullTextSearchAdminMixin, admin.ModelAdmin):
     list_display = ("id", "title", "user", "created", "is_deleted", )
     list_display_links = ("title", )
     search_fields = ("title",)
@@ -12,7 +13,7 @@ class GoalCategoryAdmin(admin.ModelAdmin):
 
 
 @admin.register(Goal)
-class GoalAdmin(admin.ModelAdmin):
+class GoalAdmin(FullTextSearchAdminMixin, admin.ModelAdmin):
     list_display = ("id", "title", "user", "category", "status", "priority", )
     list_display_links = ("title", )
     search_fields = ("title", "description", )
@@ -21,7 +22,7 @@ class GoalAdmin(admin.ModelAdmin):
 
 
 @admin.register(GoalComment)
-class GoalCommentsAdmin(admin.ModelAdmin):
+class GoalCommentsAdmin(FullTextSearchAdminMixin, admin.ModelAdmin):
     list_display = ("id", "user", "text", )
     list_display_links = ("text",)
     search_fields = ("text", )
@@ -0,0 +1,72 @@
+from typing import Optional
+
+from django.db import transaction
+from django.db.models import F
+from django.utils import timezone
+
+from goals.cache import bump_board_generation
+from goals.models import ArchivalJob, Board, Goal, GoalCategory
+
+
+def schedule_board_archival(board: Board) -> ArchivalJob:
+    """Mark the board deleted now, leave its categories and goals to the archival worker"""
+    with transaction.atomic():
+        board.is_deleted = True
+        board.save(update_fields=('is_deleted', 'updated'))
+        return ArchivalJob.objects.create(board=board)
+
+
+def schedule_category_archival(category: GoalCategory) -> ArchivalJob:
+    """Mark the category deleted now, leave its goals to the archival worker"""
+    with transaction.atomic():
+        category.is_deleted = True
+        category.save(update_fields=('is_deleted', 'updated'))
+        return ArchivalJob.objects.create(board_id=category.board_id, category=category)
+
+
+def _archive_chunk(job: ArchivalJob, chunk_size: int) -> bool:
+    """Archive the next chunk of the job, False when nothing is left"""
+    now = timezone.now()
+    if job.category_id is None:
+        categories = GoalCategory.objects.filter(board_id=job.board_id, is_deleted=False)
+        category_ids = list(categories.values_list('id', flat=True)[:chunk_size])
+        if category_ids:
+            archived = GoalCategory.objects.filter(id__in=category_ids).update(is_deleted=True, updated=now)
+            job.categories_archived = F('categories_archived') + archived
+            return True
+        goals = Goal.objects.filter(board_id=job.board_id)
+    else:
+        goals = Goal.objects.filter(category_id=job.category_id)
+
+    goal_ids = list(goals.exclude(status=Goal.Status.archived).values_list('id', flat=True)[:chunk_size])
+    if goal_ids:
+        archived = Goal.objects.filter(id__in=goal_ids).update(status=Goal.Status.archived, updated=now)
+        job.goals_archived = F('goals_archived') + archived
+        return True
+    return False
+
+
+def process_next_chunk(chunk_size: int) -> Optional[ArchivalJob]:
+    """Archive one chunk of the oldest unfinished job in its own transaction.
+
+    Every chunk only picks rows that are not archived yet and the progress is saved in the same
+    transaction, so the worker may be stopped at any moment and started again. The bulk updates
+    send no signals, the cached responses of the board are reset after the commit.
+    """
+    with transaction.atomic():
+        job = ArchivalJob.objects.select_for_update(skip_locked=True).filter(
+            status__in=(ArchivalJob.Status.pending, ArchivalJob.Status.running)
+        ).order_by('id').first()
+        if job is None:
+            return None
+        archived = _archive_chunk(job, chunk_size)
+        if archived:
+            job.status = ArchivalJob.Status.running
+        else:
+            job.status = ArchivalJob.Status.done
+            job.finished = timezone.now()
+        job.save()
+    if archived:
+        bump_board_generation(job.board_id)
+    job.refresh_from_db()
+    return job
@@ -0,0 +1,209 @@
+import csv
+import json
+from dataclasses import dataclass, field
+from itertools import islice
+from typing import Callable, Iterable, Iterator, Optional
+
+from django.db import transaction
+from rest_framework import serializers
+
+from core.models import User
+from goals.cache import bump_board_generation
+from goals.models import Goal, GoalCategory, GoalComment, GoalImportRef
+from goals.roles import WRITE_ROLES, load_board_roles
+
+IMPORT_TYPES = ("ndjson", "csv")
+
+
+class GoalImportSerializer(serializers.Serializer):
+    """Goal record of the import, `ref` is its id in the source the comments refer to it by"""
+    ref = serializers.CharField(max_length=255, required=False)
+    category_id = serializers.IntegerField()
+    title = serializers.CharField(max_length=255)
+    description = serializers.CharField(allow_null=True, allow_blank=True, required=False)
+    status = serializers.ChoiceField(choices=Goal.Status.choices, required=False)
+    priority = serializers.ChoiceField(choices=Goal.Priority.choices, required=False)
+    due_date = serializers.DateTimeField(allow_null=True, required=False)
+
+
+class GoalCommentImportSerializer(serializers.Serializer):
+    """Comment record of the import, of an existing goal (`goal_id`) or of an imported one (`goal_ref`)"""
+    goal_id = serializers.IntegerField(required=False)
+    goal_ref = serializers.CharField(max_length=255, required=False)
+    text = serializers.CharField(max_length=255)
+
+    def validate(self, attrs: dict) -> dict:
+        if ("goal_id" in attrs) == ("goal_ref" in attrs):
+            raise serializers.ValidationError("Expected one of goal_id and goal_ref")
+        return attrs
+
+
+RECORD_SERIALIZERS = {
+    "goal": GoalImportSerializer,
+    "comment": GoalCommentImportSerializer,
+}
+
+
+@dataclass
+class ImportReport:
+    """Result of the import, `checkpoint` is the last line already committed"""
+    checkpoint: int = 0
+    goals: int = 0
+    comments: int = 0
+    errors: list[dict] = field(default_factory=list)
+
+    def as_dict(self) -> dict:
+        return {"checkpoint": self.checkpoint, "goals": self.goals, "comments": self.comments, "errors": self.errors}
+
+
+def _ndjson_records(lines: Iterable[str]) -> Iterator[tuple[int, Optional[dict]]]:
+    for number, line in enumerate(lines, start=1):
+        if not line.strip():
+            continue
+        try:
+            record = json.loads(line)
+        except ValueError:
+            record = None
+        yield number, record if isinstance(record, dict) else None
+
+
+def _csv_records(lines: Iterable[str]) -> Iterator[tuple[int, Optional[dict]]]:
+    # The header is line 1, every CSV record is expected on its own line
+    for number, row in enumerate(csv.DictReader(lines), start=2):
+        yield number, {key: value for key, value in row.items() if key and value not in ("", None)}
+
+
+def parse_records(lines: Iterable[str], import_type: str) -> Iterator[tuple[int, Optional[dict]]]:
+    """(line number, record) pairs read lazily from the lines, None for a record that cannot be parsed"""
+    if import_type == "csv":
+        return _csv_records(lines)
+    return _ndjson_records(lines)
+
+
+class GoalImporter:
+    """Validates and writes records one batch at a time.
+
+    Categories, goals and board roles are loaded once per batch, every valid record of the batch is
+    written with one bulk_create per model, invalid records are reported and skipped. The source ids
+    (`ref`) of the imported goals are stored with them, so a comment finds its goal by `goal_ref` in
+    the same batch, a later one or an import resumed after a checkpoint. A comment has to come after
+    its goal.
+    """
+
+    def __init__(self, user: User, batch_size: int = 1000):
+        self.user = user
+        self.batch_size = batch_size
+        self.report = ImportReport()
+
+    def run(
+            self,
+            records: Iterator[tuple[int, Optional[dict]]],
+            checkpoint: int = 0,
+            on_batch: Optional[Callable[[ImportReport], None]] = None,
+    ) -> ImportReport:
+        """Import the records after the checkpoint line, on_batch is called after every committed batch"""
+        self.report.checkpoint = checkpoint
+        records = ((number, record) for number, record in records if number > checkpoint)
+        while batch := list(islice(records, self.batch_size)):
+            self.import_batch(batch)
+            if on_batch is not None:
+                on_batch(self.report)
+        return self.report
+
+    def import_batch(self, batch: list[tuple[int, Optional[dict]]]) -> None:
+        """Validate the batch and write its valid records in one transaction"""
+        valid: dict[str, list[tuple[int, dict]]] = {kind: [] for kind in RECORD_SERIALIZERS}
+        for number, record in batch:
+            if record is None:
+                self.add_error(number, {"record": "Cannot parse the record"})
+                continue
+            kind = record.pop("type", "goal")
+            if kind not in RECORD_SERIALIZERS:
+                self.add_error(number, {"type": f"Unsupported record type: {kind}"})
+                continue
+            serializer = RECORD_SERIALIZERS[kind](data=record)
+            if serializer.is_valid():
+                valid[kind].append((number, serializer.validated_data))
+            else:
+                self.add_error(number, serializer.errors)
+
+        roles = load_board_roles(self.user.id)
+        categories = dict(GoalCategory.objects.filter(
+            id__in={values["category_id"] for _, values in valid["goal"]},
+            user=self.user,
+            is_deleted=False,
+            board__is_deleted=False,
+        ).values_list("id", "board_id"))
+        goal_refs = {values["ref"] for _, values in valid["goal"] if "ref" in values}
+        taken_refs = set(GoalImportRef.objects.filter(user=self.user, ref__in=goal_refs).values_list("ref", flat=True))
+
+        new_goals = []
+        new_refs = []
+        for number, values in valid["goal"]:
+            ref = values.pop("ref", None)
+            board_id = categories.get(values["category_id"])
+            if board_id is None or roles.get(board_id) not in WRITE_ROLES:
+                self.add_error(number, {"category_id": "Вам запрещено создавать цели для данной категории"})
+                continue
+            if ref in taken_refs:
+                self.add_error(number, {"ref": "Duplicate goal ref"})
+                continue
+            # bulk_create() does not call save(), the board is set here
+            goal = Goal(user=self.user, board_id=board_id, **values)
+            new_goals.append(goal)
+            if ref is not None:
+                taken_refs.add(ref)
+                new_refs.append(GoalImportRef(user=self.user, ref=ref, goal=goal))
+
+        with transaction.atomic():
+            Goal.objects.bulk_create(new_goals, batch_size=self.batch_size)
+            # The goals have their ids now
+            for goal_ref in new_refs:
+                goal_ref.goal_id = goal_ref.goal.id
+            GoalImportRef.objects.bulk_create(new_refs, batch_size=self.batch_size)
+
+            new_comments = self.build_comments(valid["comment"], roles)
+            GoalComment.objects.bulk_create(new_comments, batch_size=self.batch_size)
+
+        # bulk_create() does not send signals
+        boards = {goal.board_id for goal in new_goals} | {comment.board_id for comment in new_comments}
+        if boards:
+            bump_board_generation(*boards)
+        self.report.goals += len(new_goals)
+        self.report.comments += len(new_comments)
+        self.report.checkpoint = batch[-1][0]
+
+    def build_comments(self, valid: list[tuple[int, dict]], roles: dict[int, int]) -> list[GoalComment]:
+        """Comments of the goals the user may read, found by id or by the ref of an imported goal"""
+        goals = Goal.objects.filter(
+            board_id__in=list(roles), board__is_deleted=False
+        ).exclude(status=Goal.Status.archived)
+        by_id = dict(goals.filter(
+            id__in={values["goal_id"] for _, values in valid if "goal_id" in values},
+        ).values_list("id", "board_id"))
+        by_ref = {
+            ref: (goal_id, board_id)
+            for ref, goal_id, board_id in GoalImportRef.objects.filter(
+                user=self.user,
+                ref__in={values["goal_ref"] for _, values in valid if "goal_ref" in values},
+                goal__in=goals,
+            ).values_list("ref", "goal_id", "goal__board_id")
+        }
+
+        comments = []
+        for number, values in valid:
+            if "goal_ref" in values:
+                source = "goal_ref"
+                goal_id, board_id = by_ref.get(values.pop("goal_ref"), (None, None))
+            else:
+                source = "goal_id"
+                goal_id = values.pop("goal_id")
+                board_id = by_id.get(goal_id)
+            if board_id is None:
+                self.add_error(number, {source: "Goal not found"})
+                continue
+            comments.append(GoalComment(user=self.user, board_id=board_id, goal_id=goal_id, **values))
+        return comments
+
+    def add_error(self, number: int, errors: dict) -> None:
+        self.report.errors.append({"line": number, "errors": errors})
@@ -0,0 +1,87 @@
+import hashlib
+import time
+from typing import Iterable
+
+from django.conf import settings
+from django.core.cache import cache
+from django.utils.cache import get_conditional_response
+from rest_framework.response import Response
+
+from core.cache import is_shared_cache
+from goals.roles import get_board_roles
+
+HITS_KEY = "goals:response-cache:hits"
+MISSES_KEY = "goals:response-cache:misses"
+
+
+def _generation_key(board_id: int) -> str:
+    return f"goals:board-generation:{board_id}"
+
+
+def board_generations(board_ids: Iterable[int]) -> list[int]:
+    """Current generation of every board, boards without one get a fresh generation"""
+    keys = [_generation_key(board_id) for board_id in board_ids]
+    generations = cache.get_many(keys)
+    missing = {key: time.time_ns() for key in keys if key not in generations}
+    if missing:
+        cache.set_many(missing, None)
+        generations.update(missing)
+    return [generations[key] for key in keys]
+
+
+def bump_board_generation(*board_ids: int) -> None:
+    """Invalidate every cached response depending on the boards"""
+    generation = time.time_ns()
+    cache.set_many({_generation_key(board_id): generation for board_id in board_ids}, None)
+
+
+def _count(key: str) -> None:
+    if not cache.add(key, 1, None):
+        cache.incr(key)
+
+
+def response_cache_stats() -> dict[str, int]:
+    """Hit and miss counters of the response cache"""
+    stats = cache.get_many([HITS_KEY, MISSES_KEY])
+    return {"hits": stats.get(HITS_KEY, 0), "misses": stats.get(MISSES_KEY, 0)}
+
+
+class CachedListMixin:
+    """Per user and query string cache of the list response.
+
+    The key includes the generation of every board of the user, so a change of any of them
+    (see goals.signals) makes the old entries unreachable without deleting them. Only used with a
+    shared cache backend: the generations bumped by the other processes (web workers, `manage.py
+    archive`, `import_goals`) are not seen in a per process local memory cache.
+    """
+
+    def get_response_cache_key(self, request) -> str:
+        board_ids = sorted(get_board_roles(request))
+        raw = ":".join(str(value) for value in (
+            request.get_full_path(), *board_ids, *board_generations(board_ids)
+        ))
+        digest = hashlib.md5(raw.encode()).hexdigest()
+        return f"goals:response:{type(self).__name__}:{request.user.id}:{digest}"
+
+    def list(self, request, *args, **kwargs) -> Response:
+        timeout = settings.GOALS_RESPONSE_CACHE_TIMEOUT
+        if not timeout or not is_shared_cache():
+            return super().list(request, *args, **kwargs)
+
+        key = self.get_response_cache_key(request)
+        entry = cache.get(key)
+        if entry is not None:
+            _count(HITS_KEY)
+            data, headers = entry
+            not_modified = get_conditional_response(request, etag=headers.get("ETag"))
+            if not_modified is not None:
+                return not_modified
+            return Response(data, headers={**headers, "X-Cache": "HIT"})
+
+        _count(MISSES_KEY)
+        response = super().list(request, *args, **kwargs)
+        if response.status_code == 200:
+            headers = {"ETag": response.headers["ETag"]}
+            cache.set(key, (response.data, headers), timeout)
+            response.headers["X-Cache"] = "MISS"
+        return response
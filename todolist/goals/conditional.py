@@ -0,0 +1,69 @@
+import hashlib
+from typing import Iterable, Optional
+
+from django.db.models import Count, Max, QuerySet
+from django.http import HttpResponse
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date, quote_etag
+from rest_framework.response import Response
+
+
+class ConditionalResponseMixin:
+    """ETag for list views, ETag and Last-Modified for retrieve views.
+
+    The validators are computed from a cheap aggregate of the filtered queryset (list) or from the
+    object itself (retrieve), so a `304 Not Modified` is returned before anything is serialized.
+    Lists get no Last-Modified: archiving or deleting a row does not raise MAX(updated).
+    """
+
+    def get_list_state(self, queryset: QuerySet) -> list:
+        """Values identifying the list content"""
+        state = queryset.aggregate(count=Count("pk"), last_modified=Max("updated"))
+        return [state["count"], state["last_modified"]]
+
+    def get_object_state(self, instance) -> tuple[list, Optional[object]]:
+        """Values identifying the object content and its last modification time"""
+        return [instance.pk, instance.updated], instance.updated
+
+    def make_etag(self, state: Iterable) -> str:
+        raw = ":".join(str(value) for value in (self.request.user.id, self.request.get_full_path(), *state))
+        return quote_etag(hashlib.md5(raw.encode()).hexdigest())
+
+    def conditional_response(
+            self, request, state: list, last_modified
+    ) -> tuple[str, Optional[int], Optional[HttpResponse]]:
+        """Validators of the state and the 304 (or 412) response when the client copy is still valid"""
+        etag = self.make_etag(state)
+        timestamp = int(last_modified.timestamp()) if last_modified else None
+        return etag, timestamp, get_conditional_response(request, etag=etag, last_modified=timestamp)
+
+    @staticmethod
+    def set_validators(response: Response, etag: str, timestamp: Optional[int]) -> Response:
+        response.headers["ETag"] = etag
+        if timestamp is not None:
+            response.headers["Last-Modified"] = http_date(timestamp)
+        return response
+
+    def list(self, request, *args, **kwargs) -> Response:
+        queryset = self.filter_queryset(self.get_queryset())
+        etag, timestamp, not_modified = self.conditional_response(request, self.get_list_state(queryset), None)
+        if not_modified is not None:
+            return not_modified
+
+        return self.set_validators(self.list_response(queryset), etag, timestamp)
+
+    def list_response(self, queryset: QuerySet) -> Response:
+        """Serialized (and paginated) list"""
+        page = self.paginate_queryset(queryset)
+        if page is not None:
+            return self.get_paginated_response(self.get_serializer(page, many=True).data)
+        return Response(self.get_serializer(queryset, many=True).data)
+
+    def retrieve(self, request, *args, **kwargs) -> Response:
+        instance = self.get_object()
+        etag, timestamp, not_modified = self.conditional_response(request, *self.get_object_state(instance))
+        if not_modified is not None:
+            return not_modified
+
+        response = Response(self.get_serializer(instance).data)
+        return self.set_validators(response, etag, timestamp)
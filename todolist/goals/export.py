@@ -0,0 +1,96 @@
+import csv
+import json
+from datetime import date, datetime
+from typing import Any, Iterator
+
+from django.db import connections, transaction
+from django.db.models import QuerySet
+
+from goals.models import Goal, GoalCategory, GoalComment
+
+EXPORT_TYPES = {
+    "ndjson": "application/x-ndjson",
+    "csv": "text/csv",
+}
+
+# Exported columns of every record type, in the output order
+EXPORT_FIELDS = {
+    "category": ("id", "board_id", "user_id", "title", "is_deleted", "created", "updated"),
+    "goal": (
+        "id", "board_id", "category_id", "user_id", "title", "description",
+        "status", "priority", "due_date", "created", "updated",
+    ),
+    "comment": ("id", "board_id", "goal_id", "user_id", "text", "created", "updated"),
+}
+
+CSV_COLUMNS = ("type", *dict.fromkeys(field for fields in EXPORT_FIELDS.values() for field in fields))
+
+
+def plain(value: Any) -> Any:
+    """JSON and CSV representation of a column value, dates in ISO 8601"""
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    return value
+
+
+def _querysets(board_id: int) -> dict[str, QuerySet]:
+    return {
+        "category": GoalCategory.objects.filter(board_id=board_id),
+        "goal": Goal.objects.filter(board_id=board_id),
+        "comment": GoalComment.objects.filter(board_id=board_id),
+    }
+
+
+def _start_snapshot(using: str) -> None:
+    """Make the new transaction see one snapshot for all the export queries"""
+    connection = connections[using]
+    if connection.vendor == "postgresql":
+        # Has to be the first statement of the transaction
+        with connection.cursor() as cursor:
+            cursor.execute("SET TRANSACTION ISOLATION LEVEL REPEATABLE READ READ ONLY")
+    # SQLite transactions read from one snapshot already
+
+
+def export_records(board_id: int, chunk_size: int = 2000, using: str = "default") -> Iterator[tuple[str, dict]]:
+    """Categories, goals and comments of the board as (type, row) pairs, read from one snapshot.
+
+    Rows are fetched with server-side cursors `chunk_size` at a time, so the memory use does not
+    depend on the board size. The generator keeps its transaction open until it is exhausted or closed.
+    """
+    outermost = not connections[using].in_atomic_block
+    with transaction.atomic(using=using):
+        if outermost:
+            _start_snapshot(using)
+        for kind, queryset in _querysets(board_id).items():
+            rows = queryset.using(using).order_by("id").values_list(*EXPORT_FIELDS[kind])
+            for row in rows.iterator(chunk_size=chunk_size):
+                yield kind, dict(zip(EXPORT_FIELDS[kind], map(plain, row)))
+
+
+def ndjson_lines(records: Iterator[tuple[str, dict]]) -> Iterator[str]:
+    """One JSON object per line, the record type is in the `type` key"""
+    for kind, row in records:
+        yield json.dumps({"type": kind, **row}, ensure_ascii=False) + "\n"
+
+
+class _Echo:
+    """File-like object returning what is written, for csv.writer"""
+
+    def write(self, value: str) -> str:
+        return value
+
+
+def csv_lines(records: Iterator[tuple[str, dict]]) -> Iterator[str]:
+    """CSV with the union of all record columns, the ones a record type lacks are left empty"""
+    writer = csv.DictWriter(_Echo(), fieldnames=CSV_COLUMNS)
+    yield writer.writeheader()
+    for kind, row in records:
+        yield writer.writerow({"type": kind, **row})
+
+
+def export_lines(board_id: int, export_type: str, chunk_size: int = 2000) -> Iterator[str]:
+    """Board export encoded as NDJSON or CSV lines"""
+    records = export_records(board_id, chunk_size=chunk_size)
+    if export_type == "csv":
+        return csv_lines(records)
+    return ndjson_lines(records)
@@ -0,0 +1,41 @@
+import time
+
+from django.core.management import BaseCommand
+
+from goals.archival import process_next_chunk
+from goals.sync import prune_tombstones
+
+# Seconds between the prunings of expired tombstones
+PRUNE_INTERVAL = 3600
+
+
+class Command(BaseCommand):
+    """Deferred archival worker for deleted boards and categories"""
+    help = (
+        "Archive categories and goals of deleted boards and categories in chunks, prune expired tombstones hourly "
+        "(without this worker run `manage.py prune_tombstones`)"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--chunk-size', type=int, default=500, help="Rows archived per transaction")
+        parser.add_argument('--sleep', type=float, default=5.0, help="Seconds to wait when there is no job")
+        parser.add_argument('--once', action='store_true', help="Exit when there are no unfinished jobs")
+
+    def handle(self, *args, **options):
+        pruned = None
+        while True:
+            if pruned is None or time.monotonic() - pruned >= PRUNE_INTERVAL:
+                pruned = time.monotonic()
+                deleted = prune_tombstones()
+                if deleted:
+                    self.stdout.write(f'{deleted} expired tombstones pruned')
+            job = process_next_chunk(options['chunk_size'])
+            if job is None:
+                if options['once']:
+                    return
+                time.sleep(options['sleep'])
+                continue
+            self.stdout.write(
+                f'Job #{job.id}: {job.categories_archived} categories, {job.goals_archived} goals, '
+                f'{job.get_status_display()}'
+            )
@@ -0,0 +1,167 @@
+import json
+import math
+import subprocess
+import threading
+import time
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from typing import Optional
+
+import requests
+from django.core.management import BaseCommand, CommandError
+from django.utils import timezone
+
+# Endpoints of goals/urls.py driven by every client, "{board}" is one of the client user boards
+ENDPOINTS = {
+    "board-list": "/goals/board/list",
+    "board-summary": "/goals/board/summary",
+    "board-retrieve": "/goals/board/{board}",
+    "category-list": "/goals/goal_category/list?limit=50",
+    "goal-list": "/goals/goal/list?limit=50",
+    "goal-list-cursor": "/goals/goal/list?pagination=cursor&limit=50",
+    "goal-search": "/goals/goal/list?search=report&limit=50",
+    "comment-list": "/goals/goal_comment/list?pagination=cursor&limit=50",
+}
+
+
+def percentile(values: list[float], percent: float) -> float:
+    """Nearest-rank percentile of sorted values"""
+    if not values:
+        return 0.0
+    return values[max(math.ceil(percent / 100 * len(values)) - 1, 0)]
+
+
+def summarize(latencies: list[float], errors: int, elapsed: float) -> dict:
+    """Throughput and latency percentiles in milliseconds"""
+    latencies = sorted(latencies)
+    return {
+        "requests": len(latencies),
+        "errors": errors,
+        "rps": round(len(latencies) / elapsed, 2) if elapsed else 0.0,
+        "mean_ms": round(sum(latencies) / len(latencies) * 1000, 2) if latencies else 0.0,
+        "p50_ms": round(percentile(latencies, 50) * 1000, 2),
+        "p95_ms": round(percentile(latencies, 95) * 1000, 2),
+        "p99_ms": round(percentile(latencies, 99) * 1000, 2),
+    }
+
+
+def current_commit() -> Optional[str]:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+class Command(BaseCommand):
+    """Load benchmark of the goals API"""
+    help = "Drive the main goals endpoints of a running server with concurrent clients and report latencies"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--base-url', default='http://127.0.0.1:8000', help="Server to benchmark")
+        parser.add_argument('--clients', type=int, default=8, help="Concurrent clients")
+        parser.add_argument('--duration', type=float, default=30, help="Seconds to run")
+        parser.add_argument('--prefix', default='seed', help="Clients log in as <prefix>-0, <prefix>-1, ...")
+        parser.add_argument('--password', default='seed-password', help="Password of the seeded users")
+        parser.add_argument(
+            '--endpoint', action='append', choices=list(ENDPOINTS), help="Endpoint to drive, all by default"
+        )
+        parser.add_argument('--output', help="JSON file to store the results in")
+        parser.add_argument('--compare', help="JSON results of a previous run to compare with")
+
+    def handle(self, *args, **options):
+        self.options = options
+        endpoints = options['endpoint'] or list(ENDPOINTS)
+        self.lock = threading.Lock()
+        self.latencies: dict[str, list[float]] = defaultdict(list)
+        self.errors: dict[str, int] = defaultdict(int)
+
+        started = timezone.now()
+        with ThreadPoolExecutor(max_workers=options['clients']) as executor:
+            # Logging in hashes the password, it is kept out of the measured time
+            clients = list(executor.map(self.login, range(options['clients'])))
+            begin = time.monotonic()
+            deadline = begin + options['duration']
+            futures = [executor.submit(self.run_client, *client, endpoints, deadline) for client in clients]
+            for future in futures:
+                future.result()
+        elapsed = time.monotonic() - begin
+
+        results = {
+            "commit": current_commit(),
+            "started": started.isoformat(),
+            "base_url": options['base_url'],
+            "clients": options['clients'],
+            "duration": round(elapsed, 2),
+            "total": summarize(
+                [latency for values in self.latencies.values() for latency in values],
+                sum(self.errors.values()),
+                elapsed,
+            ),
+            "endpoints": {
+                name: summarize(self.latencies[name], self.errors[name], elapsed) for name in endpoints
+            },
+        }
+        self.report(results)
+        if options['compare']:
+            with open(options['compare'], encoding='utf-8') as previous:
+                self.compare(json.load(previous), results)
+        if options['output']:
+            with open(options['output'], 'w', encoding='utf-8') as output:
+                json.dump(results, output, indent=2)
+
+    def login(self, number: int) -> tuple[requests.Session, int]:
+        session = requests.Session()
+        base_url = self.options['base_url']
+        response = session.post(f"{base_url}/core/login", json={
+            "username": f"{self.options['prefix']}-{number}", "password": self.options['password'],
+        })
+        if response.status_code != 200:
+            raise CommandError(f"Cannot log in as {self.options['prefix']}-{number}: {response.status_code}")
+        boards = session.get(f"{base_url}/goals/board/list").json()
+        if not boards:
+            raise CommandError(f"{self.options['prefix']}-{number} has no boards, run manage.py seed first")
+        return session, boards[0]["id"]
+
+    def run_client(self, session: requests.Session, board_id: int, endpoints: list[str], deadline: float) -> None:
+        """Request the endpoints in turn until the deadline"""
+        base_url = self.options['base_url']
+        turn = 0
+        while time.monotonic() < deadline:
+            name = endpoints[turn % len(endpoints)]
+            turn += 1
+            begin = time.monotonic()
+            try:
+                ok = session.get(base_url + ENDPOINTS[name].format(board=board_id)).status_code == 200
+            except requests.RequestException:
+                ok = False
+            latency = time.monotonic() - begin
+            with self.lock:
+                if ok:
+                    self.latencies[name].append(latency)
+                else:
+                    self.errors[name] += 1
+
+    def report(self, results: dict) -> None:
+        self.stdout.write(
+            f"{'endpoint':<20}{'requests':>10}{'errors':>8}{'rps':>10}{'p50':>10}{'p95':>10}{'p99':>10}"
+        )
+        for name, stats in (*results["endpoints"].items(), ("total", results["total"])):
+            self.stdout.write(
+                f"{name:<20}{stats['requests']:>10}{stats['errors']:>8}{stats['rps']:>10}"
+                f"{stats['p50_ms']:>10}{stats['p95_ms']:>10}{stats['p99_ms']:>10}"
+            )
+
+    def compare(self, previous: dict, results: dict) -> None:
+        """Relative change of throughput and p95 latency per endpoint"""
+        self.stdout.write(f"Compared with {previous.get('commit') or previous.get('started')}:")
+        for name, stats in (*results["endpoints"].items(), ("total", results["total"])):
+            before = previous["total"] if name == "total" else previous["endpoints"].get(name)
+            if not before:
+                continue
+            changes = []
+            for key in ("rps", "p95_ms"):
+                if before[key]:
+                    changes.append(f"{key} {(stats[key] - before[key]) / before[key] * 100:+.1f}%")
+            self.stdout.write(f"{name:<20}{', '.join(changes)}")
@@ -0,0 +1,27 @@
+from django.core.management import BaseCommand, CommandError
+
+from goals.export import EXPORT_TYPES, export_lines
+from goals.models import Board
+
+
+class Command(BaseCommand):
+    """Streaming export of a board"""
+    help = "Export categories, goals and comments of a board as NDJSON or CSV"
+
+    def add_arguments(self, parser):
+        parser.add_argument('board_id', type=int)
+        parser.add_argument('--type', choices=list(EXPORT_TYPES), default='ndjson', help="Output format")
+        parser.add_argument('--output', help="File to write, standard output by default")
+        parser.add_argument('--chunk-size', type=int, default=2000, help="Rows fetched from the cursor at a time")
+
+    def handle(self, *args, **options):
+        if not Board.objects.filter(id=options['board_id']).exists():
+            raise CommandError(f"Board {options['board_id']} does not exist")
+
+        lines = export_lines(options['board_id'], options['type'], chunk_size=options['chunk_size'])
+        if options['output'] is None:
+            for line in lines:
+                self.stdout.write(line, ending='')
+            return
+        with open(options['output'], 'w', encoding='utf-8', newline='') as output:
+            output.writelines(lines)
@@ -0,0 +1,49 @@
+from pathlib import Path
+
+from django.core.management import BaseCommand, CommandError
+
+from core.models import User
+from goals.bulk_import import IMPORT_TYPES, GoalImporter, ImportReport, parse_records
+
+
+class Command(BaseCommand):
+    """Bulk import of goals and comments"""
+    help = "Import goals and comments from an NDJSON or CSV file in batches"
+
+    def add_arguments(self, parser):
+        parser.add_argument('path', help="File to import")
+        parser.add_argument('--user', required=True, help="Username of the author of the imported records")
+        parser.add_argument('--type', choices=IMPORT_TYPES, default='ndjson', help="Input format")
+        parser.add_argument('--batch-size', type=int, default=1000, help="Records validated and written at a time")
+        parser.add_argument(
+            '--checkpoint-file',
+            help="File keeping the last committed line, the import resumes after it when run again",
+        )
+
+    def handle(self, *args, **options):
+        try:
+            user = User.objects.get(username=options['user'])
+        except User.DoesNotExist:
+            raise CommandError(f"User {options['user']} does not exist")
+
+        checkpoint_file = Path(options['checkpoint_file']) if options['checkpoint_file'] else None
+        checkpoint = 0
+        if checkpoint_file is not None and checkpoint_file.exists():
+            checkpoint = int(checkpoint_file.read_text() or 0)
+        reported_errors = 0
+
+        def on_batch(report: ImportReport) -> None:
+            nonlocal reported_errors
+            if checkpoint_file is not None:
+                checkpoint_file.write_text(str(report.checkpoint))
+            for error in report.errors[reported_errors:]:
+                self.stderr.write(f"Line {error['line']}: {error['errors']}")
+            reported_errors = len(report.errors)
+            self.stdout.write(f"Line {report.checkpoint}: {report.goals} goals, {report.comments} comments")
+
+        importer = GoalImporter(user, batch_size=max(options['batch_size'], 1))
+        with open(options['path'], encoding='utf-8', newline='') as lines:
+            report = importer.run(parse_records(lines, options['type']), checkpoint=checkpoint, on_batch=on_batch)
+        self.stdout.write(
+            f"Imported {report.goals} goals and {report.comments} comments, {len(report.errors)} records failed"
+        )
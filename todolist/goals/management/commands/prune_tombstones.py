@@ -0,0 +1,14 @@
+from django.core.management import BaseCommand
+
+from goals.sync import prune_tombstones
+
+
+class Command(BaseCommand):
+    """Deletion of the tombstones older than the sync cursors may be"""
+    help = (
+        "Delete the tombstones older than GOALS_TOMBSTONE_RETENTION_DAYS, run it daily when "
+        "`manage.py archive` (which prunes them hourly) is not running"
+    )
+
+    def handle(self, *args, **options):
+        self.stdout.write(f'{prune_tombstones()} expired tombstones pruned')
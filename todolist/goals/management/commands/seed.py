@@ -0,0 +1,139 @@
+import random
+from collections import Counter
+from datetime import timedelta
+
+from django.contrib.auth.hashers import make_password
+from django.core.management import BaseCommand, CommandError
+from django.db import transaction
+from django.utils import timezone
+
+from core.models import User
+from goals.models import Board, BoardParticipant, Goal, GoalCategory, GoalComment
+
+WORDS = (
+    "report", "release", "budget", "review", "design", "meeting", "plan", "sprint", "backlog", "deploy",
+    "invoice", "hiring", "research", "training", "support", "migration", "roadmap", "audit", "launch", "docs",
+    "marketing", "feedback", "refactoring", "testing", "analytics", "security", "onboarding", "contract",
+)
+STATUS_WEIGHTS = {
+    Goal.Status.to_do: 35, Goal.Status.in_progress: 20, Goal.Status.done: 35, Goal.Status.archived: 10,
+}
+PRIORITY_WEIGHTS = {
+    Goal.Priority.low: 25, Goal.Priority.medium: 45, Goal.Priority.high: 22, Goal.Priority.critical: 8,
+}
+USERS_PER_CHUNK = 200
+
+
+def heavy_tail(rng: random.Random, mean: float, cap: int) -> int:
+    """Pareto distributed count: most values are small, a few are large"""
+    alpha = 1.5
+    scale = mean * (alpha - 1) / alpha
+    return min(int(scale * rng.paretovariate(alpha)), cap)
+
+
+def text(rng: random.Random, words: int) -> str:
+    return " ".join(rng.choices(WORDS, k=words)).capitalize()
+
+
+class Command(BaseCommand):
+    """Generated data for local load tests"""
+    help = "Fill the database with users, boards, participants, categories, goals and comments using bulk inserts"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--users', type=int, default=1000, help="Users to create, everything else scales with it")
+        parser.add_argument('--goals-per-category', type=float, default=20, help="Mean goals per category")
+        parser.add_argument('--comments-per-goal', type=float, default=1.5, help="Mean comments per goal")
+        parser.add_argument('--batch-size', type=int, default=5000, help="Rows per insert statement")
+        parser.add_argument('--prefix', default='seed', help="Username prefix, users are named <prefix>-<n>")
+        parser.add_argument('--password', default='seed-password', help="Password of every created user")
+        parser.add_argument('--random-seed', type=int, default=0, help="Seed of the generator for repeatable data")
+
+    def handle(self, *args, **options):
+        prefix = options['prefix']
+        if User.objects.filter(username__startswith=f"{prefix}-").exists():
+            raise CommandError(f"Users with the '{prefix}-' prefix exist already, choose another --prefix")
+
+        self.rng = random.Random(options['random_seed'])
+        self.options = options
+        self.password = make_password(options['password'])
+        self.now = timezone.now()
+        totals = Counter()
+        for start in range(0, options['users'], USERS_PER_CHUNK):
+            numbers = range(start, min(start + USERS_PER_CHUNK, options['users']))
+            with transaction.atomic():
+                totals.update(self.seed_chunk(numbers))
+            progress = ", ".join(f"{count} {name}" for name, count in totals.items())
+            self.stdout.write(f"{numbers.stop} of {options['users']} users: {progress}")
+
+    def bulk_create(self, model, objects: list) -> list:
+        return model.objects.bulk_create(objects, batch_size=self.options['batch_size'])
+
+    def seed_chunk(self, numbers: range) -> Counter:
+        """Users of the chunk with their boards, the boards are shared among the chunk users only"""
+        rng = self.rng
+        users = self.bulk_create(User, [
+            User(username=f"{self.options['prefix']}-{number}", password=self.password, first_name=text(rng, 1))
+            for number in numbers
+        ])
+        user_ids = [user.id for user in users]
+
+        boards, owners = [], []
+        for user_id in user_ids:
+            for _ in range(1 + heavy_tail(rng, 1.5, 20)):
+                boards.append(Board(title=text(rng, 2)))
+                owners.append(user_id)
+        boards = self.bulk_create(Board, boards)
+
+        participants, writers = [], {}
+        for board, owner_id in zip(boards, owners):
+            participants.append(BoardParticipant(board=board, user_id=owner_id, role=BoardParticipant.Role.owner))
+            others = rng.sample(user_ids, k=min(heavy_tail(rng, 2, 15), len(user_ids)))
+            writers[board.id] = [owner_id]
+            for user_id in others:
+                if user_id == owner_id:
+                    continue
+                role = rng.choice((BoardParticipant.Role.writer, BoardParticipant.Role.reader))
+                participants.append(BoardParticipant(board=board, user_id=user_id, role=role))
+                if role == BoardParticipant.Role.writer:
+                    writers[board.id].append(user_id)
+        self.bulk_create(BoardParticipant, participants)
+
+        categories = self.bulk_create(GoalCategory, [
+            GoalCategory(board=board, user_id=rng.choice(writers[board.id]), title=text(rng, 1))
+            for board in boards
+            for _ in range(1 + heavy_tail(rng, 3, 30))
+        ])
+
+        goals = []
+        for category in categories:
+            for _ in range(heavy_tail(rng, self.options['goals_per_category'], 2000)):
+                due_date = None
+                if rng.random() < 0.7:
+                    due_date = self.now + timedelta(days=rng.uniform(-60, 90))
+                goals.append(Goal(
+                    category=category,
+                    board_id=category.board_id,
+                    user_id=category.user_id,
+                    title=text(rng, rng.randint(2, 5)),
+                    description=text(rng, rng.randint(5, 30)) if rng.random() < 0.6 else None,
+                    status=rng.choices(list(STATUS_WEIGHTS), weights=STATUS_WEIGHTS.values())[0],
+                    priority=rng.choices(list(PRIORITY_WEIGHTS), weights=PRIORITY_WEIGHTS.values())[0],
+                    due_date=due_date,
+                ))
+        goals = self.bulk_create(Goal, goals)
+
+        comments = self.bulk_create(GoalComment, [
+            GoalComment(goal=goal, board_id=goal.board_id, user_id=rng.choice(writers[goal.board_id]),
+                        text=text(rng, rng.randint(3, 20)))
+            for goal in goals
+            for _ in range(heavy_tail(rng, self.options['comments_per_goal'], 200))
+        ])
+
+        return Counter({
+            "users": len(users),
+            "boards": len(boards),
+            "participants": len(participants),
+            "categories": len(categories),
+            "goals": len(goals),
+            "comments": len(comments),
+        })
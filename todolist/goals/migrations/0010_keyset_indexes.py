@@ -0,0 +1,29 @@
+# Generated by Django 4.1.3 on 2026-10-18 16:11
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('goals', '0009_alter_goal_board_alter_goalcomment_board_and_more'),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name='goalcomment',
+            name='comment_goal_created_idx',
+        ),
+        migrations.AddIndex(
+            model_name='goal',
+            index=models.Index(fields=['title', '-priority', 'id'], name='goal_title_priority_id_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='goalcomment',
+            index=models.Index(fields=['goal', '-created', 'id'], name='comment_goal_created_id_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='goalcomment',
+            index=models.Index(fields=['board', '-created', 'id'], name='comment_board_created_id_idx'),
+        ),
+    ]
@@ -0,0 +1,72 @@
+# Generated by Django 4.1.3 on 2026-10-18 16:40
+
+from django.db import migrations
+
+# Table and text columns of every searchable model, kept in line with goals.search.SEARCH_COLUMNS
+SEARCH_TABLES = (
+    ("goals_goal", ("title", "description")),
+    ("goals_goalcategory", ("title",)),
+    ("goals_goalcomment", ("text",)),
+)
+
+
+def _postgres_forward(schema_editor, table, columns):
+    document = " || ' ' || ".join(f"coalesce({column}, '')" for column in columns)
+    schema_editor.execute(
+        f"ALTER TABLE {table} ADD COLUMN search_vector tsvector "
+        f"GENERATED ALWAYS AS (to_tsvector('simple', {document})) STORED"
+    )
+    schema_editor.execute(f"CREATE INDEX {table}_search_idx ON {table} USING GIN (search_vector)")
+
+
+def _sqlite_forward(schema_editor, table, columns):
+    fts = f"{table}_fts"
+    column_list = ", ".join(columns)
+    new_values = ", ".join(f"new.{column}" for column in columns)
+    old_values = ", ".join(f"old.{column}" for column in columns)
+    schema_editor.execute(f"CREATE VIRTUAL TABLE {fts} USING fts5({column_list}, content='{table}', content_rowid='id')")
+    schema_editor.execute(f"INSERT INTO {fts}({fts}) VALUES ('rebuild')")
+    schema_editor.execute(
+        f"CREATE TRIGGER {fts}_ai AFTER INSERT ON {table} BEGIN "
+        f"INSERT INTO {fts}(rowid, {column_list}) VALUES (new.id, {new_values}); END"
+    )
+    schema_editor.execute(
+        f"CREATE TRIGGER {fts}_ad AFTER DELETE ON {table} BEGIN "
+        f"INSERT INTO {fts}({fts}, rowid, {column_list}) VALUES ('delete', old.id, {old_values}); END"
+    )
+    schema_editor.execute(
+        f"CREATE TRIGGER {fts}_au AFTER UPDATE ON {table} BEGIN "
+        f"INSERT INTO {fts}({fts}, rowid, {column_list}) VALUES ('delete', old.id, {old_values}); "
+        f"INSERT INTO {fts}(rowid, {column_list}) VALUES (new.id, {new_values}); END"
+    )
+
+
+def create_search_index(apps, schema_editor):
+    vendor = schema_editor.connection.vendor
+    for table, columns in SEARCH_TABLES:
+        if vendor == "postgresql":
+            _postgres_forward(schema_editor, table, columns)
+        elif vendor == "sqlite":
+            _sqlite_forward(schema_editor, table, columns)
+
+
+def drop_search_index(apps, schema_editor):
+    vendor = schema_editor.connection.vendor
+    for table, _ in SEARCH_TABLES:
+        if vendor == "postgresql":
+            schema_editor.execute(f"ALTER TABLE {table} DROP COLUMN search_vector")
+        elif vendor == "sqlite":
+            for suffix in ("ai", "ad", "au"):
+                schema_editor.execute(f"DROP TRIGGER IF EXISTS {table}_fts_{suffix}")
+            schema_editor.execute(f"DROP TABLE IF EXISTS {table}_fts")
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('goals', '0010_keyset_indexes'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_search_index, drop_search_index),
+    ]
@@ -0,0 +1,32 @@
+# Generated by Django 4.1.3 on 2026-10-18 16:17
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('goals', '0011_search_index'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ArchivalJob',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('created', models.DateTimeField(auto_now_add=True, verbose_name='Дата создания')),
+                ('updated', models.DateTimeField(auto_now=True, verbose_name='Дата последнего обновления')),
+                ('status', models.PositiveSmallIntegerField(choices=[(1, 'Ожидает'), (2, 'Выполняется'), (3, 'Завершено')], default=1, verbose_name='Статус')),
+                ('categories_archived', models.PositiveIntegerField(default=0, verbose_name='Архивировано категорий')),
+                ('goals_archived', models.PositiveIntegerField(default=0, verbose_name='Архивировано целей')),
+                ('finished', models.DateTimeField(blank=True, null=True, verbose_name='Дата завершения')),
+                ('board', models.ForeignKey(on_delete=django.db.models.deletion.PROTECT, related_name='archival_jobs', to='goals.board', verbose_name='Доска')),
+                ('category', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.PROTECT, related_name='archival_jobs', to='goals.goalcategory', verbose_name='Категория')),
+            ],
+            options={
+                'verbose_name': 'Архивация',
+                'verbose_name_plural': 'Архивации',
+            },
+        ),
+    ]
@@ -0,0 +1,17 @@
+# Generated by Django 4.1.3 on 2026-10-18 16:34
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('goals', '0013_tombstone_sync_indexes'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='goal',
+            index=models.Index(condition=models.Q(('status__in', (1, 2))), fields=['due_date', 'board'], name='goal_open_due_date_idx'),
+        ),
+    ]
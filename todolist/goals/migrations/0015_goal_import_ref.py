@@ -0,0 +1,35 @@
+# Generated by Django 4.1.3 on 2026-10-18 17:18
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('goals', '0014_open_due_date_index'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='GoalImportRef',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('created', models.DateTimeField(auto_now_add=True, verbose_name='Дата создания')),
+                ('updated', models.DateTimeField(auto_now=True, verbose_name='Дата последнего обновления')),
+                ('ref', models.CharField(max_length=255, verbose_name='ID в источнике')),
+                ('goal', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='import_refs', to='goals.goal', verbose_name='Цель')),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to=settings.AUTH_USER_MODEL, verbose_name='Автор импорта')),
+            ],
+            options={
+                'verbose_name': 'Импортированная цель',
+                'verbose_name_plural': 'Импортированные цели',
+            },
+        ),
+        migrations.AddConstraint(
+            model_name='goalimportref',
+            constraint=models.UniqueConstraint(fields=('user', 'ref'), name='unique_goal_import_ref'),
+        ),
+    ]
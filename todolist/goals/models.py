@@ -27,6 +27,9 @@ class Board(BaseModel):
     class Meta:
         verbose_name = "Доска"
         verbose_name_plural = "Доски"
+        indexes = [
+            models.Index(fields=["updated", "id"], name="board_updated_id_idx"),
+        ]
 
 
 class BoardParticipant(BaseModel):
@@ -68,6 +71,24 @@ class GoalCategory(BaseModel):
     class Meta:
         verbose_name = "Категория"
         verbose_name_plural = "Категории"
+        indexes = [
+            models.Index(fields=["board", "updated", "id"], name="category_board_updated_id_idx"),
+        ]
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        instance._loaded_board_id = instance.__dict__.get("board_id")
+        return instance
+
+    def save(self, *args, **kwargs):
+        """Move goals and comments together with the category when its board changes"""
+        loaded_board_id = getattr(self, "_loaded_board_id", None)
+        super().save(*args, **kwargs)
+        if loaded_board_id is not None and loaded_board_id != self.board_id:
+            Goal.objects.filter(category=self).update(board_id=self.board_id, updated=timezone.now())
+            GoalComment.objects.filter(goal__category=self).update(board_id=self.board_id, updated=timezone.now())
+        self._loaded_board_id = self.board_id
 
     def __str__(self):
         return self.title
@@ -78,6 +99,17 @@ class Goal(BaseModel):
     class Meta:
         verbose_name = "Цель"
         verbose_name_plural = "Цели"
+        indexes = [
+            models.Index(fields=["board", "status", "priority"], name="goal_board_status_priority_idx"),
+            models.Index(fields=["title", "-priority", "id"], name="goal_title_priority_id_idx"),
+            models.Index(fields=["board", "updated", "id"], name="goal_board_updated_id_idx"),
+            # Deadlines of open goals only, the statuses are Status.to_do and Status.in_progress
+            models.Index(
+                fields=["due_date", "board"],
+                name="goal_open_due_date_idx",
+                condition=models.Q(status__in=(1, 2)),
+            ),
+        ]
 
     class Status(models.IntegerChoices):
         """Goal status class"""
@@ -93,6 +125,8 @@ class Goal(BaseModel):
         high = 3, "Высокий"
         critical = 4, "Критический"
 
+    OPEN_STATUSES = (Status.to_do, Status.in_progress)
+
     title = models.CharField(verbose_name="Название", max_length=255)
     description = models.TextField(verbose_name="Описание", null=True, blank=True)
     category = models.ForeignKey(
@@ -101,6 +135,13 @@ class Goal(BaseModel):
         on_delete=models.CASCADE,
         related_name="goals"
     )
+    board = models.ForeignKey(
+        to=Board,
+        verbose_name="Доска",
+        on_delete=models.PROTECT,
+        related_name="goals",
+        editable=False,
+    )
     status = models.PositiveSmallIntegerField(
         verbose_name="Статус",
         choices=Status.choices,
@@ -114,6 +155,26 @@ class Goal(BaseModel):
     due_date = models.DateTimeField(verbose_name="Дата выполнения", null=True, blank=True)
     user = models.ForeignKey(User, on_delete=models.PROTECT, verbose_name="Автор", related_name="goals")
 
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        instance._loaded_category_id = instance.__dict__.get("category_id")
+        return instance
+
+    def save(self, *args, **kwargs):
+        """Take the board from the category, move the comments when the goal changes category"""
+        loaded_category_id = getattr(self, "_loaded_category_id", None)
+        moved = loaded_category_id is not None and loaded_category_id != self.category_id
+        if moved or self.board_id is None:
+            self.board_id = self.category.board_id
+            update_fields = kwargs.get("update_fields")
+            if update_fields is not None and "board" not in update_fields:
+                kwargs["update_fields"] = (*update_fields, "board")
+        super().save(*args, **kwargs)
+        if moved:
+            self.comments.update(board_id=self.board_id, updated=timezone.now())
+        self._loaded_category_id = self.category_id
+
     def __str__(self):
         return self.title
 
@@ -122,11 +183,93 @@ class GoalComment(BaseModel):
     """Goal comment class"""
     user = models.ForeignKey(User, on_delete=models.PROTECT, verbose_name="Автор", related_name="comments")
     goal = models.ForeignKey(Goal, on_delete=models.CASCADE, verbose_name="Цель", related_name="comments")
+    board = models.ForeignKey(
+        Board, on_delete=models.PROTECT, verbose_name="Доска", related_name="comments", editable=False
+    )
     text = models.TextField(verbose_name="Текст", max_length=255)
 
     class Meta:
         verbose_name = "Комментарий"
         verbose_name_plural = "Комментарии"
+        indexes = [
+            models.Index(fields=["goal", "-created", "id"], name="comment_goal_created_id_idx"),
+            models.Index(fields=["board", "-created", "id"], name="comment_board_created_id_idx"),
+            models.Index(fields=["board", "updated", "id"], name="comment_board_updated_id_idx"),
+        ]
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        instance._loaded_goal_id = instance.__dict__.get("goal_id")
+        return instance
+
+    def save(self, *args, **kwargs):
+        """Take the board from the goal"""
+        if self.board_id is None or self.goal_id != getattr(self, "_loaded_goal_id", None):
+            self.board_id = self.goal.board_id
+        super().save(*args, **kwargs)
+        self._loaded_goal_id = self.goal_id
 
     def __str__(self):
         return self.text
+
+
+class ArchivalJob(BaseModel):
+    """Deferred archival of the categories and goals of a deleted board or category"""
+    class Status(models.IntegerChoices):
+        pending = 1, "Ожидает"
+        running = 2, "Выполняется"
+        done = 3, "Завершено"
+
+    board = models.ForeignKey(Board, verbose_name="Доска", on_delete=models.PROTECT, related_name="archival_jobs")
+    category = models.ForeignKey(
+        GoalCategory,
+        verbose_name="Категория",
+        on_delete=models.PROTECT,
+        related_name="archival_jobs",
+        null=True,
+        blank=True,
+    )
+    status = models.PositiveSmallIntegerField(verbose_name="Статус", choices=Status.choices, default=Status.pending)
+    categories_archived = models.PositiveIntegerField(verbose_name="Архивировано категорий", default=0)
+    goals_archived = models.PositiveIntegerField(verbose_name="Архивировано целей", default=0)
+    finished = models.DateTimeField(verbose_name="Дата завершения", null=True, blank=True)
+
+    class Meta:
+        verbose_name = "Архивация"
+        verbose_name_plural = "Архивации"
+
+
+class Tombstone(BaseModel):
+    """Record of a deleted board, category, goal or comment for the delta sync"""
+    class Kind(models.TextChoices):
+        board = "board", "Доска"
+        category = "category", "Категория"
+        goal = "goal", "Цель"
+        comment = "comment", "Комментарий"
+
+    kind = models.CharField(verbose_name="Тип", max_length=16, choices=Kind.choices)
+    object_id = models.BigIntegerField(verbose_name="ID объекта")
+    # Not a foreign key, the board may be deleted as well
+    board_id = models.BigIntegerField(verbose_name="ID доски")
+
+    class Meta:
+        verbose_name = "Удалённый объект"
+        verbose_name_plural = "Удалённые объекты"
+        indexes = [
+            models.Index(fields=["board_id", "updated", "id"], name="tombstone_board_updated_id_idx"),
+        ]
+
+
+class GoalImportRef(BaseModel):
+    """Source id of an imported goal, comments of later records and batches refer to the goal by it"""
+    user = models.ForeignKey(User, verbose_name="Автор импорта", on_delete=models.CASCADE)
+    ref = models.CharField(verbose_name="ID в источнике", max_length=255)
+    goal = models.ForeignKey(Goal, verbose_name="Цель", on_delete=models.CASCADE, related_name="import_refs")
+
+    class Meta:
+        verbose_name = "Импортированная цель"
+        verbose_name_plural = "Импортированные цели"
+        constraints = [
+            models.UniqueConstraint(fields=["user", "ref"], name="unique_goal_import_ref"),
+        ]
@@ -0,0 +1,171 @@
+import base64
+import datetime
+import json
+from collections import OrderedDict
+from typing import Any, Optional
+
+from django.core.exceptions import ValidationError
+from django.db import connections
+from django.db.models import Q, QuerySet
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import BasePagination
+from rest_framework.response import Response
+from rest_framework.utils.urls import replace_query_param, remove_query_param
+
+
+def _encode_value(value: Any) -> str:
+    """Cursor values keep full precision, unlike DjangoJSONEncoder which cuts microseconds"""
+    if isinstance(value, (datetime.datetime, datetime.date)):
+        return value.isoformat()
+    raise TypeError(f"Unsupported cursor value {value!r}")
+
+
+def limit_param(value: Optional[str], default: int, maximum: int) -> int:
+    """Positive page size from the query string capped at the maximum, the default when missing or invalid"""
+    try:
+        limit = int(value)
+    except (TypeError, ValueError):
+        return default
+    return min(limit, maximum) if limit > 0 else default
+
+
+def estimate_count(queryset: QuerySet) -> Optional[int]:
+    """Planner row estimate of the queryset on PostgreSQL, None on other databases"""
+    connection = connections[queryset.db]
+    if connection.vendor != "postgresql":
+        return None
+    sql, params = queryset.order_by().query.sql_with_params()
+    with connection.cursor() as cursor:
+        cursor.execute(f"EXPLAIN (FORMAT JSON) {sql}", params)
+        plan = cursor.fetchone()[0]
+    if isinstance(plan, str):
+        plan = json.loads(plan)
+    return plan[0]["Plan"]["Plan Rows"]
+
+
+class KeysetPagination(BasePagination):
+    """Cursor pagination over a fixed composite ordering, the last ordering field must be unique.
+
+    The cursor keeps the ordering values of the last row of the page, so the next page is a plain
+    range condition instead of an offset. The count is only calculated when the client asks for it
+    with `count=exact` or `count=estimate`, and is not carried over to the next link.
+    """
+    ordering: tuple[str, ...] = ("-created", "id")
+    page_size = 50
+    max_page_size = 500
+    cursor_query_param = "cursor"
+    page_size_query_param = "limit"
+    count_query_param = "count"
+    invalid_cursor_message = "Invalid cursor"
+
+    def paginate_queryset(self, queryset: QuerySet, request, view=None) -> list:
+        self.request = request
+        self.base_url = request.build_absolute_uri()
+        self.page_size = self.get_page_size(request)
+        self.fields = [(name.lstrip("-"), name.startswith("-")) for name in self.ordering]
+
+        queryset = queryset.order_by(*self.ordering)
+        self.count = self.get_count(queryset, request)
+
+        position = self.decode_cursor(request, queryset.model)
+        if position is not None:
+            queryset = queryset.filter(self.position_filter(position))
+
+        rows = list(queryset[:self.page_size + 1])
+        self.has_next = len(rows) > self.page_size
+        self.page = rows[:self.page_size]
+        return self.page
+
+    def get_page_size(self, request) -> int:
+        return limit_param(request.query_params.get(self.page_size_query_param), self.page_size, self.max_page_size)
+
+    def get_count(self, queryset: QuerySet, request) -> Optional[int]:
+        mode = request.query_params.get(self.count_query_param)
+        if mode == "estimate":
+            count = estimate_count(queryset)
+            if count is not None:
+                return count
+            mode = "exact"
+        if mode == "exact":
+            return queryset.count()
+        return None
+
+    def position_filter(self, position: list) -> Q:
+        """Rows after the position in the (possibly mixed direction) lexicographic ordering"""
+        condition = Q()
+        equal = Q()
+        for (name, descending), value in zip(self.fields, position):
+            lookup = "lt" if descending else "gt"
+            condition |= equal & Q(**{f"{name}__{lookup}": value})
+            equal &= Q(**{name: value})
+        return condition
+
+    def decode_cursor(self, request, model) -> Optional[list]:
+        encoded = request.query_params.get(self.cursor_query_param)
+        if not encoded:
+            return None
+        try:
+            raw = json.loads(base64.urlsafe_b64decode(encoded.encode("ascii")))
+            if not isinstance(raw, list) or len(raw) != len(self.fields):
+                raise ValueError
+            return [
+                model._meta.get_field(name).to_python(value)
+                for (name, _), value in zip(self.fields, raw)
+            ]
+        except (TypeError, ValueError, LookupError, ValidationError):
+            raise NotFound(self.invalid_cursor_message)
+
+    def encode_cursor(self, row: Any) -> str:
+        values = [row[name] if isinstance(row, dict) else getattr(row, name) for name, _ in self.fields]
+        raw = json.dumps(values, default=_encode_value)
+        return base64.urlsafe_b64encode(raw.encode("ascii")).decode("ascii")
+
+    def get_next_link(self) -> Optional[str]:
+        if not self.has_next:
+            return None
+        url = remove_query_param(self.base_url, self.count_query_param)
+        return replace_query_param(url, self.cursor_query_param, self.encode_cursor(self.page[-1]))
+
+    def get_paginated_response(self, data) -> Response:
+        content = OrderedDict()
+        if self.count is not None:
+            content["count"] = self.count
+        content["next"] = self.get_next_link()
+        content["results"] = data
+        return Response(content)
+
+    def get_paginated_response_schema(self, schema: dict) -> dict:
+        return {
+            "type": "object",
+            "properties": {
+                "count": {"type": "integer", "example": 123},
+                "next": {"type": "string", "nullable": True, "format": "uri"},
+                "results": schema,
+            },
+        }
+
+
+class GoalKeysetPagination(KeysetPagination):
+    """Goals by title, then by priority from the highest"""
+    ordering = ("title", "-priority", "id")
+
+
+class GoalCommentKeysetPagination(KeysetPagination):
+    """Comments from the newest"""
+    ordering = ("-created", "id")
+
+
+class KeysetPaginationMixin:
+    """Switch the list view to keyset pagination when the client passes `pagination=cursor`"""
+    keyset_pagination_class: Optional[type[KeysetPagination]] = None
+    keyset_query_param = "pagination"
+
+    @property
+    def paginator(self):
+        if (
+                not hasattr(self, "_paginator")
+                and self.keyset_pagination_class is not None
+                and self.request.query_params.get(self.keyset_query_param) == "cursor"
+        ):
+            self._paginator = self.keyset_pagination_class()
+        return super().paginator
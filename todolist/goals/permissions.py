@@ -2,6 +2,7 @@ from rest_framework import permissions
 from rest_framework.permissions import IsAuthenticated
 
 from goals.models import BoardParticipant, Goal, GoalCategory, Board, GoalComment
+from goals.roles import WRITE_ROLES, has_board_role
 
 
 class IsOwnerOrReadOnly(permissions.BasePermission):
@@ -15,28 +16,25 @@ class IsOwnerOrReadOnly(permissions.BasePermission):
 class BoardPermission(IsAuthenticated):
     """Permission for read or write access to Board"""
     def has_object_permission(self, request, view, obj: Board) -> bool:
-        filters: dict = {"user": request.user, "board": obj}
-        if request.method not in permissions.SAFE_METHODS:
-            filters["role"] = BoardParticipant.Role.owner
-        return BoardParticipant.objects.filter(**filters).exists()
+        if request.method in permissions.SAFE_METHODS:
+            return has_board_role(request, obj.id)
+        return has_board_role(request, obj.id, (BoardParticipant.Role.owner,))
 
 
 class GoalCategoryPermission(IsAuthenticated):
     """Permission for read or write access to GoalCategory"""
     def has_object_permission(self, request, view, obj: GoalCategory) -> bool:
-        filters: dict = {"user": request.user, "board": obj.board}
-        if request.method not in permissions.SAFE_METHODS:
-            filters["role__in"] = [BoardParticipant.Role.owner, BoardParticipant.Role.writer]
-        return BoardParticipant.objects.filter(**filters).exists()
+        if request.method in permissions.SAFE_METHODS:
+            return has_board_role(request, obj.board_id)
+        return has_board_role(request, obj.board_id, WRITE_ROLES)
 
 
 class GoalPermission(IsAuthenticated):
     """Permission for read or write access to Goal"""
     def has_object_permission(self, request, view, obj: Goal) -> bool:
-        filters: dict = {"user": request.user, "board": obj.category.board}
-        if request.method not in permissions.SAFE_METHODS:
-            filters["role__in"] = [BoardParticipant.Role.owner, BoardParticipant.Role.writer]
-        return BoardParticipant.objects.filter(**filters).exists()
+        if request.method in permissions.SAFE_METHODS:
+            return has_board_role(request, obj.board_id)
+        return has_board_role(request, obj.board_id, WRITE_ROLES)
 
 
 class CommentsPermission(IsAuthenticated):
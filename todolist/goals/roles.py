@@ -0,0 +1,68 @@
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+
+from core.cache import is_shared_cache
+from goals.models import BoardParticipant
+
+WRITE_ROLES = (BoardParticipant.Role.owner, BoardParticipant.Role.writer)
+
+_REQUEST_ATTR = "_board_roles"
+
+
+def _version_key(user_id: int) -> str:
+    return f"goals:roles:version:{user_id}"
+
+
+def _roles_key(user_id: int, version: int) -> str:
+    return f"goals:roles:{user_id}:{version}"
+
+
+def _query_board_roles(user_id: int) -> dict[int, int]:
+    return dict(BoardParticipant.objects.filter(user_id=user_id).values_list("board_id", "role"))
+
+
+def load_board_roles(user_id: int) -> dict[int, int]:
+    """Map of board id to the user role, from the cache when it is enabled and shared by the processes.
+
+    Invalidation in the per process local memory cache would not reach the other workers, without
+    a shared cache the roles are only kept for the request.
+    """
+    timeout = settings.GOALS_ROLE_CACHE_TIMEOUT
+    if not timeout or not is_shared_cache():
+        return _query_board_roles(user_id)
+
+    version = cache.get(_version_key(user_id))
+    if version is None:
+        version = time.time_ns()
+        cache.set(_version_key(user_id), version, None)
+    else:
+        roles = cache.get(_roles_key(user_id, version))
+        if roles is not None:
+            return roles
+
+    roles = _query_board_roles(user_id)
+    cache.set(_roles_key(user_id, version), roles, timeout)
+    return roles
+
+
+def invalidate_board_roles(*user_ids: int) -> None:
+    """Drop cached roles of the users, called whenever their participants change"""
+    version = time.time_ns()
+    cache.set_many({_version_key(user_id): version for user_id in user_ids}, None)
+
+
+def get_board_roles(request) -> dict[int, int]:
+    """Map of board id to the role of the request user, loaded once per request"""
+    roles = getattr(request, _REQUEST_ATTR, None)
+    if roles is None:
+        roles = load_board_roles(request.user.id)
+        setattr(request, _REQUEST_ATTR, roles)
+    return roles
+
+
+def has_board_role(request, board_id: int, roles=None) -> bool:
+    """Check that the request user participates in the board, with one of the roles if given"""
+    role = get_board_roles(request).get(board_id)
+    return role is not None and (roles is None or role in roles)
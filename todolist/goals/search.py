@@ -0,0 +1,117 @@
+import re
+
+from django.db import connections
+from django.db.models import BooleanField, FloatField, Q, QuerySet
+from django.db.models.expressions import RawSQL
+from rest_framework.filters import BaseFilterBackend
+from rest_framework.settings import api_settings
+
+from goals.models import Goal, GoalCategory, GoalComment
+
+# Text search configuration of the PostgreSQL search_vector columns, see migration 0011
+SEARCH_CONFIG = "simple"
+MAX_SEARCH_TERMS = 8
+
+# Columns indexed for every searchable model, in the order of the FTS5 table columns
+SEARCH_COLUMNS = {
+    Goal: ("title", "description"),
+    GoalCategory: ("title",),
+    GoalComment: ("text",),
+}
+
+
+def search_terms(query: str) -> list[str]:
+    """Words of the query, every one of them is matched as a prefix"""
+    return re.findall(r"\w+", query.lower())[:MAX_SEARCH_TERMS]
+
+
+def _postgres_search(queryset: QuerySet, terms: list[str]) -> QuerySet:
+    table = queryset.model._meta.db_table
+    ts_query = " & ".join(f"{term}:*" for term in terms)
+    return queryset.filter(
+        RawSQL(
+            f"{table}.search_vector @@ to_tsquery(%s, %s)",
+            (SEARCH_CONFIG, ts_query),
+            output_field=BooleanField(),
+        )
+    ).annotate(
+        search_rank=RawSQL(
+            f"ts_rank({table}.search_vector, to_tsquery(%s, %s))",
+            (SEARCH_CONFIG, ts_query),
+            output_field=FloatField(),
+        )
+    )
+
+
+def _sqlite_search(queryset: QuerySet, terms: list[str]) -> QuerySet:
+    table = queryset.model._meta.db_table
+    fts_table = f"{table}_fts"
+    match = " AND ".join(f'"{term}"*' for term in terms)
+    return queryset.filter(
+        pk__in=RawSQL(f"SELECT rowid FROM {fts_table} WHERE {fts_table} MATCH %s", (match,))
+    ).annotate(
+        # bm25() is lower for better matches
+        search_rank=RawSQL(
+            f"(SELECT -bm25({fts_table}) FROM {fts_table} WHERE {fts_table} MATCH %s AND rowid = {table}.id)",
+            (match,),
+            output_field=FloatField(),
+        )
+    )
+
+
+def _fallback_search(queryset: QuerySet, terms: list[str]) -> QuerySet:
+    condition = Q()
+    for term in terms:
+        term_condition = Q()
+        for column in SEARCH_COLUMNS[queryset.model]:
+            term_condition |= Q(**{f"{column}__icontains": term})
+        condition &= term_condition
+    return queryset.filter(condition).annotate(search_rank=RawSQL("0", (), output_field=FloatField()))
+
+
+def full_text_search(queryset: QuerySet, query: str) -> QuerySet:
+    """Filter the queryset by the indexed text columns, annotate it with `search_rank` (higher is better)"""
+    terms = search_terms(query)
+    if not terms:
+        return queryset
+    vendor = connections[queryset.db].vendor
+    if vendor == "postgresql":
+        return _postgres_search(queryset, terms)
+    if vendor == "sqlite":
+        return _sqlite_search(queryset, terms)
+    return _fallback_search(queryset, terms)
+
+
+class FullTextSearchFilter(BaseFilterBackend):
+    """Search by the `search` query parameter, ordered by rank unless an ordering is requested"""
+    search_param = api_settings.SEARCH_PARAM
+    ordering_param = api_settings.ORDERING_PARAM
+
+    def filter_queryset(self, request, queryset: QuerySet, view) -> QuerySet:
+        query = request.query_params.get(self.search_param, "")
+        if not search_terms(query):
+            return queryset
+        queryset = full_text_search(queryset, query)
+        if request.query_params.get(self.ordering_param):
+            return queryset
+        return queryset.order_by("-search_rank", "id")
+
+    def get_schema_operation_parameters(self, view) -> list[dict]:
+        return [
+            {
+                "name": self.search_param,
+                "required": False,
+                "in": "query",
+                "description": "Full-text search, every word is matched as a prefix",
+                "schema": {"type": "string"},
+            },
+        ]
+
+
+class FullTextSearchAdminMixin:
+    """Admin search through the full-text index instead of ILIKE over search_fields"""
+
+    def get_search_results(self, request, queryset: QuerySet, search_term: str):
+        if not search_terms(search_term):
+            return queryset, False
+        return full_text_search(queryset, search_term), False
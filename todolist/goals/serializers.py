@@ -1,12 +1,20 @@
-from typing import Type
+from datetime import datetime, timezone as dt_timezone
+from functools import partial
+from typing import Optional, Type
 
 from django.db import transaction
+from django.db.models import Count, IntegerField, JSONField, OuterRef, QuerySet, Subquery, prefetch_related_objects
+from django.db.models.functions import Coalesce, JSONObject
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
 from rest_framework import serializers
 from rest_framework.exceptions import PermissionDenied
 
 from core.models import User
 from core.serializers import ProfileSerializer
-from goals.models import GoalCategory, Goal, GoalComment, Board, BoardParticipant
+from goals.cache import bump_board_generation
+from goals.models import GoalCategory, Goal, GoalComment, Board, BoardParticipant, ArchivalJob
+from goals.roles import WRITE_ROLES, has_board_role, invalidate_board_roles
 
 
 class GoalCategoryCreateSerializer(serializers.ModelSerializer):
@@ -23,11 +31,7 @@ class GoalCategoryCreateSerializer(serializers.ModelSerializer):
         if value.is_deleted:
             raise serializers.ValidationError("Not allowed: board is deleted")
 
-        if not BoardParticipant.objects.filter(
-                board=value,
-                role__in=[BoardParticipant.Role.owner, BoardParticipant.Role.writer],
-                user=self.context['request'].user
-        ).exists():
+        if not has_board_role(self.context['request'], value.id, WRITE_ROLES):
             raise serializers.ValidationError("Allowed only for owners or writers")
 
         return value
@@ -43,6 +47,20 @@ class GoalCategorySerializer(serializers.ModelSerializer):
         read_only_fields = ("id", "created", "updated", "user", "board")
 
 
+def check_new_goal_category(request, category: GoalCategory) -> GoalCategory:
+    """Category a goal is created in: of the user, on a board the user writes to"""
+    if request.user.id != category.user_id or not has_board_role(request, category.board_id, WRITE_ROLES):
+        raise PermissionDenied("Вам запрещено создавать цели для данной категории")
+    return category
+
+
+def check_goal_category(request, category: GoalCategory) -> GoalCategory:
+    """Category a goal is moved to: on a board the user writes to"""
+    if not has_board_role(request, category.board_id, WRITE_ROLES):
+        raise PermissionDenied("Вам запрещены изменения целей для данной категории")
+    return category
+
+
 class GoalCreateSerializer(serializers.ModelSerializer):
     """Goal creation serializer"""
     category = serializers.PrimaryKeyRelatedField(
@@ -53,42 +71,190 @@ class GoalCreateSerializer(serializers.ModelSerializer):
     class Meta:
         model = Goal
         fields = "__all__"
-        read_only_fields = ("id", "created", "updated", "user")
+        read_only_fields = ("id", "created", "updated", "user", "board")
 
     def validate_category(self, value: GoalCategory) -> GoalCategory:
         """Validation of goal category"""
-        if self.context["request"].user != value.user:
-            raise PermissionDenied("Вам запрещено создавать цели для данной категории")
+        return check_new_goal_category(self.context["request"], value)
 
-        # if self.instance.category.board_id != value.board_id:
-        #     raise serializers.ValidationError("Transfer from one project to another is not allowed")
 
-        if not BoardParticipant.objects.filter(
-                board_id=value.board.id,
-                role__in=[BoardParticipant.Role.owner, BoardParticipant.Role.writer],
-                user=self.context["request"].user,
-        ).exists():
-            raise PermissionDenied("Вам запрещено создавать цели для данной категории")
+def with_comment_preview(queryset: QuerySet[Goal]) -> QuerySet[Goal]:
+    """Annotate goals with the comment count and the latest comment read by GoalSerializer.
 
-        return value
+    The fields of the latest comment come as one JSON object, so it is looked up once per goal.
+    """
+    comments = GoalComment.objects.filter(goal=OuterRef("pk"))
+    last_comment = comments.order_by("-created", "-id").values(
+        json=JSONObject(id="id", text="text", user_id="user_id", created="created", updated="updated")
+    )
+    return queryset.annotate(
+        comment_count=Coalesce(
+            Subquery(comments.order_by().values("goal").annotate(count=Count("id")).values("count")),
+            0,
+            output_field=IntegerField(),
+        ),
+        last_comment=Subquery(last_comment[:1], output_field=JSONField()),
+    )
+
+
+def comment_time(value: Optional[str]) -> Optional[datetime]:
+    """Date of the with_comment_preview() object, naive ones (SQLite) are in UTC"""
+    if value is None:
+        return None
+    moment = parse_datetime(value)
+    return moment if timezone.is_aware(moment) else timezone.make_aware(moment, dt_timezone.utc)
+
+
+class GoalLastCommentField(serializers.Field):
+    """Latest comment of the goal, read from the with_comment_preview() annotation"""
+    created = serializers.DateTimeField()
+
+    def __init__(self, **kwargs):
+        super().__init__(read_only=True, **kwargs)
+
+    def to_representation(self, value: dict) -> dict:
+        return {
+            "id": value["id"],
+            "text": value["text"],
+            "user": value["user_id"],
+            "created": self.created.to_representation(comment_time(value["created"])),
+        }
 
 
 class GoalSerializer(serializers.ModelSerializer):
-    """Goal serializer"""
+    """Goal serializer, the queryset is expected to go through with_comment_preview()"""
     category = serializers.PrimaryKeyRelatedField(
         queryset=GoalCategory.objects.filter(is_deleted=False)
     )
+    comment_count = serializers.IntegerField(read_only=True)
+    last_comment = GoalLastCommentField()
 
     class Meta:
         model = Goal
         fields = "__all__"
-        read_only_fields = ("id", "created", "updated", "user")
+        read_only_fields = ("id", "created", "updated", "user", "board")
 
     def validate_category(self, value: Type[GoalCategory]) -> GoalCategory:
         """Validation of goal category"""
-        if self.context["request"].user != value.user:
-            raise PermissionDenied("Вам запрещены изменения целей для данной категории")
-        return value
+        return check_goal_category(self.context["request"], value)
+
+
+class GoalBatchOperationSerializer(serializers.Serializer):
+    """One operation of the goal batch: create a goal, update it or change its status"""
+    class Operation:
+        create = "create"
+        update = "update"
+        status = "status"
+
+    op = serializers.ChoiceField(choices=(Operation.create, Operation.update, Operation.status))
+    id = serializers.IntegerField(required=False)
+    title = serializers.CharField(max_length=255, required=False)
+    description = serializers.CharField(allow_null=True, allow_blank=True, required=False)
+    category = serializers.IntegerField(required=False)
+    status = serializers.ChoiceField(choices=Goal.Status.choices, required=False)
+    priority = serializers.ChoiceField(choices=Goal.Priority.choices, required=False)
+    due_date = serializers.DateTimeField(allow_null=True, required=False)
+
+    def validate(self, attrs: dict) -> dict:
+        """Fields required by the operation"""
+        op = attrs["op"]
+        if op == self.Operation.create:
+            missing = [field for field in ("title", "category") if field not in attrs]
+            if "id" in attrs:
+                raise serializers.ValidationError({"id": "Not allowed for create"})
+        else:
+            missing = [field for field in ("id",) if field not in attrs]
+        if op == self.Operation.status:
+            missing += [field for field in ("status",) if field not in attrs]
+            extra = set(attrs) - {"op", "id", "status"}
+            if extra:
+                raise serializers.ValidationError({field: "Not allowed for status change" for field in extra})
+        if missing:
+            raise serializers.ValidationError({field: "This field is required." for field in missing})
+        return attrs
+
+
+class GoalBatchSerializer(serializers.Serializer):
+    """Batch of goal operations, checked against preloaded categories, goals and board roles"""
+    operations = GoalBatchOperationSerializer(many=True, allow_empty=False, max_length=1000)
+    # The rules of GoalCreateView and GoalView, status changes have no category
+    category_checks = {
+        GoalBatchOperationSerializer.Operation.create: check_new_goal_category,
+        GoalBatchOperationSerializer.Operation.update: check_goal_category,
+    }
+
+    def validate_operations(self, operations: list[dict]) -> list[dict]:
+        """Access to every referenced category and goal, one query per model"""
+        request = self.context["request"]
+        category_ids = {op["category"] for op in operations if "category" in op}
+        goal_ids = {op["id"] for op in operations if "id" in op}
+        self.categories = GoalCategory.objects.filter(is_deleted=False).in_bulk(category_ids)
+        self.goals = Goal.objects.exclude(status=Goal.Status.archived).in_bulk(goal_ids)
+
+        errors = []
+        for op in operations:
+            item_errors = {}
+            if "category" in op:
+                category = self.categories.get(op["category"])
+                if category is None:
+                    item_errors["category"] = "Category not found"
+                else:
+                    try:
+                        self.category_checks[op["op"]](request, category)
+                    except PermissionDenied as error:
+                        item_errors["category"] = error.detail
+            if "id" in op:
+                goal = self.goals.get(op["id"])
+                if goal is None or not has_board_role(request, goal.board_id):
+                    item_errors["id"] = "Goal not found"
+                elif goal.user_id != request.user.id or not has_board_role(request, goal.board_id, WRITE_ROLES):
+                    item_errors["id"] = "Вам запрещены изменения данной цели"
+            errors.append(item_errors)
+
+        if any(errors):
+            raise serializers.ValidationError(errors)
+        return operations
+
+    def create(self, validated_data: dict) -> list[dict]:
+        """Apply all operations with one bulk insert and one bulk update"""
+        user = self.context["request"].user
+        now = timezone.now()
+        results: list[dict] = []
+        created: list[Goal] = []
+        changed: dict[int, Goal] = {}
+        changed_fields: set[str] = set()
+        moved_ids: set[int] = set()
+
+        for op in validated_data["operations"]:
+            values = {field: value for field, value in op.items() if field not in ("op", "id")}
+            if "category" in values:
+                category = self.categories[values.pop("category")]
+                values.update(category_id=category.id, board_id=category.board_id)
+            if op["op"] == GoalBatchOperationSerializer.Operation.create:
+                goal = Goal(user=user, **values)
+                created.append(goal)
+            else:
+                goal = self.goals[op["id"]]
+                if values.get("category_id", goal.category_id) != goal.category_id:
+                    moved_ids.add(goal.id)
+                for field, value in values.items():
+                    setattr(goal, field, value)
+                goal.updated = now
+                changed[goal.id] = goal
+                changed_fields.update(field.removesuffix("_id") for field in values)
+            results.append({"op": op["op"], "goal": goal})
+
+        with transaction.atomic():
+            Goal.objects.bulk_create(created)
+            if changed:
+                Goal.objects.bulk_update(changed.values(), [*changed_fields, "updated"])
+            if moved_ids:
+                GoalComment.objects.filter(goal_id__in=moved_ids).update(
+                    board_id=Subquery(Goal.objects.filter(pk=OuterRef("goal_id")).values("board_id")[:1]),
+                    updated=now,
+                )
+
+        return [{"op": result["op"], "id": result["goal"].id} for result in results]
 
 
 class GoalCommentCreateSerializer(serializers.ModelSerializer):
@@ -98,7 +264,7 @@ class GoalCommentCreateSerializer(serializers.ModelSerializer):
     class Meta:
         model = GoalComment
         fields = "__all__"
-        read_only_fields = ("id", "created", "updated", "user")
+        read_only_fields = ("id", "created", "updated", "user", "board")
 
 
 class GoalCommentSerializer(serializers.ModelSerializer):
@@ -108,7 +274,7 @@ class GoalCommentSerializer(serializers.ModelSerializer):
     class Meta:
         model = GoalComment
         fields = "__all__"
-        read_only_fields = ("id", "created", "updated", "user", "goal")
+        read_only_fields = ("id", "created", "updated", "user", "goal", "board")
 
 
 class BoardCreateSerializer(serializers.ModelSerializer):
@@ -131,9 +297,9 @@ class BoardCreateSerializer(serializers.ModelSerializer):
 
 
 class BoardParticipantSerializer(serializers.ModelSerializer):
-    """Board participant serializer"""
+    """Board participant serializer, usernames are resolved by BoardSerializer for the whole roster"""
     role = serializers.ChoiceField(required=True, choices=BoardParticipant.Role.choices[1:])
-    user = serializers.SlugRelatedField(slug_field="username", queryset=User.objects.all())
+    user = serializers.CharField(source="user.username")
 
     class Meta:
         model = BoardParticipant
@@ -151,39 +317,87 @@ class BoardSerializer(serializers.ModelSerializer):
         fields = "__all__"
         read_only_fields = ("id", "created", "updated")
 
-    def update(self, instance, validated_data: dict) -> Board:
-        """Update Board, add users to the board participants"""
+    def validate_participants(self, participants: list[dict]) -> list[dict]:
+        """Resolve all participant usernames with one query"""
+        usernames = {participant["user"]["username"] for participant in participants}
+        user_ids = dict(User.objects.filter(username__in=usernames).values_list("username", "id"))
+        if unknown := usernames - user_ids.keys():
+            raise serializers.ValidationError(f"Users not found: {', '.join(sorted(unknown))}")
+        return [
+            {"user_id": user_ids[participant["user"]["username"]], "role": participant["role"]}
+            for participant in participants
+        ]
+
+    def to_representation(self, instance: Board) -> dict:
+        if "participants" not in getattr(instance, "_prefetched_objects_cache", {}):
+            prefetch_related_objects([instance], "participants__user")
+        return super().to_representation(instance)
+
+    def update(self, instance: Board, validated_data: dict) -> Board:
+        """Update Board and its participants with one delete, one update and one insert statement"""
         owner = validated_data.pop("user")
-        new_participants = validated_data.pop("participants")
-        new_by_id = {part["user"].id: part for part in new_participants}
+        new_participants = validated_data.pop("participants", None)
 
-        old_participants = instance.participants.exclude(user=owner)
         with transaction.atomic():
-            for old_participant in old_participants:
-                if old_participant.user_id not in new_by_id:
-                    old_participant.delete()
-                else:
-                    if (
-                            old_participant.role
-                            != new_by_id[old_participant.user_id]["role"]
-                    ):
-                        old_participant.role = new_by_id[old_participant.user_id]["role"]
-                        old_participant.save()
-                    new_by_id.pop(old_participant.user_id)
-            for new_part in new_by_id.values():
-                BoardParticipant.objects.create(
-                    board=instance, user=new_part["user"], role=new_part["role"]
-                )
+            if new_participants is not None:
+                self._update_participants(instance, owner, new_participants)
 
-            if title := validated_data.get("title)"):
+            if title := validated_data.get("title"):
                 instance.title = title
-                instance.save()
+                instance.save(update_fields=("title", "updated"))
 
         return instance
 
+    @staticmethod
+    def _update_participants(instance: Board, owner: User, new_participants: list[dict]) -> None:
+        new_roles = {
+            participant["user_id"]: participant["role"]
+            for participant in new_participants
+            if participant["user_id"] != owner.id
+        }
+        old_participants = list(instance.participants.exclude(user=owner).only("id", "board_id", "user_id", "role"))
+        old_user_ids = {participant.user_id for participant in old_participants}
+        now = timezone.now()
+
+        removed = [participant.id for participant in old_participants if participant.user_id not in new_roles]
+        changed = []
+        for participant in old_participants:
+            role = new_roles.get(participant.user_id)
+            if role is not None and role != participant.role:
+                participant.role = role
+                participant.updated = now
+                changed.append(participant)
+        added = [
+            BoardParticipant(board=instance, user_id=user_id, role=role)
+            for user_id, role in new_roles.items()
+            if user_id not in old_user_ids
+        ]
+
+        if removed:
+            BoardParticipant.objects.filter(id__in=removed).delete()
+        if changed:
+            BoardParticipant.objects.bulk_update(changed, ["role", "updated"])
+        if added:
+            BoardParticipant.objects.bulk_create(added)
+
+        # bulk_update() and bulk_create() do not send signals, the caches are reset after the commit
+        transaction.on_commit(partial(invalidate_board_roles, *(participant.user_id for participant in changed + added)))
+        transaction.on_commit(partial(bump_board_generation, instance.id))
+
 
 class BoardListSerializer(serializers.ModelSerializer):
     """Board list serializer"""
     class Meta:
         model = Board
         fields = "__all__"
+
+
+class ArchivalJobSerializer(serializers.ModelSerializer):
+    """Archival job progress serializer"""
+    class Meta:
+        model = ArchivalJob
+        fields = "__all__"
+        read_only_fields = (
+            "id", "created", "updated", "board", "category", "status", "categories_archived", "goals_archived",
+            "finished",
+        )
@@ -0,0 +1,50 @@
+from functools import partial
+
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from goals.cache import bump_board_generation
+from goals.models import Board, BoardParticipant, Goal, GoalCategory, GoalComment, Tombstone
+from goals.roles import invalidate_board_roles
+
+
+@receiver([post_save, post_delete], sender=BoardParticipant)
+def participant_changed(sender, instance: BoardParticipant, **kwargs) -> None:
+    """Reset cached board roles of the participant user and cached responses of the board.
+
+    After the commit: a request reading the old rows under the new version would cache them again.
+    """
+    transaction.on_commit(partial(invalidate_board_roles, instance.user_id))
+    transaction.on_commit(partial(bump_board_generation, instance.board_id))
+
+
+@receiver([post_save, post_delete], sender=Board)
+def board_changed(sender, instance: Board, **kwargs) -> None:
+    """Reset cached responses of the board"""
+    bump_board_generation(instance.id)
+
+
+@receiver([post_save, post_delete], sender=GoalCategory)
+def category_changed(sender, instance: GoalCategory, **kwargs) -> None:
+    """Reset cached responses of the category board, and of the board it was moved from"""
+    # post_save is sent before save() forgets the board the category was loaded with
+    loaded_board_id = getattr(instance, "_loaded_board_id", None)
+    board_ids = {instance.board_id, loaded_board_id} - {None}
+    bump_board_generation(*board_ids)
+
+
+@receiver(post_delete, sender=Board)
+@receiver(post_delete, sender=GoalCategory)
+@receiver(post_delete, sender=Goal)
+@receiver(post_delete, sender=GoalComment)
+def object_deleted(sender, instance, **kwargs) -> None:
+    """Leave a tombstone of the deleted object for the delta sync"""
+    kinds = {
+        Board: Tombstone.Kind.board,
+        GoalCategory: Tombstone.Kind.category,
+        Goal: Tombstone.Kind.goal,
+        GoalComment: Tombstone.Kind.comment,
+    }
+    board_id = instance.id if sender is Board else instance.board_id
+    Tombstone.objects.create(kind=kinds[sender], object_id=instance.id, board_id=board_id)
@@ -0,0 +1,184 @@
+import base64
+import json
+from datetime import datetime, timedelta
+from typing import Optional
+
+from django.conf import settings
+from django.db.models import Q, QuerySet
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+from rest_framework.exceptions import NotFound
+
+from goals.export import EXPORT_FIELDS, plain
+from goals.models import Board, Goal, GoalCategory, GoalComment, Tombstone
+
+SYNC_FIELDS = {
+    "board": ("id", "title", "is_deleted", "created", "updated"),
+    **EXPORT_FIELDS,
+}
+
+# Column and value of the rows a client drops, they are reported as deleted
+DEAD = {
+    "board": ("is_deleted", True),
+    "category": ("is_deleted", True),
+    "goal": ("status", Goal.Status.archived),
+    "comment": None,
+}
+
+
+def _live(kind: str) -> Q:
+    if DEAD[kind] is None:
+        return Q()
+    field, value = DEAD[kind]
+    return ~Q(**{field: value})
+
+
+def _is_live(kind: str, row: dict) -> bool:
+    if DEAD[kind] is None:
+        return True
+    field, value = DEAD[kind]
+    return row[field] != value
+
+
+def _querysets(board_ids: list[int]) -> dict[str, QuerySet]:
+    return {
+        "board": Board.objects.filter(id__in=board_ids),
+        "category": GoalCategory.objects.filter(board_id__in=board_ids),
+        "goal": Goal.objects.filter(board_id__in=board_ids),
+        "comment": GoalComment.objects.filter(board_id__in=board_ids),
+        "tombstone": Tombstone.objects.filter(board_id__in=board_ids),
+    }
+
+
+def tombstone_cutoff() -> datetime:
+    """Tombstones older than this are pruned, cursors older than this are refused"""
+    return timezone.now() - timedelta(days=settings.GOALS_TOMBSTONE_RETENTION_DAYS)
+
+
+def prune_tombstones() -> int:
+    """Delete the expired tombstones, see `manage.py prune_tombstones`"""
+    deleted, _ = Tombstone.objects.filter(updated__lt=tombstone_cutoff()).delete()
+    return deleted
+
+
+def encode_cursor(streams: list[dict]) -> str:
+    """Cursor of the streams, each with its board ids and the position of every model"""
+    return base64.urlsafe_b64encode(json.dumps(streams, default=plain).encode("ascii")).decode("ascii")
+
+
+def decode_cursor(encoded: str) -> list[dict]:
+    try:
+        streams = []
+        for raw in json.loads(base64.urlsafe_b64decode(encoded.encode("ascii"))):
+            position = {}
+            for kind in (*SYNC_FIELDS, "tombstone"):
+                updated, row_id = raw["position"][kind]
+                position[kind] = [parse_datetime(updated), int(row_id)]
+                if position[kind][0] is None:
+                    raise ValueError
+            streams.append({"boards": [int(board_id) for board_id in raw["boards"]], "position": position})
+    except (TypeError, ValueError, LookupError):
+        raise NotFound("Invalid cursor")
+    if any(stream["position"]["tombstone"][0] < tombstone_cutoff() for stream in streams):
+        # The deletions after it may be pruned already, the client has to sync again without a cursor
+        raise NotFound("Expired cursor")
+    return streams
+
+
+def _after(queryset: QuerySet, position: list) -> QuerySet:
+    updated, row_id = position
+    return queryset.filter(Q(updated__gt=updated) | Q(updated=updated, id__gt=row_id)).order_by("updated", "id")
+
+
+def _next(rows: list[dict], position: Optional[list], settled) -> list:
+    """Position after the last returned row, the old one (or the settle time) when nothing was returned"""
+    if rows:
+        return [rows[-1]["updated"], rows[-1]["id"]]
+    return position or [settled, 0]
+
+
+def _sync_stream(board_ids: list[int], position: Optional[dict], settled: datetime, limit: int,
+                 changes: dict[str, list[dict]], deleted: dict[str, list[int]]) -> tuple[dict, bool]:
+    """Add the changes of the boards after the position to the lists, return the next position and has_more"""
+    querysets = {kind: queryset.filter(updated__lt=settled) for kind, queryset in _querysets(board_ids).items()}
+    next_position: dict[str, list] = {}
+    has_more = False
+
+    for kind, fields in SYNC_FIELDS.items():
+        if position is None:
+            queryset = querysets[kind].filter(_live(kind)).order_by("updated", "id")
+        else:
+            queryset = _after(querysets[kind], position[kind])
+        rows = list(queryset.values(*fields)[:limit + 1])
+        has_more |= len(rows) > limit
+        rows = rows[:limit]
+        for row in rows:
+            if _is_live(kind, row):
+                changes[kind].append({field: plain(value) for field, value in row.items()})
+            else:
+                deleted[kind].append(row["id"])
+        next_position[kind] = _next(rows, position and position[kind], settled)
+
+    if position is None:
+        # Nothing deleted before the first sync concerns the client
+        next_position["tombstone"] = [settled, 0]
+    else:
+        rows = list(_after(querysets["tombstone"], position["tombstone"]).values(
+            "id", "kind", "object_id", "updated"
+        )[:limit + 1])
+        has_more |= len(rows) > limit
+        rows = rows[:limit]
+        for row in rows:
+            deleted[row["kind"]].append(row["object_id"])
+        # No tombstone saved before the settle time follows the position, moving it keeps the cursor from expiring
+        next_position["tombstone"] = _next(rows, None, settled)
+    return next_position, has_more
+
+
+def sync_changes(board_ids: list[int], cursor: Optional[str], limit: int) -> dict:
+    """Rows of the boards changed after the cursor and the ids of the rows deleted after it.
+
+    Every model is read by its (updated, id) position from the (board, updated, id) index, at most
+    `limit` rows per model. Archived goals and deleted boards and categories are reported among
+    the deleted ids, just like the hard deleted rows recorded as tombstones. Without a cursor all
+    live rows are returned and nothing is reported as deleted.
+
+    The cursor keeps the board ids it covers: the boards the user joined since are fetched in full
+    as a stream of their own, at most `limit` rows per model as well. A stream that caught up joins
+    the first one at the earlier of their positions, the rows in between are sent once more.
+    """
+    streams = decode_cursor(cursor) if cursor else []
+    # `updated` is set before the transaction commits, so a row with an older timestamp may still
+    # become visible after the cursor passed it: rows saved this recently are left for the next sync
+    settled = timezone.now() - timedelta(seconds=settings.GOALS_SYNC_SETTLE_TIME)
+    current = set(board_ids)
+    active = []
+    for stream in streams:
+        boards = [board_id for board_id in stream["boards"] if board_id in current]
+        if boards:
+            active.append({"boards": boards, "position": stream["position"]})
+    new_boards = sorted(current.difference(*(stream["boards"] for stream in active)))
+    if new_boards:
+        active.append({"boards": new_boards, "position": None})
+
+    changes: dict[str, list[dict]] = {kind: [] for kind in SYNC_FIELDS}
+    deleted: dict[str, list[int]] = {kind: [] for kind in SYNC_FIELDS}
+    has_more = False
+    next_streams: list[dict] = []
+    for stream in active:
+        position, more = _sync_stream(stream["boards"], stream["position"], settled, limit, changes, deleted)
+        has_more |= more
+        if next_streams and not more:
+            first = next_streams[0]
+            first["boards"] += stream["boards"]
+            first["position"] = {kind: min(first["position"][kind], position[kind]) for kind in position}
+        else:
+            next_streams.append({"boards": stream["boards"], "position": position})
+
+    return {
+        "boards": board_ids,
+        "changes": changes,
+        "deleted": deleted,
+        "has_more": has_more,
+        "cursor": encode_cursor(next_streams),
+    }
@@ -6,6 +6,8 @@ from goals import views
 urlpatterns = [
     path("board/create", views.BoardCreateView.as_view(), name='board-create'),
     path("board/list", views.BoardListView.as_view(), name='board-list'),
+    path("board/summary", views.BoardSummaryView.as_view(), name='board-summary'),
+    path("board/<pk>/export", views.BoardExportView.as_view(), name='board-export'),
     path("board/<pk>", views.BoardView.as_view(), name='board-retrieve-update-destroy'),
 
     path("goal_category/create", views.GoalCategoryCreateView.as_view(), name='category-create'),
@@ -14,8 +16,15 @@ urlpatterns = [
 
     path("goal/create", views.GoalCreateView.as_view(), name='goal-create'),
     path("goal/list", views.GoalListView.as_view(), name='goal-list'),
+    path("goal/import", views.GoalImportView.as_view(), name='goal-import'),
+    path("goal/deadlines", views.GoalDeadlineView.as_view(), name='goal-deadlines'),
+    path("goal/batch", views.GoalBatchView.as_view(), name='goal-batch'),
     path("goal/<pk>", views.GoalView.as_view(), name='goal-retrieve-update-destroy'),
 
+    path("sync", views.SyncView.as_view(), name='sync'),
+    path("archival/<pk>", views.ArchivalJobView.as_view(), name='archival-retrieve'),
+    path("cache/stats", views.ResponseCacheStatsView.as_view(), name='cache-stats'),
+
     path("goal_comment/create", views.GoalCommentCreateView.as_view(), name='comment-create'),
     path("goal_comment/list", views.GoalCommentListView.as_view(), name='comment-list'),
     path("goal_comment/<pk>", views.GoalCommentView.as_view(), name='comment-retrieve-update-destroy'),
@@ -0,0 +1,127 @@
+from functools import lru_cache
+from typing import Any, Callable, Iterable, NamedTuple, Optional
+
+from django.db.models import QuerySet
+from rest_framework import serializers
+from rest_framework.exceptions import ValidationError
+from rest_framework.response import Response
+
+from core.profiling import measure
+from goals.pagination import KeysetPagination
+
+# Fields whose to_representation() returns the database value as it is
+_PLAIN_FIELDS = (
+    serializers.IntegerField,
+    serializers.CharField,
+    serializers.BooleanField,
+    serializers.ChoiceField,
+    serializers.PrimaryKeyRelatedField,
+)
+
+
+class _Column(NamedTuple):
+    name: str
+    lookup: Optional[str]
+    convert: Optional[Callable[[Any], Any]]
+    nested: Optional["ValuesSerializer"]
+
+
+class ValuesSerializer:
+    """Read-only counterpart of a model serializer working on .values() rows.
+
+    The field mapping is compiled once from the serializer fields: plain fields are copied as they
+    are, the others (dates) go through the original field to_representation(), nested serializers
+    become `relation__field` lookups. The output is the same as the serializer output.
+    """
+
+    def __init__(self, columns: list[_Column]):
+        self.columns = columns
+
+    @classmethod
+    def from_serializer(cls, serializer: serializers.Serializer, prefix: str = "") -> "ValuesSerializer":
+        columns = []
+        for name, field in serializer.fields.items():
+            if field.write_only:
+                continue
+            if isinstance(field, serializers.Serializer) and field.source == "*":
+                # Fields of the nested serializer are columns of the same row, it is null when its first one is
+                nested = cls.from_serializer(field, prefix=prefix)
+                columns.append(_Column(name, nested.columns[0].lookup, None, nested))
+            elif isinstance(field, serializers.Serializer):
+                nested = cls.from_serializer(field, prefix=f"{prefix}{field.source}__")
+                columns.append(_Column(name, f"{prefix}{field.source}", None, nested))
+            else:
+                convert = None if isinstance(field, _PLAIN_FIELDS) else field.to_representation
+                columns.append(_Column(name, f"{prefix}{field.source}", convert, None))
+        return cls(columns)
+
+    @property
+    def lookups(self) -> list[str]:
+        """Arguments of .values() for the rows"""
+        lookups = []
+        for column in self.columns:
+            lookups.append(column.lookup)
+            if column.nested is not None:
+                lookups.extend(column.nested.lookups)
+        return list(dict.fromkeys(lookups))
+
+    def only(self, names: Optional[Iterable[str]]) -> "ValuesSerializer":
+        """Sparse fieldset of the top level fields"""
+        if names is None:
+            return self
+        names = list(names)
+        unknown = set(names) - {column.name for column in self.columns}
+        if unknown:
+            raise ValidationError({"fields": f"Unknown fields: {', '.join(sorted(unknown))}"})
+        return ValuesSerializer([column for column in self.columns if column.name in names])
+
+    def to_representation(self, row: dict) -> dict:
+        result = {}
+        for name, lookup, convert, nested in self.columns:
+            value = row[lookup]
+            if nested is not None:
+                result[name] = None if value is None else nested.to_representation(row)
+            elif value is None or convert is None:
+                result[name] = value
+            else:
+                result[name] = convert(value)
+        return result
+
+    def serialize(self, rows: Iterable[dict]) -> list[dict]:
+        to_representation = self.to_representation
+        rows = list(rows)
+        with measure("serializer"):
+            return [to_representation(row) for row in rows]
+
+
+@lru_cache(maxsize=None)
+def values_serializer_for(serializer_class: type[serializers.Serializer]) -> ValuesSerializer:
+    """Compiled mapping of the serializer class"""
+    return ValuesSerializer.from_serializer(serializer_class())
+
+
+class ValuesListMixin:
+    """Read-only list built from .values() rows instead of model instances and serializer fields.
+
+    Supports sparse fieldsets with `?fields=id,title`. The view is expected to build its list
+    response through ConditionalResponseMixin.list_response().
+    """
+    fields_query_param = "fields"
+
+    def get_values_serializer(self) -> ValuesSerializer:
+        fields = self.request.query_params.get(self.fields_query_param)
+        names = [name.strip() for name in fields.split(",") if name.strip()] if fields else None
+        return values_serializer_for(self.get_serializer_class()).only(names)
+
+    def list_response(self, queryset: QuerySet) -> Response:
+        rows = self.get_values_serializer()
+        lookups = rows.lookups
+        if isinstance(self.paginator, KeysetPagination):
+            # The cursor is built from the ordering fields of the last row
+            lookups += [name.lstrip("-") for name in self.paginator.ordering if name.lstrip("-") not in lookups]
+        queryset = queryset.values(*lookups)
+
+        page = self.paginate_queryset(queryset)
+        if page is not None:
+            return self.get_paginated_response(rows.serialize(page))
+        return Response(rows.serialize(queryset))
@@ -1,19 +1,36 @@
+from datetime import datetime, timedelta
 from typing import Optional
 
+from django.conf import settings
 from django.db import transaction
-from django.db.models import Q, QuerySet
+from django.db.models import Count, Max, Q, QuerySet, Sum
+from django.db.models.fields.json import KeyTextTransform
+from django.http import StreamingHttpResponse
+from django.utils import timezone
 from django_filters.rest_framework import DjangoFilterBackend
 from rest_framework.generics import CreateAPIView, ListAPIView, RetrieveUpdateDestroyAPIView
-from rest_framework import permissions, filters, generics
+from rest_framework import permissions, filters, generics, status
+from rest_framework.exceptions import NotFound, ValidationError
 from rest_framework.pagination import LimitOffsetPagination
+from rest_framework.response import Response
 
+from goals.archival import schedule_board_archival, schedule_category_archival
+from goals.bulk_import import IMPORT_TYPES, GoalImporter, parse_records
+from goals.cache import CachedListMixin, response_cache_stats
+from goals.conditional import ConditionalResponseMixin
+from goals.export import EXPORT_TYPES, export_lines
 from goals.filters import GoalDateFilter, BoardGoalCategoryFilter
-from goals.models import GoalCategory, Goal, GoalComment, Board
+from goals.models import GoalCategory, Goal, GoalComment, Board, ArchivalJob
+from goals.pagination import KeysetPaginationMixin, GoalKeysetPagination, GoalCommentKeysetPagination, limit_param
 from goals.permissions import IsOwnerOrReadOnly, BoardPermission, GoalCategoryPermission, GoalPermission, \
     CommentsPermission
+from goals.roles import get_board_roles
+from goals.search import FullTextSearchFilter
 from goals.serializers import GoalCategoryCreateSerializer, GoalCategorySerializer, GoalCreateSerializer, \
-    GoalSerializer, GoalCommentCreateSerializer, GoalCommentSerializer, BoardCreateSerializer, \
-    BoardListSerializer, BoardSerializer
+    GoalSerializer, GoalBatchSerializer, GoalCommentCreateSerializer, GoalCommentSerializer, BoardCreateSerializer, \
+    BoardListSerializer, BoardSerializer, ArchivalJobSerializer, comment_time, with_comment_preview
+from goals.sync import sync_changes
+from goals.values import ValuesListMixin, values_serializer_for
 
 
 class BoardCreateView(generics.CreateAPIView):
@@ -22,7 +39,7 @@ class BoardCreateView(generics.CreateAPIView):
     serializer_class = BoardCreateSerializer
 
 
-class BoardListView(generics.ListAPIView):
+class BoardListView(CachedListMixin, ConditionalResponseMixin, generics.ListAPIView):
     """Board list for board participant user"""
     model = Board
     permission_classes = [BoardPermission]
@@ -38,7 +55,52 @@ class BoardListView(generics.ListAPIView):
         return Board.objects.filter(participants__user_id=self.request.user.id, is_deleted=False)
 
 
-class BoardView(generics.RetrieveUpdateDestroyAPIView):
+class BoardSummaryView(generics.GenericAPIView):
+    """Goal counts per status, priority and category with overdue counts, for one or all user boards"""
+    permission_classes = [permissions.IsAuthenticated]
+
+    def get(self, request, *args, **kwargs) -> Response:
+        board_ids = list(get_board_roles(request))
+        if board_id := request.query_params.get('board'):
+            if not board_id.isdigit() or int(board_id) not in board_ids:
+                raise NotFound
+            board_ids = [int(board_id)]
+
+        rows = Goal.objects.filter(board_id__in=board_ids, board__is_deleted=False).values(
+            'board_id', 'category_id', 'status', 'priority'
+        ).annotate(
+            count=Count('id'),
+            overdue=Count('id', filter=Q(
+                due_date__lt=timezone.now(),
+                status__in=Goal.OPEN_STATUSES
+            )),
+        ).order_by('board_id', 'category_id', 'status', 'priority')
+
+        boards: dict[int, dict] = {}
+        for row in rows:
+            board = boards.setdefault(row['board_id'], {
+                'board': row['board_id'],
+                'total': 0,
+                'overdue': 0,
+                'by_status': {status: 0 for status in Goal.Status.values},
+                'by_priority': {priority: 0 for priority in Goal.Priority.values},
+                'cells': [],
+            })
+            board['total'] += row['count']
+            board['overdue'] += row['overdue']
+            board['by_status'][row['status']] += row['count']
+            board['by_priority'][row['priority']] += row['count']
+            board['cells'].append({
+                'category': row['category_id'],
+                'status': row['status'],
+                'priority': row['priority'],
+                'count': row['count'],
+                'overdue': row['overdue'],
+            })
+        return Response({'boards': list(boards.values())})
+
+
+class BoardView(ConditionalResponseMixin, generics.RetrieveUpdateDestroyAPIView):
     """Board Retrieve/Update/Destroy APIView"""
     model = Board
     permission_classes = [BoardPermission]
@@ -46,23 +108,86 @@ class BoardView(generics.RetrieveUpdateDestroyAPIView):
 
     def get_queryset(self) -> Optional[QuerySet[Board]]:
         """List of Boards for board participant user"""
-        return Board.objects.prefetch_related("participants").filter(
+        return Board.objects.prefetch_related("participants__user").filter(
             participants__user_id=self.request.user.id,
             is_deleted=False)
 
+    def get_object_state(self, instance: Board) -> tuple[list, Optional[datetime]]:
+        """Board state together with its prefetched participants"""
+        participants = instance.participants.all()
+        last_modified = max((instance.updated, *(participant.updated for participant in participants)))
+        return [instance.pk, len(participants), last_modified], last_modified
+
+    def destroy(self, request, *args, **kwargs) -> Response:
+        """Archive the board in the background when deferred archival is on"""
+        if not settings.GOALS_DEFERRED_ARCHIVAL:
+            return super().destroy(request, *args, **kwargs)
+        job = schedule_board_archival(self.get_object())
+        return Response(ArchivalJobSerializer(job).data, status=status.HTTP_202_ACCEPTED)
+
     def perform_destroy(self, instance: Board) -> Board:
         """Update 'is_deleted' Board field and its Categories to True, also update the Goals status field
         to 'archived' field"""
         with transaction.atomic():
             instance.is_deleted = True
-            instance.save(update_fields=('is_deleted',))
-            instance.categories.update(is_deleted=True)
-            Goal.objects.filter(category__board=instance).update(
-                status=Goal.Status.archived
+            instance.save(update_fields=('is_deleted', 'updated'))
+            instance.categories.update(is_deleted=True, updated=timezone.now())
+            Goal.objects.filter(board=instance).update(
+                status=Goal.Status.archived, updated=timezone.now()
             )
         return instance
 
 
+class BoardExportView(generics.GenericAPIView):
+    """Streaming NDJSON or CSV export of the board categories, goals and comments"""
+    permission_classes = [BoardPermission]
+    export_chunk_size = 2000
+
+    def get_queryset(self) -> QuerySet[Board]:
+        return Board.objects.filter(participants__user_id=self.request.user.id, is_deleted=False)
+
+    def get(self, request, *args, **kwargs) -> StreamingHttpResponse:
+        export_type = request.query_params.get('type', 'ndjson')
+        if export_type not in EXPORT_TYPES:
+            raise ValidationError({'type': f"Unknown export type, expected one of: {', '.join(EXPORT_TYPES)}"})
+        board = self.get_object()
+        response = StreamingHttpResponse(
+            export_lines(board.id, export_type, chunk_size=self.export_chunk_size),
+            content_type=EXPORT_TYPES[export_type],
+        )
+        response.headers['Content-Disposition'] = f'attachment; filename="board-{board.id}.{export_type}"'
+        return response
+
+
+class SyncView(generics.GenericAPIView):
+    """Boards, categories, goals and comments changed or deleted since the cursor of the previous sync"""
+    permission_classes = [permissions.IsAuthenticated]
+    page_size = 500
+    max_page_size = 2000
+
+    def get(self, request, *args, **kwargs) -> Response:
+        limit = limit_param(request.query_params.get('limit'), self.page_size, self.max_page_size)
+        board_ids = sorted(get_board_roles(request))
+        return Response(sync_changes(board_ids, request.query_params.get('cursor'), limit))
+
+
+class ResponseCacheStatsView(generics.GenericAPIView):
+    """Hit and miss counters of the list response cache"""
+    permission_classes = [permissions.IsAdminUser]
+
+    def get(self, request, *args, **kwargs) -> Response:
+        return Response(response_cache_stats())
+
+
+class ArchivalJobView(generics.RetrieveAPIView):
+    """Progress of the deferred archival of a board or category"""
+    permission_classes = [permissions.IsAuthenticated]
+    serializer_class = ArchivalJobSerializer
+
+    def get_queryset(self) -> QuerySet[ArchivalJob]:
+        return ArchivalJob.objects.filter(board_id__in=list(get_board_roles(self.request)))
+
+
 class GoalCategoryCreateView(CreateAPIView):
     """New GoalCategory creation"""
     model = GoalCategory
@@ -70,7 +195,7 @@ class GoalCategoryCreateView(CreateAPIView):
     serializer_class = GoalCategoryCreateSerializer
 
 
-class GoalCategoryListView(ListAPIView):
+class GoalCategoryListView(CachedListMixin, ConditionalResponseMixin, ListAPIView):
     """Board list for GoalCategory board participant user"""
     model = GoalCategory
     permission_classes = [GoalCategoryPermission]
@@ -78,26 +203,31 @@ class GoalCategoryListView(ListAPIView):
     pagination_class = LimitOffsetPagination
     filter_backends = [
         filters.OrderingFilter,
-        filters.SearchFilter,
+        FullTextSearchFilter,
         DjangoFilterBackend,
     ]
-    filterset_fields = BoardGoalCategoryFilter
+    filterset_class = BoardGoalCategoryFilter
     ordering_fields = ["title", "created"]
     ordering = ["title"]
-    search_fields = ["title"]
 
     def get_queryset(self) -> Optional[QuerySet[GoalCategory]]:
         """List of all non-archived GoalCategories for board participant user"""
         if self.request.query_params.get('board'):
-            return GoalCategory.objects.filter(board=self.request.query_params.get('board'), is_deleted=False)
+            return GoalCategory.objects.select_related('user').filter(
+                board=self.request.query_params.get('board'),
+                board__participants__user_id=self.request.user.id,
+                board__is_deleted=False,
+                is_deleted=False
+            )
         else:
-            return GoalCategory.objects.prefetch_related('board__participants').filter(
+            return GoalCategory.objects.select_related('user').filter(
                 board__participants__user__id=self.request.user.id,
+                board__is_deleted=False,
                 is_deleted=False
             )
 
 
-class GoalCategoryView(RetrieveUpdateDestroyAPIView):
+class GoalCategoryView(ConditionalResponseMixin, RetrieveUpdateDestroyAPIView):
     """GoalCategory Retrieve/Update/Destroy APIView"""
     model = GoalCategory
     serializer_class = GoalCategorySerializer
@@ -105,49 +235,156 @@ class GoalCategoryView(RetrieveUpdateDestroyAPIView):
 
     def get_queryset(self) -> Optional[QuerySet[GoalCategory]]:
         """List of GoalCategories for board participant user"""
-        return GoalCategory.objects.prefetch_related('board__participants').filter(
+        return GoalCategory.objects.select_related('user').filter(
             board__participants__user__id=self.request.user.id,
             is_deleted=False
         )
 
+    def destroy(self, request, *args, **kwargs) -> Response:
+        """Archive the category goals in the background when deferred archival is on"""
+        if not settings.GOALS_DEFERRED_ARCHIVAL:
+            return super().destroy(request, *args, **kwargs)
+        job = schedule_category_archival(self.get_object())
+        return Response(ArchivalJobSerializer(job).data, status=status.HTTP_202_ACCEPTED)
+
     def perform_destroy(self, instance: GoalCategory) -> GoalCategory:
         """Update 'is_deleted' GoalCategory field to True, also update the Goals status field to 'archived' field"""
         with transaction.atomic():
             instance.is_deleted = True
-            instance.save(update_fields=('is_deleted',))
-            Goal.objects.filter(category=instance).update(status=Goal.Status.archived)
+            instance.save(update_fields=('is_deleted', 'updated'))
+            Goal.objects.filter(category=instance).update(status=Goal.Status.archived, updated=timezone.now())
         return instance
 
 
+def visible_goals(user_id: int) -> QuerySet[Goal]:
+    """Goals without archived status for board participant user"""
+    return Goal.objects.filter(
+        Q(board__participants__user_id=user_id) & ~Q(status=Goal.Status.archived),
+        board__is_deleted=False,
+        category__is_deleted=False,
+    )
+
+
+def participant_goals(user_id: int) -> QuerySet[Goal]:
+    """Goals without archived status for board participant user, with the comment preview"""
+    return with_comment_preview(visible_goals(user_id).select_related('user', 'category'))
+
+
 class GoalCreateView(CreateAPIView):
     """Create a new Goal"""
     permission_classes = [permissions.IsAuthenticated]
     serializer_class = GoalCreateSerializer
 
 
-class GoalListView(ListAPIView):
+class GoalBatchView(generics.GenericAPIView):
+    """Create, update and change status of many Goals in one transaction"""
+    permission_classes = [permissions.IsAuthenticated]
+    serializer_class = GoalBatchSerializer
+
+    def post(self, request, *args, **kwargs) -> Response:
+        serializer = self.get_serializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        return Response({"results": serializer.save()})
+
+
+class GoalImportView(generics.GenericAPIView):
+    """Bulk import of goals and comments from an NDJSON or CSV request body.
+
+    The body is read line by line and written in batches, `?checkpoint=<line>` skips the lines
+    committed by a previous interrupted import.
+    """
+    permission_classes = [permissions.IsAuthenticated]
+    default_batch_size = 1000
+    max_batch_size = 5000
+
+    def get_int_param(self, name: str, default: int, maximum: Optional[int] = None) -> int:
+        value = self.request.query_params.get(name, default)
+        try:
+            value = int(value)
+        except ValueError:
+            raise ValidationError({name: "A valid integer is required."})
+        if value < 0 or (maximum is not None and value > maximum):
+            raise ValidationError({name: f"Expected a value between 0 and {maximum}."})
+        return value
+
+    def post(self, request, *args, **kwargs) -> Response:
+        import_type = request.query_params.get('type', 'ndjson')
+        if import_type not in IMPORT_TYPES:
+            raise ValidationError({'type': f"Unknown import type, expected one of: {', '.join(IMPORT_TYPES)}"})
+        batch_size = self.get_int_param('batch_size', self.default_batch_size, self.max_batch_size) or 1
+        checkpoint = self.get_int_param('checkpoint', 0)
+
+        lines = (line.decode('utf-8') for line in (request.stream or ()))
+        importer = GoalImporter(request.user, batch_size=batch_size)
+        report = importer.run(parse_records(lines, import_type), checkpoint=checkpoint)
+        return Response(report.as_dict())
+
+
+class GoalDeadlineView(generics.GenericAPIView):
+    """Open goals of all user boards that are overdue, due today and due in the next seven days.
+
+    Only the `overdue_limit` latest overdue goals are listed, `overdue_count` counts all of them.
+    """
+    permission_classes = [permissions.IsAuthenticated]
+    serializer_class = GoalSerializer
+    overdue_limit = 100
+
+    def get(self, request, *args, **kwargs) -> Response:
+        now = timezone.now()
+        tomorrow = timezone.localtime(now).replace(hour=0, minute=0, second=0, microsecond=0) + timedelta(days=1)
+        week_end = tomorrow + timedelta(days=6)
+
+        # Range scans of the partial open due date index
+        rows = values_serializer_for(GoalSerializer)
+        goals = participant_goals(request.user.id).filter(status__in=Goal.OPEN_STATUSES)
+        overdue = goals.filter(due_date__lt=now).order_by('-due_date', '-id').values(*rows.lookups)
+        overdue_count = visible_goals(request.user.id).filter(
+            status__in=Goal.OPEN_STATUSES, due_date__lt=now
+        ).count()
+        upcoming = goals.filter(
+            due_date__gte=now, due_date__lt=week_end
+        ).order_by('due_date', 'id').values(*rows.lookups)
+
+        deadlines = {'overdue': list(overdue[:self.overdue_limit])[::-1], 'today': [], 'week': []}
+        for goal in upcoming:
+            deadlines['today' if goal['due_date'] < tomorrow else 'week'].append(goal)
+        return Response({
+            **{bucket: rows.serialize(goals) for bucket, goals in deadlines.items()},
+            'overdue_count': overdue_count,
+        })
+
+
+class GoalListView(ValuesListMixin, ConditionalResponseMixin, KeysetPaginationMixin, ListAPIView):
     """Goal list for board participant user"""
     model = Goal
     permission_classes = [GoalPermission]
     serializer_class = GoalSerializer
+    keyset_pagination_class = GoalKeysetPagination
     filterset_class = GoalDateFilter
     filter_backends = [
         DjangoFilterBackend,
         filters.OrderingFilter,
-        filters.SearchFilter,
+        FullTextSearchFilter,
         ]
     ordering_fields = ["title", "-priority"]
     ordering = ["title", "-priority"]
-    search_fields = ["title", "description"]
 
     def get_queryset(self) -> Optional[QuerySet[Goal]]:
         """Queryset of all Goals without archived status for board participant user"""
-        return Goal.objects.select_related('user', 'category__board').filter(
-            Q(category__board__participants__user_id=self.request.user.id) & ~Q(status=Goal.Status.archived)
+        return participant_goals(self.request.user.id)
+
+    def get_list_state(self, queryset: QuerySet[Goal]) -> list:
+        """Goal state together with the comment counts and the latest comments"""
+        state = queryset.aggregate(
+            count=Count('pk'),
+            last_modified=Max('updated'),
+            comments=Sum('comment_count'),
+            last_comment_modified=Max(KeyTextTransform('updated', 'last_comment')),
         )
+        return list(state.values())
 
 
-class GoalView(RetrieveUpdateDestroyAPIView):
+class GoalView(ConditionalResponseMixin, RetrieveUpdateDestroyAPIView):
     """Goal Retrieve/Update/Destroy APIView"""
     model = Goal
     permission_classes = [GoalPermission, IsOwnerOrReadOnly]
@@ -155,14 +392,18 @@ class GoalView(RetrieveUpdateDestroyAPIView):
 
     def get_queryset(self) -> Optional[QuerySet[Goal]]:
         """List of Goals without archived status for board participant user"""
-        return Goal.objects.select_related('user', 'category__board').filter(
-            Q(category__board__participants__user_id=self.request.user.id) & ~Q(status=Goal.Status.archived)
-        )
+        return participant_goals(self.request.user.id)
+
+    def get_object_state(self, instance: Goal) -> tuple[list, Optional[datetime]]:
+        """Goal state together with its comment count and latest comment"""
+        last_comment_updated = comment_time((instance.last_comment or {}).get('updated'))
+        state = [instance.pk, instance.updated, instance.comment_count, last_comment_updated]
+        return state, max(filter(None, (instance.updated, last_comment_updated)))
 
     def perform_destroy(self, instance: Goal):
         """Update 'is_deleted' GoalCategory field to 'archived' status"""
         instance.status = Goal.Status.archived
-        instance.save(update_fields=('status',))
+        instance.save(update_fields=('status', 'updated'))
         return instance
 
 
@@ -172,24 +413,25 @@ class GoalCommentCreateView(CreateAPIView):
     serializer_class = GoalCommentCreateSerializer
 
 
-class GoalCommentListView(ListAPIView):
+class GoalCommentListView(ValuesListMixin, ConditionalResponseMixin, KeysetPaginationMixin, ListAPIView):
     """GoalComments list for board participant user"""
     model = GoalComment
     permission_classes = [CommentsPermission]
     serializer_class = GoalCommentSerializer
-    filter_backends = [filters.OrderingFilter, filters.SearchFilter]
+    keyset_pagination_class = GoalCommentKeysetPagination
+    filter_backends = [DjangoFilterBackend, filters.OrderingFilter, FullTextSearchFilter]
     filterset_fields = ["goal"]
     ordering_fields = ["-created", "updated"]
     ordering = ["-created"]
 
     def get_queryset(self) -> Optional[QuerySet[GoalComment]]:
         """List of GoalComments to the Goal for board participant user"""
-        return GoalComment.objects.select_related('goal__category__board', 'user').filter(
-            goal__category__board__participants__user_id=self.request.user.id,
+        return GoalComment.objects.select_related('goal', 'user').filter(
+            board__participants__user_id=self.request.user.id,
         )
 
 
-class GoalCommentView(RetrieveUpdateDestroyAPIView):
+class GoalCommentView(ConditionalResponseMixin, RetrieveUpdateDestroyAPIView):
     """GoalComment Retrieve/Update/Destroy APIView"""
     model = GoalComment
     permission_classes = [CommentsPermission, IsOwnerOrReadOnly]
@@ -197,6 +439,6 @@ class GoalCommentView(RetrieveUpdateDestroyAPIView):
 
     def get_queryset(self) -> Optional[QuerySet[GoalComment]]:
         """List of GoalComments to the Goal for board participant user"""
-        return GoalComment.objects.select_related('goal__category__board', 'user').filter(
-            goal__category__board__participants__user_id=self.request.user.id,
+        return GoalComment.objects.select_related('goal', 'user').filter(
+            board__participants__user_id=self.request.user.id,
         )
@@ -0,0 +1,43 @@
+import pytest
+from django.core.management import call_command
+from django.urls import reverse
+
+from goals.archival import process_next_chunk
+from goals.cache import board_generations
+from goals.models import ArchivalJob, Goal, GoalCategory
+from tests.factories import GoalCategoryFactory, GoalFactory
+
+
+@pytest.mark.django_db
+class TestDeferredArchival:
+    """Board deletion with deferred archival"""
+    def test_board_archived_in_chunks(self, client, board_participant, settings):
+        settings.GOALS_DEFERRED_ARCHIVAL = True
+        user = board_participant.user
+        board = board_participant.board
+        categories = GoalCategoryFactory.create_batch(size=3, board=board, user=user)
+        for category in categories:
+            GoalFactory.create_batch(size=2, category=category, user=user, status=Goal.Status.to_do)
+        client.force_login(user=user)
+
+        response = client.delete(reverse('board-retrieve-update-destroy', args=[board.id]))
+
+        assert response.status_code == 202
+        board.refresh_from_db()
+        assert board.is_deleted
+        assert client.get(reverse('goal-list')).data == []
+        assert client.get(reverse('category-list'), {'board': board.id}).data == []
+
+        generation = board_generations([board.id])
+        process_next_chunk(chunk_size=2)
+        # The bulk updates send no signals, the worker resets the cached responses itself
+        assert board_generations([board.id]) != generation
+        job = process_next_chunk(chunk_size=2)
+        assert (job.status, job.categories_archived) == (ArchivalJob.Status.running, 3)
+
+        call_command('archive', '--chunk-size=4', '--once')
+
+        progress = client.get(reverse('archival-retrieve', args=[response.data["id"]])).data
+        assert (progress["status"], progress["goals_archived"]) == (ArchivalJob.Status.done, 6)
+        assert not GoalCategory.objects.filter(board=board, is_deleted=False).exists()
+        assert not Goal.objects.filter(board=board).exclude(status=Goal.Status.archived).exists()
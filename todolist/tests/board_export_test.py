@@ -0,0 +1,62 @@
+import csv
+import io
+import json
+
+import pytest
+from django.core.management import call_command
+from django.urls import reverse
+
+from tests.factories import BoardFactory, GoalCategoryFactory, GoalCommentFactory, GoalFactory
+
+
+@pytest.mark.django_db
+class TestBoardExportView:
+    """Streaming board export"""
+    def create_board_contents(self, board, user) -> None:
+        category = GoalCategoryFactory.create(board=board, user=user)
+        goals = GoalFactory.create_batch(size=3, category=category, user=user)
+        GoalCommentFactory.create_batch(size=2, goal=goals[0], user=user)
+        GoalFactory.create(category=GoalCategoryFactory.create(board=BoardFactory.create(), user=user), user=user)
+
+    def test_ndjson_export(self, client, board_participant):
+        user = board_participant.user
+        board = board_participant.board
+        self.create_board_contents(board, user)
+        client.force_login(user=user)
+
+        response = client.get(reverse('board-export', args=[board.id]))
+
+        assert response.status_code == 200
+        assert response.streaming
+        assert response['Content-Type'] == 'application/x-ndjson'
+        records = [json.loads(line) for line in b"".join(response.streaming_content).decode().splitlines()]
+        assert [record["type"] for record in records] == ["category"] + ["goal"] * 3 + ["comment"] * 2
+        assert {record["board_id"] for record in records} == {board.id}
+
+    def test_csv_export(self, client, board_participant):
+        user = board_participant.user
+        board = board_participant.board
+        self.create_board_contents(board, user)
+        client.force_login(user=user)
+
+        response = client.get(reverse('board-export', args=[board.id]), {'type': 'csv'})
+
+        assert response.status_code == 200
+        rows = list(csv.DictReader(io.StringIO(b"".join(response.streaming_content).decode())))
+        assert len(rows) == 6
+        assert rows[1]["type"] == "goal" and rows[1]["text"] == ""
+
+    def test_export_forbidden_for_strangers(self, client, user, board):
+        client.force_login(user=user)
+
+        response = client.get(reverse('board-export', args=[board.id]))
+
+        assert response.status_code == 404
+
+    def test_export_command(self, board_participant):
+        self.create_board_contents(board_participant.board, board_participant.user)
+        output = io.StringIO()
+
+        call_command('export_board', board_participant.board.id, stdout=output)
+
+        assert len(output.getvalue().splitlines()) == 6
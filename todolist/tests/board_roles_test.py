@@ -0,0 +1,76 @@
+from types import SimpleNamespace
+
+import pytest
+from django.urls import reverse
+
+from goals.models import BoardParticipant
+from goals.roles import get_board_roles
+from tests.factories import BoardFactory, BoardParticipantFactory
+
+
+@pytest.fixture
+def shared_cache(monkeypatch):
+    """The local memory cache of the tests stands in for a shared one"""
+    monkeypatch.setattr("goals.roles.is_shared_cache", lambda: True)
+
+
+@pytest.mark.django_db
+class TestBoardRoles:
+    """Board roles resolver"""
+    def test_roles_cached_between_requests(self, shared_cache, board_participant, django_assert_num_queries):
+        user = board_participant.user
+
+        with django_assert_num_queries(1):
+            roles = get_board_roles(SimpleNamespace(user=user))
+            assert get_board_roles(SimpleNamespace(user=user)) == roles
+
+        assert roles == {board_participant.board_id: BoardParticipant.Role.owner}
+
+    def test_roles_per_request_without_shared_cache(self, board_participant, django_assert_num_queries):
+        user = board_participant.user
+        request = SimpleNamespace(user=user)
+
+        with django_assert_num_queries(2):
+            get_board_roles(request)
+            get_board_roles(request)
+            get_board_roles(SimpleNamespace(user=user))
+
+    def test_roles_invalidated_on_participant_change(self, shared_cache, board_participant,
+                                                     django_assert_num_queries, django_capture_on_commit_callbacks):
+        user = board_participant.user
+        get_board_roles(SimpleNamespace(user=user))
+        board = BoardFactory()
+        with django_capture_on_commit_callbacks(execute=True):
+            BoardParticipantFactory(board=board, user=user, role=BoardParticipant.Role.reader)
+
+        with django_assert_num_queries(1):
+            roles = get_board_roles(SimpleNamespace(user=user))
+
+        assert roles[board.id] == BoardParticipant.Role.reader
+
+    def test_roles_invalidated_after_commit(self, shared_cache, client, board_participant,
+                                            django_capture_on_commit_callbacks):
+        reader = BoardParticipantFactory(board=board_participant.board, role=BoardParticipant.Role.reader)
+        get_board_roles(SimpleNamespace(user=reader.user))
+        client.force_login(user=board_participant.user)
+
+        with django_capture_on_commit_callbacks() as callbacks:
+            response = client.put(
+                reverse('board-retrieve-update-destroy', args=[board_participant.board_id]),
+                data={"title": "Renamed", "participants": [
+                    {"user": reader.user.username, "role": BoardParticipant.Role.writer},
+                ]},
+                content_type='application/json',
+            )
+            # Still the old roles, a concurrent request would read the old rows until the commit
+            assert get_board_roles(SimpleNamespace(user=reader.user)) == {
+                board_participant.board_id: BoardParticipant.Role.reader,
+            }
+
+        assert response.status_code == 200
+        assert callbacks
+        for callback in callbacks:
+            callback()
+        assert get_board_roles(SimpleNamespace(user=reader.user)) == {
+            board_participant.board_id: BoardParticipant.Role.writer,
+        }
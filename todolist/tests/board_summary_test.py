@@ -0,0 +1,47 @@
+from datetime import timedelta
+
+import pytest
+from django.urls import reverse
+from django.utils import timezone
+
+from goals.models import Goal
+from tests.factories import GoalCategoryFactory, GoalFactory
+
+
+@pytest.mark.django_db
+class TestBoardSummaryView:
+    """Board goal counters"""
+    def test_summary(self, client, board_participant):
+        user = board_participant.user
+        category = GoalCategoryFactory(board=board_participant.board, user=user)
+        yesterday = timezone.now() - timedelta(days=1)
+        GoalFactory.create_batch(
+            size=3, category=category, user=user, status=Goal.Status.to_do,
+            priority=Goal.Priority.high, due_date=yesterday,
+        )
+        GoalFactory(
+            category=category, user=user, status=Goal.Status.done, priority=Goal.Priority.high, due_date=yesterday,
+        )
+        GoalFactory()
+        client.force_login(user=user)
+
+        response = client.get(reverse('board-summary'), {"board": board_participant.board_id})
+
+        assert response.status_code == 200
+        [board] = response.data["boards"]
+        assert (board["board"], board["total"], board["overdue"]) == (board_participant.board_id, 4, 3)
+        assert board["by_status"][Goal.Status.done] == 1
+        assert board["cells"] == [
+            {"category": category.id, "status": Goal.Status.to_do, "priority": Goal.Priority.high,
+             "count": 3, "overdue": 3},
+            {"category": category.id, "status": Goal.Status.done, "priority": Goal.Priority.high,
+             "count": 1, "overdue": 0},
+        ]
+
+    def test_foreign_board(self, client, board_participant):
+        client.force_login(user=board_participant.user)
+        foreign_goal = GoalFactory()
+
+        response = client.get(reverse('board-summary'), {"board": foreign_goal.board_id})
+
+        assert response.status_code == 404
@@ -0,0 +1,45 @@
+import pytest
+from django.core.cache import cache
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from goals.models import BoardParticipant
+from tests.factories import BoardParticipantFactory, UserFactory
+
+
+@pytest.mark.django_db
+class TestBoardUpdateView:
+    """Board participants update"""
+    def update_roster(self, client, board, size: int) -> int:
+        old = BoardParticipantFactory.create_batch(size=size, board=board, role=BoardParticipant.Role.reader)
+        new_users = UserFactory.create_batch(size=size)
+        participants = [
+            *({"user": participant.user.username, "role": BoardParticipant.Role.writer} for participant in old[::2]),
+            *({"user": user.username, "role": BoardParticipant.Role.reader} for user in new_users),
+        ]
+        # Both runs start with cold role and response caches
+        cache.clear()
+        with CaptureQueriesContext(connection) as queries:
+            response = client.put(
+                reverse('board-retrieve-update-destroy', args=[board.id]),
+                data={"title": "Renamed", "participants": participants},
+                content_type='application/json',
+            )
+        assert response.status_code == 200
+        assert len(response.data["participants"]) == len(participants) + 1
+        return len(queries)
+
+    def test_constant_queries(self, client, board_participant):
+        client.force_login(user=board_participant.user)
+        board = board_participant.board
+
+        small = self.update_roster(client, board, size=4)
+        BoardParticipant.objects.filter(board=board).exclude(user=board_participant.user).delete()
+        large = self.update_roster(client, board, size=40)
+
+        assert small == large
+        board.refresh_from_db()
+        assert board.title == "Renamed"
+        assert board.participants.filter(role=BoardParticipant.Role.writer).count() == 20
+        assert board.participants.count() == 1 + 20 + 40
@@ -0,0 +1,95 @@
+import asyncio
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from bot.tg.models import GetUpdatesResponse, UpdateObj
+from bot.tg.runtime import ChatDispatcher, run_polling
+
+
+def update(update_id: int, chat_id: int) -> UpdateObj:
+    return UpdateObj(update_id=update_id, message={
+        "message_id": update_id,
+        "from": {"id": chat_id, "first_name": "user", "username": None},
+        "chat": {"id": chat_id, "type": "private"},
+        "text": f"message {update_id}",
+    })
+
+
+class Recorder:
+    """Handler recording the handled updates and the most handlers running at a time"""
+    def __init__(self, delay: float = 0.02):
+        self.delay = delay
+        self.lock = threading.Lock()
+        self.handled: list[tuple[int, int]] = []
+        self.running = 0
+        self.most_running = 0
+
+    def __call__(self, item: UpdateObj) -> None:
+        with self.lock:
+            self.running += 1
+            self.most_running = max(self.most_running, self.running)
+        time.sleep(self.delay)
+        with self.lock:
+            self.running -= 1
+            self.handled.append((item.message.chat.id, item.update_id))
+
+
+class FakeClient:
+    def __init__(self, batches: list[list[UpdateObj]], stop: asyncio.Event):
+        self.batches = batches
+        self.stop = stop
+        self.offsets: list[int] = []
+
+    async def get_updates(self, offset: int = 0, timeout: int = 30) -> GetUpdatesResponse:
+        self.offsets.append(offset)
+        if len(self.batches) == 1:
+            self.stop.set()
+        return GetUpdatesResponse(ok=True, result=self.batches.pop(0))
+
+
+def run(recorder: Recorder, batches: list[list[UpdateObj]], concurrency: int) -> FakeClient:
+    async def main() -> FakeClient:
+        stop = asyncio.Event()
+        client = FakeClient(batches, stop)
+        with ThreadPoolExecutor(concurrency) as executor:
+            dispatcher = ChatDispatcher(recorder, executor, concurrency=concurrency, max_pending=concurrency * 2)
+            await run_polling(client, dispatcher, stop)
+            assert dispatcher.queues == {}
+        return client
+    return asyncio.run(main())
+
+
+class TestChatDispatcher:
+    """Concurrent across chats, ordered within a chat"""
+    def test_order_within_chat(self):
+        recorder = Recorder()
+        updates = [update(number, chat_id=number % 3) for number in range(1, 31)]
+
+        client = run(recorder, [updates[:12], updates[12:]], concurrency=4)
+
+        assert len(recorder.handled) == 30
+        for chat_id in range(3):
+            handled = [update_id for chat, update_id in recorder.handled if chat == chat_id]
+            assert handled == sorted(handled)
+        assert client.offsets == [0, 13]
+
+    def test_concurrency_cap(self):
+        recorder = Recorder()
+
+        run(recorder, [[update(number, chat_id=number) for number in range(1, 21)]], concurrency=3)
+
+        assert len(recorder.handled) == 20
+        assert 1 < recorder.most_running <= 3
+
+    def test_failed_update_does_not_stop_chat(self):
+        handled = []
+
+        def handler(item: UpdateObj) -> None:
+            if item.update_id == 1:
+                raise ValueError("broken update")
+            handled.append(item.update_id)
+
+        run(handler, [[update(1, chat_id=1), update(2, chat_id=1)]], concurrency=2)
+
+        assert handled == [2]
@@ -0,0 +1,55 @@
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from rest_framework.fields import DateTimeField
+
+from tests.factories import GoalCategoryFactory, GoalCommentFactory, GoalFactory
+
+
+@pytest.mark.django_db
+class TestGoalCommentPreview:
+    """Comment count and latest comment on goal lists"""
+    def test_goal_list_comment_preview(self, client, board_participant):
+        user = board_participant.user
+        category = GoalCategoryFactory.create(board=board_participant.board, user=user)
+        commented, silent = GoalFactory.create_batch(size=2, category=category, user=user)
+        GoalCommentFactory.create_batch(size=2, goal=commented, user=user)
+        last = GoalCommentFactory.create(goal=commented, user=user, text="latest")
+        client.force_login(user=user)
+        # SQLite checks its JSON support on the first use
+        assert connection.features.supports_json_field
+
+        with CaptureQueriesContext(connection) as queries:
+            client.get(reverse('goal-list'), {'limit': 10})
+        small_queries = len(queries)
+        GoalFactory.create_batch(size=5, category=category, user=user)
+
+        with CaptureQueriesContext(connection) as queries:
+            response = client.get(reverse('goal-list'), {'limit': 10})
+        goals = {goal["id"]: goal for goal in response.data["results"]}
+
+        assert goals[commented.id]["comment_count"] == 3
+        preview = goals[commented.id]["last_comment"]
+        assert (preview["id"], preview["text"], preview["user"]) == (last.id, "latest", user.id)
+        assert preview["created"] == DateTimeField().to_representation(last.created)
+        # The latest comment is looked up once per goal
+        goal_query = next(query["sql"] for query in queries if "comment_count" in query["sql"])
+        assert goal_query.count("LIMIT 1") == 1
+        assert (goals[silent.id]["comment_count"], goals[silent.id]["last_comment"]) == (0, None)
+        assert len(queries) == small_queries
+
+    def test_new_comment_changes_goal_etag(self, client, board_participant):
+        user = board_participant.user
+        category = GoalCategoryFactory.create(board=board_participant.board, user=user)
+        goal = GoalFactory.create(category=category, user=user)
+        client.force_login(user=user)
+        list_etag = client.get(reverse('goal-list'))['ETag']
+        goal_etag = client.get(reverse('goal-retrieve-update-destroy', args=[goal.id]))['ETag']
+
+        GoalCommentFactory.create(goal=goal, user=user)
+
+        assert client.get(reverse('goal-list'), HTTP_IF_NONE_MATCH=list_etag).status_code == 200
+        response = client.get(reverse('goal-retrieve-update-destroy', args=[goal.id]), HTTP_IF_NONE_MATCH=goal_etag)
+        assert response.status_code == 200
+        assert response.data["comment_count"] == 1
@@ -0,0 +1,49 @@
+import pytest
+from django.urls import reverse
+
+from goals.models import Goal
+from tests.factories import GoalCategoryFactory, GoalFactory
+
+
+@pytest.mark.django_db
+class TestConditionalGet:
+    """ETag validation of goal list and goal retrieve"""
+    def test_goal_list_not_modified(self, client, board_participant):
+        category = GoalCategoryFactory(board=board_participant.board, user=board_participant.user)
+        goal = GoalFactory(category=category, user=board_participant.user)
+        client.force_login(user=board_participant.user)
+
+        response = client.get(reverse('goal-list'))
+        etag = response.headers["ETag"]
+        not_modified = client.get(reverse('goal-list'), HTTP_IF_NONE_MATCH=etag)
+
+        assert response.status_code == 200
+        assert not_modified.status_code == 304
+
+        goal.title = "Changed"
+        goal.save()
+
+        assert client.get(reverse('goal-list'), HTTP_IF_NONE_MATCH=etag).status_code == 200
+
+    def test_goal_retrieve_not_modified(self, client, board_participant):
+        category = GoalCategoryFactory(board=board_participant.board, user=board_participant.user)
+        goal = GoalFactory(category=category, user=board_participant.user)
+        client.force_login(user=board_participant.user)
+        url = reverse('goal-retrieve-update-destroy', args=[goal.id])
+
+        etag = client.get(url).headers["ETag"]
+
+        assert client.get(url, HTTP_IF_NONE_MATCH=etag).status_code == 304
+
+    def test_goal_list_without_last_modified(self, client, board_participant):
+        category = GoalCategoryFactory(board=board_participant.board, user=board_participant.user)
+        goals = GoalFactory.create_batch(2, category=category, user=board_participant.user, status=Goal.Status.to_do)
+        client.force_login(user=board_participant.user)
+        response = client.get(reverse('goal-list'))
+
+        client.delete(reverse('goal-retrieve-update-destroy', args=[goals[0].id]))
+        changed = client.get(reverse('goal-list'), HTTP_IF_MODIFIED_SINCE="Fri, 01 Jan 2100 00:00:00 GMT")
+
+        assert "Last-Modified" not in response.headers
+        assert changed.status_code == 200
+        assert len(changed.json()) == 1
@@ -1,8 +1,11 @@
 from pytest_factoryboy import register
-from tests.factories import BoardFactory, UserFactory, GoalCategoryFactory, GoalFactory
+from tests.factories import BoardFactory, UserFactory, GoalCategoryFactory, GoalFactory, \
+    BoardParticipantFactory, GoalCommentFactory
 
 pytest_plugins = "tests.fixtures"
 register(BoardFactory)
 register(UserFactory)
 register(GoalCategoryFactory)
 register(GoalFactory)
+register(BoardParticipantFactory)
+register(GoalCommentFactory)
@@ -5,7 +5,7 @@ from django.utils import timezone
 import factory.fuzzy
 
 from core.models import User
-from goals.models import Board, GoalCategory, Goal
+from goals.models import Board, BoardParticipant, GoalCategory, Goal, GoalComment
 
 
 class BoardFactory(factory.django.DjangoModelFactory):
@@ -29,6 +29,16 @@ class UserFactory(factory.django.DjangoModelFactory):
         model = User
 
 
+class BoardParticipantFactory(factory.django.DjangoModelFactory):
+    """Test for BoardParticipant"""
+    board = factory.SubFactory(BoardFactory)
+    user = factory.SubFactory(UserFactory)
+    role = BoardParticipant.Role.owner
+
+    class Meta:
+        model = BoardParticipant
+
+
 class GoalCategoryFactory(factory.django.DjangoModelFactory):
     """Test for GoalCategory"""
     title = factory.fuzzy.FuzzyText(length=25, prefix='test', suffix='goalcategory')
@@ -57,3 +67,13 @@ class GoalFactory(factory.django.DjangoModelFactory):
 
     class Meta:
         model = Goal
+
+
+class GoalCommentFactory(factory.django.DjangoModelFactory):
+    """Test for GoalComment"""
+    text = factory.fuzzy.FuzzyText(length=25, prefix='test', suffix='comment')
+    goal = factory.SubFactory(GoalFactory)
+    user = factory.SubFactory(UserFactory)
+
+    class Meta:
+        model = GoalComment
@@ -1,10 +1,19 @@
 from typing import Any
 import pytest
+from django.core.cache import cache
 
 from goals.models import GoalCategory
 from tests.factories import GoalCategoryFactory, GoalFactory
 
 
+@pytest.fixture(autouse=True)
+def clear_cache():
+    """Cached data must not leak between tests"""
+    cache.clear()
+    yield
+    cache.clear()
+
+
 @pytest.fixture()
 def user_board(board_participant) -> Any:
     """Return user board"""
@@ -0,0 +1,109 @@
+from datetime import timedelta
+from enum import IntEnum
+
+import pytest
+from django.utils import timezone
+
+from bot.cache import MISSING, TTLCache
+from bot.models import ChatState
+from bot.tg.fsm.db_storage import DatabaseStorage
+
+
+class State(IntEnum):
+    first = 1
+    second = 2
+
+
+@pytest.fixture
+def shared_cache(monkeypatch):
+    """The local memory cache of the tests stands in for a shared one"""
+    monkeypatch.setattr("bot.tg.fsm.db_storage.is_shared_cache", lambda: True)
+
+
+@pytest.mark.django_db
+class TestDatabaseStorage:
+    """Chat states shared through the database"""
+    def test_state_and_data(self):
+        storage = DatabaseStorage(State)
+
+        storage.set_state(1, State.first)
+        storage.set_data(1, {"cat_id": 5})
+        storage.update_data(1, title="goal")
+
+        assert storage.get_state(1) is State.first
+        assert storage.get_data(1) == {"cat_id": 5, "title": "goal"}
+        assert ChatState.objects.get(chat_id=1).state == 1
+
+        storage.reset_state(1)
+        assert storage.get_state(1) is None
+        assert storage.get_data(1) == {"cat_id": 5, "title": "goal"}
+        assert storage.reset(1)
+        assert not storage.reset(1)
+        assert storage.get_data(1) == {}
+
+    def test_reads_create_nothing(self, shared_cache):
+        storage = DatabaseStorage(State, cache_size=5)
+
+        for chat_id in range(20):
+            assert storage.get_state(chat_id) is None
+            assert storage.get_data(chat_id) == {}
+        storage.reset_state(1)
+        storage.reset_data(1)
+
+        assert not ChatState.objects.exists()
+        assert len(storage.front) == 5
+
+    def test_cached_reads(self, shared_cache, django_assert_num_queries):
+        storage = DatabaseStorage(State)
+        storage.set_state(1, State.second)
+
+        with django_assert_num_queries(0):
+            assert storage.get_state(1) is State.second
+            assert storage.get_data(1) == {}
+
+    def test_shared_through_cache_versions(self, shared_cache):
+        first, second = DatabaseStorage(State), DatabaseStorage(State)
+        first.set_state(1, State.first)
+        assert second.get_state(1) is State.first
+
+        first.set_state(1, State.second)
+        assert second.get_state(1) is State.second
+        first.reset(1)
+        assert second.get_state(1) is None
+
+    def test_no_front_without_shared_cache(self, django_assert_num_queries):
+        first, second = DatabaseStorage(State), DatabaseStorage(State)
+        assert first.get_state(1) is None
+        # The version another process sets in its own local memory cache is never seen here
+        second.set_state(1, State.second)
+
+        with django_assert_num_queries(1):
+            assert first.get_state(1) is State.second
+        assert len(first.front) == 0
+
+    def test_idle_conversation_expires(self):
+        storage = DatabaseStorage(State, ttl=60)
+        storage.set_state(1, State.first)
+        storage.set_state(2, State.first)
+        ChatState.objects.filter(chat_id=1).update(updated=timezone.now() - timedelta(seconds=61))
+
+        assert DatabaseStorage(State, ttl=60).get_state(1) is None
+        assert storage.purge() == 1
+        assert list(ChatState.objects.values_list("chat_id", flat=True)) == [2]
+
+
+class TestTTLCache:
+    """Bounded LRU with expiry"""
+    def test_lru_and_ttl(self):
+        now = [0.0]
+        cache = TTLCache(max_size=2, ttl=10, clock=lambda: now[0])
+        cache.set("a", 1)
+        cache.set("b", None)
+        cache.get("a")
+        cache.set("c", 3)
+
+        assert cache.get("b") is MISSING
+        assert cache.get("a") == 1
+        now[0] = 10
+        assert cache.get("c") is MISSING
+        assert len(cache) == 1
@@ -0,0 +1,86 @@
+import pytest
+from django.urls import reverse
+
+from goals.models import Goal
+from tests.factories import GoalCategoryFactory, GoalFactory, GoalCommentFactory
+
+
+@pytest.mark.django_db
+class TestGoalBatchView:
+    """Goal batch operations"""
+    def test_batch_success(self, client, board_participant, django_assert_max_num_queries):
+        user = board_participant.user
+        category = GoalCategoryFactory(board=board_participant.board, user=user)
+        other_category = GoalCategoryFactory(user=user)
+        goal = GoalFactory(category=category, user=user, status=Goal.Status.to_do)
+        moved_goal = GoalFactory(category=category, user=user)
+        comment = GoalCommentFactory(goal=moved_goal, user=user)
+        other_category.board.participants.create(user=user)
+        client.force_login(user=user)
+
+        data = {"operations": [
+            *({"op": "create", "title": f"Goal {i}", "category": category.id} for i in range(20)),
+            {"op": "status", "id": goal.id, "status": Goal.Status.done},
+            {"op": "update", "id": moved_goal.id, "title": "Moved", "category": other_category.id},
+        ]}
+        with django_assert_max_num_queries(10):
+            response = client.post(reverse('goal-batch'), data=data, content_type='application/json')
+
+        assert response.status_code == 200
+        assert len(response.data["results"]) == 22
+        assert Goal.objects.filter(category=category, title__startswith="Goal ").count() == 20
+        assert Goal.objects.get(pk=goal.id).status == Goal.Status.done
+        moved_goal.refresh_from_db()
+        comment.refresh_from_db()
+        assert (moved_goal.title, moved_goal.board_id) == ("Moved", other_category.board_id)
+        assert comment.board_id == other_category.board_id
+
+    def test_batch_rejected_as_a_whole(self, client, board_participant):
+        user = board_participant.user
+        category = GoalCategoryFactory(board=board_participant.board, user=user)
+        foreign_goal = GoalFactory()
+        client.force_login(user=user)
+
+        data = {"operations": [
+            {"op": "create", "title": "Goal", "category": category.id},
+            {"op": "status", "id": foreign_goal.id, "status": Goal.Status.done},
+        ]}
+        response = client.post(reverse('goal-batch'), data=data, content_type='application/json')
+
+        assert response.status_code == 400
+        assert response.data["operations"][0] == {}
+        assert "id" in response.data["operations"][1]
+        assert not Goal.objects.filter(title="Goal").exists()
+
+    def test_create_with_id_rejected(self, client, board_participant):
+        user = board_participant.user
+        category = GoalCategoryFactory(board=board_participant.board, user=user)
+        own_goal = GoalFactory(category=category, user=user)
+        client.force_login(user=user)
+
+        data = {"operations": [{"op": "create", "id": own_goal.id, "title": "Goal", "category": category.id}]}
+        response = client.post(reverse('goal-batch'), data=data, content_type='application/json')
+
+        assert response.status_code == 400
+        assert "id" in response.data["operations"][0]
+        assert not Goal.objects.filter(title="Goal").exists()
+
+    def test_move_follows_single_goal_rule(self, client, board_participant):
+        user = board_participant.user
+        category = GoalCategoryFactory(board=board_participant.board, user=user)
+        # A category of another participant, goals may be moved to it but not created in it
+        other_category = GoalCategoryFactory(board=board_participant.board)
+        goal = GoalFactory(category=category, user=user)
+        client.force_login(user=user)
+
+        moved = client.post(reverse('goal-batch'), data={"operations": [
+            {"op": "update", "id": goal.id, "category": other_category.id},
+        ]}, content_type='application/json')
+        created = client.post(reverse('goal-batch'), data={"operations": [
+            {"op": "create", "title": "Goal", "category": other_category.id},
+        ]}, content_type='application/json')
+
+        assert moved.status_code == 200
+        goal.refresh_from_db()
+        assert goal.category_id == other_category.id
+        assert created.status_code == 400
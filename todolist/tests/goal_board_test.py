@@ -0,0 +1,38 @@
+import pytest
+from django.urls import reverse
+
+from goals.models import Goal
+from tests.factories import GoalCategoryFactory, GoalFactory, GoalCommentFactory
+
+
+@pytest.mark.django_db
+class TestGoalBoard:
+    """Denormalized board of goals and comments"""
+    def test_board_follows_category(self, board_participant):
+        category = GoalCategoryFactory(board=board_participant.board, user=board_participant.user)
+        goal = GoalFactory(category=category, user=board_participant.user)
+        comment = GoalCommentFactory(goal=goal, user=board_participant.user)
+
+        assert goal.board_id == category.board_id
+        assert comment.board_id == category.board_id
+
+        other_category = GoalCategoryFactory(user=board_participant.user)
+        goal = Goal.objects.get(pk=goal.pk)
+        goal.category = other_category
+        goal.save(update_fields=("category",))
+        comment.refresh_from_db()
+
+        assert Goal.objects.get(pk=goal.pk).board_id == other_category.board_id
+        assert comment.board_id == other_category.board_id
+
+    def test_goal_list_by_board(self, client, board_participant):
+        category = GoalCategoryFactory(board=board_participant.board, user=board_participant.user)
+        goal = GoalFactory(category=category, user=board_participant.user)
+        GoalFactory()
+        client.force_login(user=board_participant.user)
+
+        response = client.get(reverse('goal-list'))
+
+        assert response.status_code == 200
+        assert [item["id"] for item in response.data] == [goal.id]
+        assert response.data[0]["board"] == board_participant.board_id
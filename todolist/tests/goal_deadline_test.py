@@ -0,0 +1,60 @@
+from datetime import timedelta
+
+import pytest
+from django.urls import reverse
+from django.utils import timezone
+
+from goals.models import Goal
+from goals.views import GoalDeadlineView
+from tests.factories import GoalCategoryFactory, GoalFactory
+
+
+@pytest.mark.django_db
+class TestGoalDeadlineView:
+    """Overdue and upcoming open goals"""
+    def test_deadline_buckets(self, client, board_participant):
+        user = board_participant.user
+        category = GoalCategoryFactory.create(board=board_participant.board, user=user)
+        now = timezone.now()
+        tomorrow = timezone.localtime(now).replace(hour=0, minute=0, second=0, microsecond=0) + timedelta(days=1)
+
+        def goal(due_date, status=Goal.Status.to_do) -> Goal:
+            return GoalFactory.create(category=category, user=user, due_date=due_date, status=status)
+
+        overdue = goal(now - timedelta(days=30))
+        today = goal(now + (tomorrow - now) / 2, Goal.Status.in_progress)
+        week = goal(tomorrow + timedelta(days=3))
+        goal(tomorrow + timedelta(days=10))
+        goal(now - timedelta(days=1), Goal.Status.done)
+        goal(now - timedelta(days=1), Goal.Status.archived)
+        goal(None)
+        GoalFactory.create(due_date=now - timedelta(days=1), status=Goal.Status.to_do)
+        client.force_login(user=user)
+
+        response = client.get(reverse('goal-deadlines'))
+
+        assert response.status_code == 200
+        assert {bucket: [row["id"] for row in response.data[bucket]] for bucket in ("overdue", "today", "week")} == {
+            "overdue": [overdue.id], "today": [today.id], "week": [week.id],
+        }
+        assert response.data["overdue_count"] == 1
+        assert "comment_count" in response.data["overdue"][0]
+
+    def test_overdue_capped(self, client, board_participant, monkeypatch):
+        monkeypatch.setattr(GoalDeadlineView, "overdue_limit", 2)
+        user = board_participant.user
+        category = GoalCategoryFactory.create(board=board_participant.board, user=user)
+        now = timezone.now()
+        goals = [
+            GoalFactory.create(
+                category=category, user=user, due_date=now - timedelta(days=days), status=Goal.Status.to_do
+            )
+            for days in (400, 30, 2)
+        ]
+        client.force_login(user=user)
+
+        response = client.get(reverse('goal-deadlines'))
+
+        # The latest overdue goals, oldest first
+        assert [row["id"] for row in response.data["overdue"]] == [goals[1].id, goals[2].id]
+        assert response.data["overdue_count"] == 3
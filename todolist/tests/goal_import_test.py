@@ -0,0 +1,101 @@
+import io
+import json
+
+import pytest
+from django.core.management import call_command
+from django.urls import reverse
+
+from goals.models import Goal, GoalComment
+from tests.factories import GoalCategoryFactory, GoalFactory
+
+
+@pytest.mark.django_db
+class TestGoalImportView:
+    """Bulk import of goals and comments"""
+    def test_ndjson_import_reports_row_errors(self, client, board_participant):
+        user = board_participant.user
+        category = GoalCategoryFactory.create(board=board_participant.board, user=user)
+        goal = GoalFactory.create(category=category, user=user)
+        foreign_category = GoalCategoryFactory.create()
+        records = [
+            {"type": "goal", "category_id": category.id, "title": "first", "priority": Goal.Priority.high},
+            {"type": "goal", "category_id": foreign_category.id, "title": "foreign"},
+            {"type": "comment", "goal_id": goal.id, "text": "imported"},
+            {"type": "goal", "category_id": category.id},
+            {"type": "goal", "category_id": category.id, "title": "second"},
+        ]
+        body = "\n".join(json.dumps(record) for record in records) + "\nnot json\n"
+        client.force_login(user=user)
+
+        response = client.post(
+            reverse('goal-import') + '?batch_size=2', data=body, content_type='application/x-ndjson'
+        )
+
+        assert response.status_code == 200
+        assert (response.data["goals"], response.data["comments"], response.data["checkpoint"]) == (2, 1, 6)
+        assert [error["line"] for error in response.data["errors"]] == [2, 4, 6]
+        assert set(Goal.objects.filter(category=category).values_list("title", flat=True)) == {
+            goal.title, "first", "second"
+        }
+        assert GoalComment.objects.get(text="imported").board_id == board_participant.board_id
+
+    def test_csv_import_resumes_after_checkpoint(self, client, board_participant):
+        user = board_participant.user
+        category = GoalCategoryFactory.create(board=board_participant.board, user=user)
+        body = "type,category_id,title\n" + "".join(f"goal,{category.id},goal {i}\n" for i in range(5))
+        client.force_login(user=user)
+
+        response = client.post(
+            reverse('goal-import') + '?type=csv&checkpoint=3', data=body, content_type='text/csv'
+        )
+
+        assert response.data["goals"] == 3
+        assert set(Goal.objects.values_list("title", flat=True)) == {"goal 2", "goal 3", "goal 4"}
+        assert Goal.objects.get(title="goal 2").board_id == board_participant.board_id
+
+    def test_import_command_writes_checkpoint(self, board_participant, tmp_path):
+        user = board_participant.user
+        category = GoalCategoryFactory.create(board=board_participant.board, user=user)
+        source = tmp_path / "goals.ndjson"
+        source.write_text("".join(
+            json.dumps({"category_id": category.id, "title": f"goal {i}"}) + "\n" for i in range(3)
+        ))
+        checkpoint = tmp_path / "checkpoint"
+
+        call_command('import_goals', str(source), user=user.username, batch_size=2, checkpoint_file=str(checkpoint))
+        call_command('import_goals', str(source), user=user.username, checkpoint_file=str(checkpoint))
+
+        assert checkpoint.read_text() == "3"
+        assert Goal.objects.filter(category=category).count() == 3
+
+    def test_goals_and_comments_by_source_ref(self, board_participant, tmp_path):
+        user = board_participant.user
+        category = GoalCategoryFactory.create(board=board_participant.board, user=user)
+        records = [
+            {"type": "goal", "ref": "T-1", "category_id": category.id, "title": "first"},
+            {"type": "comment", "goal_ref": "T-1", "text": "same batch"},
+            {"type": "goal", "ref": "T-2", "category_id": category.id, "title": "second"},
+            {"type": "comment", "goal_ref": "T-1", "text": "next batch"},
+            {"type": "comment", "goal_ref": "T-2", "text": "after resume"},
+            {"type": "goal", "ref": "T-2", "category_id": category.id, "title": "duplicate"},
+            {"type": "comment", "goal_ref": "T-3", "text": "unknown"},
+        ]
+        lines = [json.dumps(record) + "\n" for record in records]
+        source = tmp_path / "tracker.ndjson"
+        checkpoint = tmp_path / "checkpoint"
+        stderr = io.StringIO()
+
+        # The export is cut after line 4, the resumed import finds the goals of the first run by their refs
+        source.write_text("".join(lines[:4]))
+        call_command('import_goals', str(source), user=user.username, batch_size=2, checkpoint_file=str(checkpoint),
+                     stdout=io.StringIO())
+        source.write_text("".join(lines))
+        call_command('import_goals', str(source), user=user.username, batch_size=2, checkpoint_file=str(checkpoint),
+                     stdout=io.StringIO(), stderr=stderr)
+
+        first, second = Goal.objects.get(title="first"), Goal.objects.get(title="second")
+        assert set(GoalComment.objects.values_list("goal_id", "text")) == {
+            (first.id, "same batch"), (first.id, "next batch"), (second.id, "after resume"),
+        }
+        assert not Goal.objects.filter(title="duplicate").exists()
+        assert [line.split(":")[0] for line in stderr.getvalue().splitlines()] == ["Line 6", "Line 7"]
@@ -0,0 +1,37 @@
+import pytest
+from django.urls import reverse
+
+from goals.pagination import limit_param
+from tests.factories import GoalCategoryFactory, GoalFactory
+
+
+@pytest.mark.django_db
+class TestKeysetPagination:
+    """Goal list with cursor pagination"""
+    def test_goal_pages(self, client, board_participant):
+        category = GoalCategoryFactory(board=board_participant.board, user=board_participant.user)
+        goals = [GoalFactory(category=category, user=board_participant.user, title=f"goal {i % 3}") for i in range(7)]
+        expected = [goal.id for goal in sorted(goals, key=lambda goal: (goal.title, -goal.priority, goal.id))]
+        client.force_login(user=board_participant.user)
+
+        response = client.get(reverse('goal-list'), {"pagination": "cursor", "limit": 3, "count": "exact"})
+        ids = [item["id"] for item in response.data["results"]]
+        assert response.data["count"] == 7
+        while response.data["next"]:
+            response = client.get(response.data["next"])
+            assert "count" not in response.data
+            ids += [item["id"] for item in response.data["results"]]
+
+        assert ids == expected
+
+    def test_invalid_cursor(self, client, board_participant):
+        client.force_login(user=board_participant.user)
+
+        response = client.get(reverse('goal-list'), {"pagination": "cursor", "cursor": "broken"})
+
+        assert response.status_code == 404
+
+
+@pytest.mark.parametrize("value, expected", [(None, 20), ("5", 5), ("500", 100), ("0", 20), ("-3", 20), ("x", 20)])
+def test_limit_param(value, expected):
+    assert limit_param(value, default=20, maximum=100) == expected
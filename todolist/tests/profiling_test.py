@@ -0,0 +1,37 @@
+import json
+
+import pytest
+from django.urls import reverse
+
+from tests.factories import GoalCategoryFactory, GoalFactory
+
+
+@pytest.mark.django_db
+class TestProfilingMiddleware:
+    """Per-request SQL and timing profile"""
+    @pytest.fixture()
+    def goals(self, board_participant):
+        category = GoalCategoryFactory.create(board=board_participant.board, user=board_participant.user)
+        return GoalFactory.create_batch(size=3, category=category, user=board_participant.user)
+
+    def test_server_timing_and_slow_log(self, client, board_participant, goals, settings, caplog):
+        settings.PROFILING_SAMPLE_RATE = 1
+        settings.PROFILING_SLOW_REQUEST_MS = 0
+        client.force_login(user=board_participant.user)
+
+        with caplog.at_level("WARNING", logger="core.profiling"):
+            response = client.get(reverse('goal-retrieve-update-destroy', args=[goals[0].id]))
+
+        metrics = {metric.split(";")[0] for metric in response["Server-Timing"].split(", ")}
+        assert metrics == {"sql", "permissions", "serializer", "total"}
+        record = json.loads(caplog.records[-1].getMessage())
+        assert record["path"] == reverse('goal-retrieve-update-destroy', args=[goals[0].id])
+        assert 0 < len(record["slowest_queries"]) <= min(record["queries"], settings.PROFILING_SLOWEST_QUERIES)
+
+    def test_disabled_by_default(self, client, board_participant, goals, caplog):
+        client.force_login(user=board_participant.user)
+
+        response = client.get(reverse('goal-list'))
+
+        assert "Server-Timing" not in response
+        assert not caplog.records
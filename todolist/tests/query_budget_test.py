@@ -0,0 +1,270 @@
+import json
+from datetime import timedelta
+from dataclasses import dataclass, field
+from typing import Any, Callable, Optional
+
+import pytest
+from django.core.cache import cache
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import URLPattern, reverse
+from django.utils import timezone
+
+import bot.urls
+import core.urls
+import goals.urls
+from bot.models import TgUser
+from bot.tg.client import TgClient
+from goals.models import ArchivalJob, BoardParticipant
+from goals.sync import SYNC_FIELDS, encode_cursor
+from tests.factories import BoardFactory, BoardParticipantFactory, GoalCategoryFactory, GoalCommentFactory, \
+    GoalFactory, UserFactory
+
+# Every route runs against datasets of these sizes and must issue the same number of queries
+SIZES = (1, 10, 100)
+PASSWORD = "Budget-pass-1234"
+WEBHOOK_SECRET = "budget-secret"
+
+
+def sync_cursor(data) -> str:
+    """Cursor of all the user boards positioned before any data"""
+    position = {kind: [timezone.now() - timedelta(days=1), 0] for kind in (*SYNC_FIELDS, "tombstone")}
+    return encode_cursor([{"boards": data.board_ids, "position": position}])
+
+
+@dataclass
+class Dataset:
+    """Objects of one user, `size` of every kind"""
+    size: int
+    user: Any
+    board: Any
+    category: Any
+    goal: Any
+    comment: Any
+    job: ArchivalJob
+    tg_user: TgUser
+    readers: list = field(default_factory=list)
+    board_ids: list = field(default_factory=list)
+
+
+def build_dataset(size: int) -> Dataset:
+    user = UserFactory.create(is_staff=True)
+    user.set_password(PASSWORD)
+    user.save()
+    board = BoardParticipantFactory.create(user=user).board
+    board_ids = [board.id]
+    for other in BoardFactory.create_batch(size=size - 1):
+        BoardParticipantFactory.create(board=other, user=user)
+        board_ids.append(other.id)
+    readers = BoardParticipantFactory.create_batch(size=size, board=board, role=BoardParticipant.Role.reader)
+    category, *_ = GoalCategoryFactory.create_batch(size=size, board=board, user=user)
+    goal, *_ = GoalFactory.create_batch(size=size, category=category, user=user)
+    comment, *_ = GoalCommentFactory.create_batch(size=size, goal=goal, user=user)
+    return Dataset(
+        size=size,
+        user=user,
+        board=board,
+        category=category,
+        goal=goal,
+        comment=comment,
+        job=ArchivalJob.objects.create(board=board),
+        tg_user=TgUser.objects.create(chat_id=user.id, verification_code=f"code{user.id}"),
+        readers=readers,
+        board_ids=board_ids,
+    )
+
+
+@dataclass(frozen=True)
+class Route:
+    """One request to a named route, built from the dataset"""
+    name: str
+    method: str = "get"
+    status: int = 200
+    args: Callable[[Dataset], list] = lambda data: []
+    data: Optional[Callable[[Dataset], Any]] = None
+    content_type: str = "application/json"
+    headers: dict = field(default_factory=dict)
+
+    def __str__(self) -> str:
+        return f"{self.method.upper()} {self.name}"
+
+    def request(self, client, data: Dataset):
+        url = reverse(self.name, args=self.args(data))
+        payload = self.data(data) if self.data is not None else None
+        if self.method == "get":
+            return client.get(url, payload, **self.headers)
+        if isinstance(payload, (dict, list)) and self.content_type == "application/json":
+            payload = json.dumps(payload)
+        return getattr(client, self.method)(url, data=payload, content_type=self.content_type, **self.headers)
+
+
+def board_pk(data: Dataset) -> list:
+    return [data.board.id]
+
+
+def category_pk(data: Dataset) -> list:
+    return [data.category.id]
+
+
+def goal_pk(data: Dataset) -> list:
+    return [data.goal.id]
+
+
+def comment_pk(data: Dataset) -> list:
+    return [data.comment.id]
+
+
+ROUTES = [
+    Route("board-create", "post", 201, data=lambda data: {"title": "budget"}),
+    Route("board-list"),
+    Route("board-list", data=lambda data: {"limit": 10}),
+    Route("board-summary"),
+    Route("board-export", args=board_pk),
+    Route("board-export", args=board_pk, data=lambda data: {"type": "csv"}),
+    Route("board-retrieve-update-destroy", args=board_pk),
+    Route("board-retrieve-update-destroy", "put", args=board_pk, data=lambda data: {
+        "title": "budget",
+        "participants": [
+            {"user": reader.user.username, "role": BoardParticipant.Role.writer} for reader in data.readers
+        ],
+    }),
+    Route("board-retrieve-update-destroy", "delete", 204, args=board_pk),
+
+    Route("category-create", "post", 201, data=lambda data: {"title": "budget", "board": data.board.id}),
+    Route("category-list"),
+    Route("category-list", data=lambda data: {"board": data.board.id}),
+    Route("category-list", data=lambda data: {"search": "test"}),
+    Route("category-retrieve-update-destroy", args=category_pk),
+    Route("category-retrieve-update-destroy", "patch", args=category_pk, data=lambda data: {"title": "budget"}),
+    Route("category-retrieve-update-destroy", "delete", 204, args=category_pk),
+
+    Route("goal-create", "post", 201, data=lambda data: {"title": "budget", "category": data.category.id}),
+    Route("goal-list"),
+    Route("goal-list", data=lambda data: {"limit": 10}),
+    Route("goal-list", data=lambda data: {"pagination": "cursor", "count": "exact"}),
+    Route("goal-list", data=lambda data: {"search": "test"}),
+    Route("goal-import", "post", content_type="application/x-ndjson", data=lambda data: "".join(
+        json.dumps({"category_id": data.category.id, "title": f"goal {i}"}) + "\n" for i in range(data.size)
+    )),
+    Route("goal-batch", "post", data=lambda data: {"operations": [
+        {"op": "create", "title": f"goal {i}", "category": data.category.id} for i in range(data.size)
+    ]}),
+    Route("goal-deadlines"),
+    Route("goal-retrieve-update-destroy", args=goal_pk),
+    Route("goal-retrieve-update-destroy", "patch", args=goal_pk, data=lambda data: {"title": "budget"}),
+    Route("goal-retrieve-update-destroy", "delete", 204, args=goal_pk),
+
+    Route("sync"),
+    Route("sync", data=lambda data: {"cursor": sync_cursor(data)}),
+    Route("archival-retrieve", args=lambda data: [data.job.id]),
+    Route("cache-stats"),
+
+    Route("comment-create", "post", 201, data=lambda data: {"text": "budget", "goal": data.goal.id}),
+    Route("comment-list"),
+    Route("comment-list", data=lambda data: {"goal": data.goal.id, "pagination": "cursor"}),
+    Route("comment-retrieve-update-destroy", args=comment_pk),
+    Route("comment-retrieve-update-destroy", "patch", args=comment_pk, data=lambda data: {"text": "budget"}),
+    Route("comment-retrieve-update-destroy", "delete", 204, args=comment_pk),
+
+    Route("signup", "post", 201, data=lambda data: {
+        "username": f"budget{data.user.id}", "password": PASSWORD, "password_repeat": PASSWORD,
+    }),
+    Route("login", "post", data=lambda data: {"username": data.user.username, "password": PASSWORD}),
+    Route("update-retrieve-destroy-user"),
+    Route("update-retrieve-destroy-user", "patch", data=lambda data: {"first_name": "budget"}),
+    Route("update-retrieve-destroy-user", "delete", 204),
+    Route("update-password", "put", data=lambda data: {"old_password": PASSWORD, "new_password": PASSWORD + "!"}),
+
+    Route("verify-user", "patch", data=lambda data: {"verification_code": data.tg_user.verification_code}),
+    Route("webhook", "post", headers={"HTTP_X_TELEGRAM_BOT_API_SECRET_TOKEN": WEBHOOK_SECRET}, data=lambda data: {
+        "update_id": data.user.id,
+        "message": {
+            "message_id": 1,
+            "from": {"id": data.tg_user.chat_id, "first_name": "budget", "username": None},
+            "chat": {"id": data.tg_user.chat_id, "type": "private"},
+            "text": "/goals",
+        },
+    }),
+]
+
+
+def measure(client, route: Route, size: int) -> list[str]:
+    """SQL of the route request against a fresh dataset of the size"""
+    data = build_dataset(size)
+    client.force_login(user=data.user)
+    cache.clear()
+    with CaptureQueriesContext(connection) as queries:
+        response = route.request(client, data)
+        if response.streaming:
+            b"".join(response.streaming_content)
+    assert response.status_code == route.status, f"{route}: {response.status_code} {getattr(response, 'data', '')}"
+    return [query["sql"] for query in queries.captured_queries]
+
+
+def insert_rows(sql: str) -> int:
+    """Rows of an INSERT statement, 0 for the other statements"""
+    return sql.count("), (") + 1 if sql.startswith("INSERT") else 0
+
+
+def statements(queries: list[str]) -> list[str]:
+    """Queries with the batches of one bulk_create() merged.
+
+    bulk_create() splits the rows into batches by the database parameter limit (999 on SQLite),
+    those batches are one statement as far as the budget is concerned. A batch follows a multi-row
+    insert into the same columns with at least as many rows, so inserts of one row each, as
+    create() in a loop makes them, are all counted.
+    """
+    merged = []
+    for sql in queries:
+        previous = merged[-1] if merged else ""
+        if (
+            1 < insert_rows(previous) >= insert_rows(sql)
+            and previous.split(" VALUES")[0] == sql.split(" VALUES")[0]
+        ):
+            # The merged statement stands for its last batch, the next one is compared with it
+            merged[-1] = sql
+            continue
+        merged.append(sql)
+    return merged
+
+
+def assert_constant_queries(route: Route, captured: dict[int, list[str]]) -> None:
+    """Fail with the SQL of the smallest and the first growing dataset when the query count changes"""
+    smallest = min(captured)
+    for size, queries in captured.items():
+        if len(statements(queries)) != len(statements(captured[smallest])):
+            lines = [f"{route}: {len(captured[smallest])} queries for size {smallest}, {len(queries)} for size {size}"]
+            for label, sqls in ((smallest, captured[smallest]), (size, queries)):
+                lines.append(f"-- size {label}")
+                lines.extend(f"{number}. {sql}" for number, sql in enumerate(sqls, start=1))
+            pytest.fail("\n".join(lines), pytrace=False)
+
+
+@pytest.mark.django_db
+class TestQueryBudget:
+    """Every route issues a constant number of queries whatever the amount of data"""
+    @pytest.fixture(autouse=True)
+    def no_telegram(self, monkeypatch, settings):
+        monkeypatch.setattr(TgClient, "send_message", lambda self, chat_id, text: None)
+        settings.TG_WEBHOOK_SECRET = WEBHOOK_SECRET
+
+    @pytest.mark.parametrize("route", ROUTES, ids=str)
+    def test_constant_queries(self, client, route):
+        assert_constant_queries(route, {size: measure(client, route, size) for size in SIZES})
+
+    def test_every_route_covered(self):
+        names = {
+            pattern.name
+            for module in (goals.urls, core.urls, bot.urls)
+            for pattern in module.urlpatterns
+            if isinstance(pattern, URLPattern)
+        }
+        assert names - {route.name for route in ROUTES} == set()
+
+    def test_only_bulk_batches_merged(self):
+        bulk = ["INSERT INTO t (a) VALUES (1), (2)", "INSERT INTO t (a) VALUES (3), (4)", "INSERT INTO t (a) VALUES (5)"]
+        per_row = ["INSERT INTO t (a) VALUES (1)", "INSERT INTO t (a) VALUES (2)"]
+
+        assert len(statements(bulk)) == 1
+        assert len(statements(per_row)) == 2
+        assert len(statements([*bulk, *per_row])) == 3
@@ -0,0 +1,106 @@
+from datetime import timedelta
+
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+
+from bot.models import GoalReminder, TgUser
+from bot.reminders import ReminderWorker
+from bot.tg.client import TgClient
+from bot.tg.transport import TelegramError
+from goals.models import Goal
+from tests.factories import GoalCategoryFactory, GoalFactory
+
+
+class FakeClient(TgClient):
+    def __init__(self, fail: bool = False):
+        super().__init__(token="token")
+        self.fail = fail
+        self.sent: list[tuple[int, str]] = []
+
+    def send_message(self, chat_id: int, text: str):
+        if self.fail:
+            raise TelegramError("Forbidden: bot was blocked by the user", 403)
+        self.sent.append((chat_id, text))
+
+
+@pytest.mark.django_db
+class TestReminderWorker:
+    """Deadline reminders grouped by chat and sent once"""
+    @pytest.fixture
+    def goal(self, board_participant):
+        user = board_participant.user
+        TgUser.objects.create(chat_id=1000, user=user, verification_code="code")
+        category = GoalCategoryFactory.create(board=board_participant.board, user=user)
+
+        def create(due_date, status=Goal.Status.to_do) -> Goal:
+            return GoalFactory.create(category=category, user=user, due_date=due_date, status=status)
+        return create
+
+    def test_one_message_per_chat(self, goal):
+        now = timezone.now()
+        day = goal(now + timedelta(hours=20))
+        hour = goal(now + timedelta(minutes=30), Goal.Status.in_progress)
+        overdue = goal(now - timedelta(hours=2))
+        goal(now + timedelta(days=3))
+        goal(now - timedelta(days=3))
+        goal(now - timedelta(hours=1), Goal.Status.done)
+        other_user_goal = GoalFactory.create(due_date=now + timedelta(hours=1), status=Goal.Status.to_do)
+        TgUser.objects.create(chat_id=2000, user=other_user_goal.user, verification_code="other")
+        GoalFactory.create(due_date=now + timedelta(hours=1))
+        client = FakeClient()
+
+        with CaptureQueriesContext(connection) as queries:
+            assert ReminderWorker(client).tick(now) == 2
+
+        assert len([query for query in queries if query["sql"].startswith("SELECT")]) == 1
+        assert [chat_id for chat_id, _ in client.sent] == [1000, 2000]
+        lines = client.sent[0][1].splitlines()
+        assert lines[0] == "[deadline reminder]"
+        assert [line.split()[0] for line in lines[1:]] == [f"#{overdue.id}", f"#{hour.id}", f"#{day.id}"]
+        assert set(GoalReminder.objects.filter(chat_id=1000).values_list("goal_id", "threshold")) == {
+            (day.id, GoalReminder.Threshold.day),
+            (hour.id, GoalReminder.Threshold.hour),
+            (overdue.id, GoalReminder.Threshold.overdue),
+        }
+
+    def test_sent_once_per_threshold(self, goal):
+        now = timezone.now()
+        soon = goal(now + timedelta(hours=5))
+        client = FakeClient()
+        # A restarted worker knows what was sent from the database
+        assert ReminderWorker(client).tick(now) == 1
+        assert ReminderWorker(client).tick(now + timedelta(hours=1)) == 0
+
+        assert ReminderWorker(client).tick(now + timedelta(hours=4, minutes=30)) == 1
+        assert f"#{soon.id} {soon.title}: due within an hour" in client.sent[-1][1]
+
+        # A new due date arms the reminders again
+        soon.due_date = now + timedelta(hours=10)
+        soon.save()
+        assert ReminderWorker(client).tick(now) == 1
+        assert len(client.sent) == 3
+
+    def test_failed_message_retried(self, goal):
+        now = timezone.now()
+        goal(now + timedelta(hours=5))
+
+        assert ReminderWorker(FakeClient(fail=True)).tick(now) == 0
+        assert not GoalReminder.objects.exists()
+
+        client = FakeClient()
+        assert ReminderWorker(client).tick(now) == 1
+        assert len(client.sent) == 1
+
+
+    def test_long_reminders_split(self, goal):
+        now = timezone.now()
+        goals = [goal(now + timedelta(hours=5)) for _ in range(30)]
+        Goal.objects.update(title="t" * 250)
+        client = FakeClient()
+
+        assert ReminderWorker(client).tick(now) == len(client.sent) > 1
+        assert all(len(text) <= 4096 for _, text in client.sent)
+        assert sum(len(text.splitlines()) - 1 for _, text in client.sent) == len(goals)
+        assert GoalReminder.objects.count() == len(goals)
@@ -0,0 +1,60 @@
+import pytest
+from django.urls import reverse
+
+from goals.cache import response_cache_stats
+from goals.models import GoalCategory
+from tests.factories import BoardFactory, GoalCategoryFactory
+
+
+@pytest.fixture
+def shared_cache(monkeypatch):
+    """The local memory cache of the tests stands in for a shared one"""
+    monkeypatch.setattr("goals.cache.is_shared_cache", lambda: True)
+
+
+@pytest.mark.django_db
+class TestResponseCache:
+    """Board and category list response cache"""
+    def test_category_list_cached_until_change(self, shared_cache, client, board_participant,
+                                               django_assert_num_queries):
+        user = board_participant.user
+        category = GoalCategoryFactory(board=board_participant.board, user=user)
+        client.force_login(user=user)
+        client.get(reverse('category-list'))
+
+        with django_assert_num_queries(3):  # session, user and board roles
+            response = client.get(reverse('category-list'))
+        assert response.headers["X-Cache"] == "HIT"
+
+        category.title = "Renamed"
+        category.save()
+        response = client.get(reverse('category-list'))
+
+        assert response.headers["X-Cache"] == "MISS"
+        assert response.data[0]["title"] == "Renamed"
+        assert response_cache_stats() == {"hits": 1, "misses": 2}
+
+    def test_category_move_resets_previous_board(self, shared_cache, client, board_participant):
+        user = board_participant.user
+        board = board_participant.board
+        category_id = GoalCategoryFactory(board=board, user=user).id
+        client.force_login(user=user)
+        client.get(reverse('category-list'), {'board': board.id})
+
+        # Moved by a participant of both boards to a board this user does not see
+        category = GoalCategory.objects.get(id=category_id)
+        category.board = BoardFactory()
+        category.save()
+        response = client.get(reverse('category-list'), {'board': board.id})
+
+        assert response.headers["X-Cache"] == "MISS"
+        assert response.data == []
+
+    def test_not_cached_without_shared_cache(self, client, board_participant):
+        GoalCategoryFactory(board=board_participant.board, user=board_participant.user)
+        client.force_login(user=board_participant.user)
+
+        responses = [client.get(reverse('category-list')) for _ in range(2)]
+
+        assert all("X-Cache" not in response.headers for response in responses)
+        assert response_cache_stats() == {"hits": 0, "misses": 0}
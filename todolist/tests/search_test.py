@@ -0,0 +1,29 @@
+import pytest
+from django.urls import reverse
+
+from tests.factories import GoalCategoryFactory, GoalFactory
+
+
+@pytest.mark.django_db
+class TestFullTextSearch:
+    """Goal list full-text search"""
+    def test_search_by_prefix(self, client, board_participant):
+        category = GoalCategoryFactory(board=board_participant.board, user=board_participant.user)
+        goal = GoalFactory(category=category, user=board_participant.user, title="Купить молоко")
+        GoalFactory(category=category, user=board_participant.user, title="Выучить Django", description="")
+        client.force_login(user=board_participant.user)
+
+        response = client.get(reverse('goal-list'), {"search": "моло"})
+
+        assert response.status_code == 200
+        assert [item["id"] for item in response.data] == [goal.id]
+
+    def test_search_follows_updates(self, client, board_participant):
+        category = GoalCategoryFactory(board=board_participant.board, user=board_participant.user)
+        goal = GoalFactory(category=category, user=board_participant.user, title="Old title")
+        goal.title = "Fresh title"
+        goal.save()
+        client.force_login(user=board_participant.user)
+
+        assert client.get(reverse('goal-list'), {"search": "old"}).data == []
+        assert [item["id"] for item in client.get(reverse('goal-list'), {"search": "fresh tit"}).data] == [goal.id]
@@ -0,0 +1,42 @@
+import io
+import json
+
+import pytest
+from django.core.management import call_command
+from django.db.models import F
+
+from core.models import User
+from goals.models import Board, BoardParticipant, Goal, GoalComment
+
+
+@pytest.mark.django_db
+class TestSeed:
+    """Generated dataset"""
+    def test_seed_creates_consistent_rows(self):
+        call_command('seed', users=5, goals_per_category=5, stdout=io.StringIO())
+
+        assert User.objects.filter(username__startswith='seed-').count() == 5
+        assert BoardParticipant.objects.filter(role=BoardParticipant.Role.owner).count() == Board.objects.count()
+        assert Goal.objects.exists()
+        assert GoalComment.objects.exists()
+        assert not Goal.objects.exclude(board_id=F('category__board_id')).exists()
+        assert not GoalComment.objects.exclude(board_id=F('goal__board_id')).exists()
+
+
+@pytest.mark.django_db(transaction=True)
+class TestBench:
+    """Load benchmark against a live server"""
+    def test_bench_reports_percentiles(self, live_server, tmp_path):
+        call_command('seed', users=2, goals_per_category=3, stdout=io.StringIO())
+        output = tmp_path / "bench.json"
+
+        call_command(
+            'bench', base_url=live_server.url, clients=2, duration=0.5, output=str(output),
+            endpoint=['board-list', 'goal-list'], stdout=io.StringIO(),
+        )
+
+        results = json.loads(output.read_text())
+        assert set(results["endpoints"]) == {"board-list", "goal-list"}
+        assert results["total"]["requests"] > 0
+        assert results["total"]["errors"] == 0
+        assert results["total"]["p50_ms"] <= results["total"]["p99_ms"]
@@ -0,0 +1,113 @@
+import io
+from datetime import timedelta
+
+import pytest
+from django.core.management import call_command
+from django.urls import reverse
+from django.utils import timezone
+
+from goals.models import BoardParticipant, Goal, Tombstone
+from goals.sync import SYNC_FIELDS, encode_cursor
+from tests.factories import GoalCategoryFactory, GoalCommentFactory, GoalFactory
+
+
+@pytest.mark.django_db
+class TestSyncView:
+    """Delta sync with tombstones"""
+    @pytest.fixture(autouse=True)
+    def no_settle_time(self, settings):
+        settings.GOALS_SYNC_SETTLE_TIME = 0
+
+    def test_initial_then_delta_sync(self, client, board_participant):
+        user = board_participant.user
+        category = GoalCategoryFactory.create(board=board_participant.board, user=user)
+        kept, archived, removed = GoalFactory.create_batch(
+            size=3, category=category, user=user, status=Goal.Status.to_do
+        )
+        comment = GoalCommentFactory.create(goal=removed, user=user)
+        GoalFactory.create(user=user)
+        client.force_login(user=user)
+
+        initial = client.get(reverse('sync')).data
+
+        assert initial["boards"] == [board_participant.board_id]
+        assert {goal["id"] for goal in initial["changes"]["goal"]} == {kept.id, archived.id, removed.id}
+        assert [row["id"] for row in initial["changes"]["comment"]] == [comment.id]
+        assert not any(initial["deleted"].values())
+
+        kept.title = "changed"
+        kept.save()
+        archived.status = Goal.Status.archived
+        archived.save()
+        removed_id = removed.id
+        removed.delete()
+
+        delta = client.get(reverse('sync'), {'cursor': initial["cursor"]}).data
+
+        assert [goal["title"] for goal in delta["changes"]["goal"]] == ["changed"]
+        assert sorted(delta["deleted"]["goal"]) == sorted([archived.id, removed_id])
+        assert delta["deleted"]["comment"] == [comment.id]
+        assert delta["changes"]["category"] == []
+
+        again = client.get(reverse('sync'), {'cursor': delta["cursor"]}).data
+        assert not any(again["changes"].values()) and not any(again["deleted"].values())
+
+    def test_limit_and_invalid_cursor(self, client, board_participant):
+        user = board_participant.user
+        category = GoalCategoryFactory.create(board=board_participant.board, user=user)
+        GoalFactory.create_batch(size=3, category=category, user=user, status=Goal.Status.to_do)
+        client.force_login(user=user)
+
+        first = client.get(reverse('sync'), {'limit': 2}).data
+        second = client.get(reverse('sync'), {'limit': 2, 'cursor': first["cursor"]}).data
+
+        assert first["has_more"] and not second["has_more"]
+        assert len(first["changes"]["goal"]) + len(second["changes"]["goal"]) == 3
+        assert client.get(reverse('sync'), {'cursor': 'broken'}).status_code == 404
+
+    @pytest.mark.parametrize("command, options", [("archive", {"once": True}), ("prune_tombstones", {})])
+    def test_tombstones_pruned_and_old_cursor_refused(self, client, board_participant, settings, command, options):
+        user = board_participant.user
+        category = GoalCategoryFactory.create(board=board_participant.board, user=user)
+        goal = GoalFactory.create(category=category, user=user, status=Goal.Status.to_do)
+        goal.delete()
+        old = timezone.now() - timedelta(days=settings.GOALS_TOMBSTONE_RETENTION_DAYS + 1)
+        Tombstone.objects.update(updated=old)
+        client.force_login(user=user)
+
+        call_command(command, stdout=io.StringIO(), **options)
+
+        assert not Tombstone.objects.exists()
+        cursor = encode_cursor([{
+            "boards": [board_participant.board_id],
+            "position": {kind: [old, 0] for kind in (*SYNC_FIELDS, "tombstone")},
+        }])
+        assert client.get(reverse('sync'), {'cursor': cursor}).status_code == 404
+        # A cursor of a sync without deletions stays valid
+        fresh = client.get(reverse('sync')).data["cursor"]
+        assert client.get(reverse('sync'), {'cursor': fresh}).status_code == 200
+
+    def test_joined_board_fetched_in_full(self, client, board_participant):
+        user = board_participant.user
+        category = GoalCategoryFactory.create(board=board_participant.board, user=user)
+        GoalFactory.create(category=category, user=user, status=Goal.Status.to_do)
+        other = GoalFactory.create(status=Goal.Status.to_do)
+        client.force_login(user=user)
+        first = client.get(reverse('sync')).data
+
+        BoardParticipant.objects.create(board_id=other.board_id, user=user, role=BoardParticipant.Role.reader)
+        joined = client.get(reverse('sync'), {'cursor': first["cursor"]}).data
+
+        assert sorted(joined["boards"]) == sorted([board_participant.board_id, other.board_id])
+        assert [goal["id"] for goal in joined["changes"]["goal"]] == [other.id]
+        assert [row["id"] for row in joined["changes"]["category"]] == [other.category_id]
+        assert [row["id"] for row in joined["changes"]["board"]] == [other.board_id]
+
+        # Both boards continue as one stream from the earlier position, the rows in between come once more
+        again = client.get(reverse('sync'), {'cursor': joined["cursor"]}).data
+        again = client.get(reverse('sync'), {'cursor': again["cursor"]}).data
+        assert not any(again["changes"].values()) and not any(again["deleted"].values())
+        other.title = "changed"
+        other.save()
+        changed = client.get(reverse('sync'), {'cursor': again["cursor"]}).data
+        assert [goal["title"] for goal in changed["changes"]["goal"]] == ["changed"]
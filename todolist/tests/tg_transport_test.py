@@ -0,0 +1,158 @@
+import pytest
+import requests
+
+from bot.tg.client import TgClient
+from bot.tg.transport import OutboundQueue, RateLimits, TelegramError, Transport, batches
+
+
+class Clock:
+    """Fake monotonic clock advanced by the sleeps"""
+    def __init__(self):
+        self.now = 100.0
+        self.sleeps: list[float] = []
+
+    def __call__(self) -> float:
+        return self.now
+
+    def sleep(self, seconds: float) -> None:
+        self.sleeps.append(round(seconds, 3))
+        self.now += seconds
+
+
+class FakeResponse:
+    def __init__(self, status_code: int, data: dict):
+        self.status_code = status_code
+        self.data = data
+
+    def json(self) -> dict:
+        return self.data
+
+
+class FakeSession:
+    """Answers the posts in turn, an exception is raised instead of answered"""
+    def __init__(self, *answers):
+        self.answers = list(answers)
+        self.posts: list[tuple[str, dict]] = []
+
+    def post(self, url: str, json: dict, timeout):
+        self.posts.append((url.rsplit('/', 1)[-1], json))
+        answer = self.answers.pop(0)
+        if isinstance(answer, Exception):
+            raise answer
+        return answer
+
+
+SENT = FakeResponse(200, {"ok": True, "result": {
+    "message_id": 1, "from": {"id": 1, "first_name": "bot", "username": "bot"},
+    "chat": {"id": 5, "type": "private"}, "text": "text",
+}})
+
+
+def transport(clock: Clock, *answers) -> Transport:
+    limits = RateLimits(rate=2, chat_rate=1, chat_burst=1, clock=clock, sleep=clock.sleep)
+    result = Transport("token", limits, retries=2, backoff=0.5, sleep=clock.sleep)
+    result.session = FakeSession(*answers)
+    return result
+
+
+class TestRateLimits:
+    """Global and per chat token buckets"""
+    def test_global_and_chat_limits(self):
+        clock = Clock()
+        limits = RateLimits(rate=2, chat_rate=1, chat_burst=1, clock=clock, sleep=clock.sleep)
+
+        limits.acquire(1)
+        limits.acquire(2)
+        # The global bucket is empty
+        limits.acquire(3)
+        # The chat bucket refills slower than the global one
+        limits.acquire(3)
+
+        assert clock.sleeps == [0.5, 1.0]
+
+    def test_chat_buckets_bounded(self):
+        limits = RateLimits(rate=1000, chat_rate=1, chat_burst=1, max_chats=10)
+        for chat_id in range(50):
+            limits.acquire(chat_id)
+        assert list(limits.chats) == list(range(40, 50))
+
+
+class TestTransport:
+    """Retries and retry_after"""
+    def test_retry_after_blocks_sends(self):
+        clock = Clock()
+        client = TgClient("token", transport(clock, FakeResponse(429, {
+            "ok": False, "error_code": 429, "description": "Too Many Requests", "parameters": {"retry_after": 3},
+        }), SENT))
+
+        assert client.send_message(5, "text").ok
+        assert clock.sleeps == [3.0]
+
+    def test_server_errors_and_connection_errors_retried(self):
+        clock = Clock()
+        client = TgClient("token", transport(
+            clock, requests.ConnectionError("reset"), FakeResponse(502, {"ok": False}), SENT,
+        ))
+
+        assert client.send_message(5, "text").ok
+        assert clock.sleeps[0] == 0.5 and 1.0 in clock.sleeps
+
+    def test_client_error_not_retried(self):
+        clock = Clock()
+        sender = transport(clock, FakeResponse(403, {
+            "ok": False, "error_code": 403, "description": "Forbidden: bot was blocked by the user",
+        }))
+
+        with pytest.raises(TelegramError) as error:
+            TgClient("token", sender).send_message(5, "text")
+
+        assert error.value.error_code == 403
+        assert len(sender.session.posts) == 1
+
+    def test_read_timeout_not_retried(self):
+        sender = transport(Clock(), requests.ReadTimeout("timeout"))
+        with pytest.raises(TelegramError):
+            TgClient("token", sender).send_message(5, "text")
+        assert len(sender.session.posts) == 1
+
+
+class TestOutboundQueue:
+    """Background sends batched per chat"""
+    def test_batches(self):
+        assert batches(["a" * 3000, "b" * 1000, "c" * 200, "d"]) == ["a" * 3000 + "\n" + "b" * 1000, "c" * 200 + "\nd"]
+
+    def test_messages_of_chat_joined(self):
+        clock = Clock()
+        sender = transport(clock, *[SENT] * 3)
+        queue = OutboundQueue(sender)
+        # Nothing is sent before the queue is filled
+        with queue.condition:
+            queue.put(1, "first")
+            queue.put(2, "other chat")
+            queue.put(1, "second")
+        assert queue.flush(timeout=5)
+
+        assert sorted((payload for _, payload in sender.session.posts), key=lambda payload: payload["chat_id"]) == [
+            {"chat_id": 1, "text": "first\nsecond"},
+            {"chat_id": 2, "text": "other chat"},
+        ]
+
+    def test_waiting_chat_skipped(self):
+        limits = RateLimits(rate=1000, chat_rate=5, chat_burst=1)
+        sender = Transport("token", limits)
+        sender.session = FakeSession(*[SENT] * 4)
+        queue = OutboundQueue(sender, workers=1)
+        with queue.condition:
+            queue.put(1, "a" * 3000)
+            queue.put(1, "b" * 3000)
+            queue.put(1, "c")
+            queue.put(2, "other chat")
+        assert queue.flush(timeout=5)
+
+        # One worker sends to chat 2 while chat 1 waits for its bucket, chat 1 keeps its order
+        assert [payload for _, payload in sender.session.posts] == [
+            {"chat_id": 1, "text": "a" * 3000},
+            {"chat_id": 2, "text": "other chat"},
+            {"chat_id": 1, "text": "b" * 3000 + "\nc"},
+        ]
+        assert len(queue.threads) == 1
@@ -0,0 +1,84 @@
+import pytest
+from django.urls import reverse
+
+from bot.models import TgUser
+from bot.tg.client import TgClient
+from bot.users import TgUserCache
+
+
+@pytest.fixture
+def shared_cache(monkeypatch):
+    """The local memory cache of the tests stands in for a shared one"""
+    monkeypatch.setattr("bot.users.is_shared_cache", lambda: True)
+
+
+@pytest.mark.django_db
+class TestTgUserCache:
+    """Telegram users resolved without a query per message"""
+    def test_cached_after_first_message(self, shared_cache, django_assert_num_queries):
+        users = TgUserCache()
+        assert users.get_or_create(10, "user").username == "user"
+        # Creating the row changed the version of the chat
+        tg_user = users.get_or_create(10, "user")
+
+        with django_assert_num_queries(0):
+            assert users.get_or_create(10, "user") is tg_user
+        assert TgUser.objects.count() == 1
+
+    def test_preload_batch_with_one_query(self, shared_cache, django_assert_num_queries):
+        for chat_id in (1, 2, 3):
+            TgUser.objects.create(chat_id=chat_id, verification_code=f"code{chat_id}")
+        users = TgUserCache()
+
+        with django_assert_num_queries(1):
+            users.preload([1, 2, 3, 4, 1])
+        with django_assert_num_queries(0):
+            assert [users.get_or_create(chat_id, None).chat_id for chat_id in (1, 2, 3)] == [1, 2, 3]
+        with django_assert_num_queries(0):
+            users.preload([1, 2, 3])
+
+    def test_versions_read_once_per_batch(self, shared_cache, django_assert_num_queries, monkeypatch):
+        TgUser.objects.create(chat_id=1, verification_code="code")
+        users = TgUserCache()
+        users.preload([1])
+        monkeypatch.setattr("bot.users.cache.get", lambda key: pytest.fail("read per message"))
+
+        with django_assert_num_queries(0):
+            assert users.get_or_create(1, None).chat_id == 1
+
+    def test_read_per_batch_without_shared_cache(self, django_assert_num_queries):
+        TgUser.objects.create(chat_id=1, verification_code="code")
+        users = TgUserCache()
+
+        with django_assert_num_queries(1):
+            users.preload([1])
+            tg_user = users.get_or_create(1, None)
+            assert users.get_or_create(1, None) is tg_user
+        # Nothing tells this process about changes made by the others, a new batch reads the user again
+        TgUser.objects.filter(chat_id=1).update(verification_code="rotated")
+        with django_assert_num_queries(1):
+            users.preload([1])
+        assert users.get_or_create(1, None).verification_code == "rotated"
+
+    def test_reset_by_verification(self, shared_cache, client, user, monkeypatch):
+        monkeypatch.setattr(TgClient, "send_message", lambda self, chat_id, text: None)
+        users = TgUserCache()
+        tg_user = users.get_or_create(10, "user")
+        tg_user.verification_code = "rotated"
+        tg_user.save(update_fields=("verification_code",))
+        assert users.get_or_create(10, "user").verification_code == "rotated"
+        client.force_login(user=user)
+
+        response = client.patch(
+            reverse("verify-user"), data={"verification_code": "rotated"}, content_type="application/json"
+        )
+
+        assert response.status_code == 200
+        assert users.get_or_create(10, "user").user == user
+
+    def test_bounded(self):
+        users = TgUserCache(max_size=3)
+        users.preload(range(10))
+        for chat_id in range(10):
+            users.get_or_create(chat_id, None)
+        assert len(users.front) == 3
@@ -0,0 +1,45 @@
+import pytest
+from django.urls import reverse
+from rest_framework.renderers import JSONRenderer
+
+from goals.models import Goal, GoalComment
+from goals.serializers import GoalSerializer, GoalCommentSerializer, with_comment_preview
+from tests.factories import GoalCategoryFactory, GoalFactory, GoalCommentFactory
+
+
+@pytest.mark.django_db
+class TestValuesSerialization:
+    """values() based goal and comment lists"""
+    @pytest.fixture()
+    def goals(self, board_participant):
+        user = board_participant.user
+        category = GoalCategoryFactory(board=board_participant.board, user=user)
+        goals = GoalFactory.create_batch(size=4, category=category, user=user)
+        GoalFactory(category=category, user=user, description=None, due_date=None)
+        for goal in goals:
+            GoalCommentFactory.create_batch(size=2, goal=goal, user=user)
+        return goals
+
+    def test_goal_list_same_as_serializer(self, client, board_participant, goals):
+        client.force_login(user=board_participant.user)
+
+        response = client.get(reverse('goal-list'))
+        expected = GoalSerializer(with_comment_preview(Goal.objects.order_by("title", "-priority")), many=True).data
+
+        assert response.content == JSONRenderer().render(expected)
+
+    def test_comment_list_same_as_serializer(self, client, board_participant, goals):
+        client.force_login(user=board_participant.user)
+
+        response = client.get(reverse('comment-list'))
+        expected = GoalCommentSerializer(GoalComment.objects.order_by("-created"), many=True).data
+
+        assert response.content == JSONRenderer().render(expected)
+
+    def test_sparse_fieldset(self, client, board_participant, goals):
+        client.force_login(user=board_participant.user)
+
+        response = client.get(reverse('goal-list'), {"fields": "id,title,status", "pagination": "cursor"})
+
+        assert list(response.data["results"][0]) == ["id", "title", "status"]
+        assert client.get(reverse('goal-list'), {"fields": "secret"}).status_code == 400
@@ -0,0 +1,109 @@
+import io
+
+import pytest
+from django.core.management import call_command
+from django.urls import reverse
+from django.utils import timezone
+
+from bot.models import TgUpdate
+from bot.tg.models import UpdateObj
+from bot.webhook import HANDLED_RETENTION, UpdateDispatcher, enqueue
+
+SECRET = "webhook-secret"
+
+
+def payload(update_id: int, chat_id: int, text: str = "/goals") -> dict:
+    return {
+        "update_id": update_id,
+        "message": {
+            "message_id": update_id,
+            "from": {"id": chat_id, "is_bot": False, "first_name": "user", "username": "user"},
+            "chat": {"id": chat_id, "type": "private"},
+            "date": 0,
+            "text": text,
+        },
+    }
+
+
+@pytest.mark.django_db
+class TestWebhookView:
+    """Updates queued with the secret token"""
+    @pytest.fixture(autouse=True)
+    def secret(self, settings):
+        settings.TG_WEBHOOK_SECRET = SECRET
+
+    def post(self, client, data: dict, token: str = SECRET):
+        return client.post(
+            reverse('webhook'), data=data, content_type='application/json', HTTP_X_TELEGRAM_BOT_API_SECRET_TOKEN=token
+        )
+
+    def test_update_queued_once(self, client):
+        assert self.post(client, payload(10, chat_id=5)).status_code == 200
+        assert self.post(client, payload(10, chat_id=5)).status_code == 200
+
+        assert list(TgUpdate.objects.values_list("update_id", "chat_id", "handled")) == [(10, 5, None)]
+
+    def test_wrong_secret(self, client):
+        assert self.post(client, payload(10, chat_id=5), token="wrong").status_code == 403
+        assert not TgUpdate.objects.exists()
+
+    def test_disabled_without_secret(self, client, settings):
+        settings.TG_WEBHOOK_SECRET = ""
+        assert self.post(client, payload(10, chat_id=5), token="").status_code == 404
+
+    def test_unsupported_update_dropped(self, client):
+        assert self.post(client, {"update_id": 11, "edited_message": {}}).status_code == 200
+        assert not TgUpdate.objects.exists()
+
+
+@pytest.mark.django_db
+class TestUpdateDispatcher:
+    """Queued updates handled in order within a chat"""
+    def test_chat_order_and_errors(self):
+        for update_id, chat_id in ((1, 100), (2, 200), (3, 100), (4, 100), (5, 200)):
+            enqueue(payload(update_id, chat_id, text="fail" if update_id == 2 else "ok"))
+        handled = []
+
+        def handler(update: UpdateObj) -> None:
+            if update.message.text == "fail":
+                raise ValueError("broken")
+            handled.append(update.update_id)
+        dispatcher = UpdateDispatcher(handler)
+
+        batches = []
+        while size := dispatcher.run_once():
+            batches.append(size)
+
+        # One update of every chat per batch
+        assert batches == [2, 2, 1]
+        assert handled == [1, 3, 5, 4]
+        assert not TgUpdate.objects.filter(handled__isnull=True).exists()
+        assert TgUpdate.objects.get(update_id=2).error == "ValueError('broken')"
+
+    def test_purge_on_a_timer(self):
+        for update_id in (1, 2):
+            enqueue(payload(update_id, 100))
+        dispatcher = UpdateDispatcher(lambda update: None)
+        dispatcher.run_once()
+        TgUpdate.objects.filter(update_id=1).update(handled=timezone.now() - HANDLED_RETENTION * 2)
+
+        assert dispatcher.purge() == 1
+        dispatcher.run_once()
+        TgUpdate.objects.update(handled=timezone.now() - HANDLED_RETENTION * 2)
+        # Purged at most once in PURGE_INTERVAL
+        assert dispatcher.purge() == 0
+        assert TgUpdate.objects.count() == 1
+
+
+@pytest.mark.django_db(transaction=True)
+class TestFakeUpdates:
+    """Stand-in sender against a live server"""
+    def test_updates_delivered(self, live_server, settings):
+        settings.TG_WEBHOOK_SECRET = SECRET
+
+        call_command(
+            'send_fake_updates', url=live_server.url + reverse('webhook'), chats=3, count=7, stdout=io.StringIO()
+        )
+
+        assert TgUpdate.objects.count() == 7
+        assert set(TgUpdate.objects.values_list("chat_id", flat=True)) == {1, 2, 3}